@@ -1,14 +1,33 @@
-from flask import Flask, jsonify, request
+from flask import Flask, Response, jsonify, request
 from flask_cors import CORS
-from collections import Counter
-import decimal
+import csv
 import os
-import logging
 import pyodbc
 import datetime
+import threading
 import jwt
 from functools import wraps
 from decimal import Decimal
+from log_setup import configure_logging, get_logger
+from db_pool import ConnectionPool, PoolTimeout
+from chart_engine import CHART_SPECS, build_charts, chart_dimensions, compile_chart_query
+from trends import bucket_range, build_trends, compile_trend_query
+from response_cache import ResponseCache
+from compression import ResponseCompressor
+from dimension_index import DimensionIndex
+from query_filters import SubstringMatch, build_ticket_filters, normalise_choice, parse_date_filter, parse_day
+from db_types import register_output_converters, row_converter, rows_to_dicts
+from json_provider import select_provider
+from ticket_list import compile_ticket_query, decode_cursor, encode_cursor, parse_fields, parse_page_size, selected_columns
+import metrics
+from query_fanout import QueryFanout
+from rollup import DailyRollup
+from columnar_snapshot import ColumnarSnapshot, numpy_available
+import employee_import
+import employee_list
+from employee_directory import EmployeeDirectory
+from comments import COMMENT_TABLE, CommentStore, join_csv, parse_page_size as parse_comment_page_size
+from traffic_recorder import TrafficRecorder
 
 # If a .env file is present, load it so environment variables work locally.
 try:
@@ -18,7 +37,29 @@ try:
 except Exception:
     pass
 
+configure_logging()
+log = get_logger("api")
+sql_log = get_logger("sql")
+auth_log = get_logger("auth")
+pool_log = get_logger("pool")
+
 app = Flask(__name__)
+# orjson-backed JSON when installed (JSON_BACKEND=auto|orjson|std)
+app.json = select_provider(os.getenv("JSON_BACKEND", "auto"))(app)
+
+# Prometheus-style /metrics: per-route latency plus connect/execute/fetch/aggregate/serialize phases
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "1").strip().lower() not in ("0", "false", "no")
+if METRICS_ENABLED:
+    metrics.init_app(app)
+    app.json.response = metrics.timed("serialize", app.json.response)
+
+# Opt-in request-mix recording for replay.py (TRAFFIC_RECORD_FILE=traffic.jsonl)
+TRAFFIC_RECORD_FILE = os.getenv("TRAFFIC_RECORD_FILE")
+if TRAFFIC_RECORD_FILE:
+    app.wsgi_app = TrafficRecorder(app.wsgi_app, TRAFFIC_RECORD_FILE,
+                                   sample_rate=float(os.getenv("TRAFFIC_RECORD_SAMPLE", "1.0")),
+                                   url_map=app.url_map)
+
 CORS(app, resources={r"/api/*": {"origins": "*", "allow_headers": ["Authorization", "Content-Type", "x-access-token"]}})
 app.config['SECRET_KEY'] = '123sadasdasd'  # Change this to a random secret key
 
@@ -42,200 +83,450 @@ missing = [k for k, v in {
     'PASSWORDD': PASSWORDD
 }.items() if not v]
 if missing:
-    logging.warning(f"Missing environment variables for DB connection: {missing}.\n"
-                    "You can create a .env file (already present in this repo) or set env vars externally.")
+    log.warning("Missing environment variables for DB connection: %s. "
+                "You can create a .env file (already present in this repo) or set env vars externally.", missing)
+
+# SQL dialect of the backing database: "mssql" (default) or "sqlite" for a local stand-in.
+DB_DIALECT = os.getenv("DB_DIALECT", "mssql").strip().lower()
+
+# Response cache for the aggregate endpoints: LRU size and per-endpoint TTL (seconds).
+RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", "512"))
+RESPONSE_CACHE_TTL = int(os.getenv("RESPONSE_CACHE_TTL", "30"))
+RESPONSE_CACHE_ENABLED = os.getenv("RESPONSE_CACHE_ENABLED", "1").strip().lower() not in ("0", "false", "no")
+
+
+def cache_ttl(endpoint):
+    """TTL for `endpoint`, overridable per endpoint with e.g. RESPONSE_CACHE_TTL_STATS=60."""
+    return int(os.getenv(f"RESPONSE_CACHE_TTL_{endpoint.upper()}", RESPONSE_CACHE_TTL))
+
+
+# Response compression negotiated from Accept-Encoding: zstd / br (when installed), then gzip.
+# Bodies under COMPRESSION_MIN_BYTES go out uncompressed; levels are per encoding.
+COMPRESSION_ENABLED = os.getenv("COMPRESSION_ENABLED", "1").strip().lower() not in ("0", "false", "no")
+response_compressor = ResponseCompressor(
+    enabled=COMPRESSION_ENABLED,
+    min_size=int(os.getenv("COMPRESSION_MIN_BYTES", "1024")),
+    levels={encoding: int(os.environ[f"COMPRESSION_LEVEL_{name}"])
+            for encoding, name in (("gzip", "GZIP"), ("br", "BR"), ("zstd", "ZSTD"))
+            if os.getenv(f"COMPRESSION_LEVEL_{name}")},
+    encodings=[e.strip().lower() for e in os.getenv("COMPRESSION_ENCODINGS", "").split(",") if e.strip()] or None,
+)
+# Registered after metrics, so it runs first and /metrics counts the bytes actually sent
+response_compressor.init_app(app)
+
+response_cache = ResponseCache(RESPONSE_CACHE_SIZE, enabled=RESPONSE_CACHE_ENABLED, compressor=response_compressor)
+
+# Connection pool settings (all optional). Connections are reused across requests
+# instead of paying the TCP/TLS/login handshake on every API call.
+DB_POOL_MIN = int(os.getenv("DB_POOL_MIN", "1"))
+DB_POOL_MAX = int(os.getenv("DB_POOL_MAX", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "5"))
+DB_POOL_MAX_AGE = float(os.getenv("DB_POOL_MAX_AGE", "1800"))
+DB_POOL_PING_INTERVAL = float(os.getenv("DB_POOL_PING_INTERVAL", "10"))
+
+_db_pool = None
+_db_pool_lock = threading.Lock()
+
+
+def _connect_pyodbc():
+    """Open a raw pyodbc connection using environment variables."""
+    connection = pyodbc.connect(
+        f"DRIVER={DB_DRIVER};"
+        f"SERVER={SERVER};"
+        f"DATABASE={DATABASE};"
+        f"UID={UID};"
+        f"PWD={PASSWORDD};"
+    )
+    # DECIMAL/NUMERIC come back as int/float straight from the driver
+    return register_output_converters(connection)
+
+
+def _new_db_pool(connect=None, **options):
+    settings = {
+        "min_size": DB_POOL_MIN,
+        "max_size": DB_POOL_MAX,
+        "timeout": DB_POOL_TIMEOUT,
+        "max_age": DB_POOL_MAX_AGE,
+        "ping_interval": DB_POOL_PING_INTERVAL,
+        "cursor_factory": metrics.InstrumentedCursor if METRICS_ENABLED else None,
+    }
+    settings.update(options)
+    return ConnectionPool(connect or _connect_pyodbc, **settings)
+
+
+def init_db_pool(connect=None, **options):
+    """(Re)create the global connection pool.
+
+    `connect` defaults to pyodbc with the .env settings; tests and local runs can pass
+    e.g. `lambda: sqlite3.connect(path, check_same_thread=False)` instead.
+    """
+    global _db_pool
+    with _db_pool_lock:
+        old = _db_pool
+        _db_pool = _new_db_pool(connect, **options)
+    if old is not None:
+        old.close()
+    return _db_pool
+
+
+def get_db_pool():
+    """Return the global pool, creating it on first use."""
+    global _db_pool
+    if _db_pool is None:
+        with _db_pool_lock:
+            if _db_pool is None:
+                _db_pool = _new_db_pool()
+    return _db_pool
+
 
 #Define SQL Connection (Function 1)
 def get_db_connection():
-    """Create and return a database connection using environment variables."""
-    try:
-        connection = pyodbc.connect(
-            f"DRIVER={DB_DRIVER};"
-            f"SERVER={SERVER};"
-            f"DATABASE={DATABASE};"
-            f"UID={UID};"
-            f"PWD={PASSWORDD};"
-        )
-        return connection
+    """Check out a pooled database connection; `conn.close()` returns it to the pool."""
+    try:
+        with metrics.phase("connect"):
+            return get_db_pool().getconn()
+    except PoolTimeout as e:
+        raise Exception(f"Database connection failed: {str(e)}")
     except pyodbc.Error as e:        
         raise Exception(f"Database connection failed: {str(e)}")
     except Exception as e:        
         raise Exception(f"Unexpected error connecting to database: {str(e)}")
     
 
+# Independent read queries of one request run concurrently, at most QUERY_FANOUT_MAX_PARALLEL
+# pooled connections per request (1 = run them one after another)
+QUERY_FANOUT_MAX_PARALLEL = int(os.getenv("QUERY_FANOUT_MAX_PARALLEL", "3"))
+QUERY_FANOUT_WORKERS = int(os.getenv("QUERY_FANOUT_WORKERS", str(DB_POOL_MAX)))
+
+query_fanout = QueryFanout(get_db_connection, max_workers=QUERY_FANOUT_WORKERS,
+                           max_parallel=QUERY_FANOUT_MAX_PARALLEL)
+
+# Dropdown dimensions (dates, products, companies) served from memory; refreshed in the background
+DIMENSION_REFRESH_SECONDS = float(os.getenv("DIMENSION_REFRESH_SECONDS", "60"))
+DIMENSION_FULL_RELOAD_EVERY = int(os.getenv("DIMENSION_FULL_RELOAD_EVERY", "60"))
+
+dimension_index = DimensionIndex(
+    get_db_connection,
+    dialect=DB_DIALECT,
+    refresh_interval=DIMENSION_REFRESH_SECONDS,
+    full_reload_every=DIMENSION_FULL_RELOAD_EVERY,
+    fanout=query_fanout,
+)
+
+# Daily pre-aggregated copy of Chatbot_Transaction for stats/charts/trends (opt-in, see rollup.py).
+# Used only while its last refresh is within ROLLUP_MAX_LAG_SECONDS and it has at most
+# ROLLUP_MAX_ROW_RATIO rows per ticket; otherwise queries read the raw table.
+ROLLUP_ENABLED = os.getenv("ROLLUP_ENABLED", "0").strip().lower() in ("1", "true", "yes")
+ROLLUP_REFRESH_SECONDS = float(os.getenv("ROLLUP_REFRESH_SECONDS", "60"))
+ROLLUP_FULL_REBUILD_EVERY = int(os.getenv("ROLLUP_FULL_REBUILD_EVERY", "60"))
+ROLLUP_MAX_LAG_SECONDS = float(os.getenv("ROLLUP_MAX_LAG_SECONDS", "300"))
+ROLLUP_MAX_ROW_RATIO = float(os.getenv("ROLLUP_MAX_ROW_RATIO", "0.5"))
+ROLLUP_MODIFIED_COLUMN = os.getenv("ROLLUP_MODIFIED_COLUMN") or None
+
+daily_rollup = DailyRollup(
+    get_db_connection,
+    dialect=DB_DIALECT,
+    refresh_interval=ROLLUP_REFRESH_SECONDS,
+    full_rebuild_every=ROLLUP_FULL_REBUILD_EVERY,
+    max_lag=ROLLUP_MAX_LAG_SECONDS,
+    max_row_ratio=ROLLUP_MAX_ROW_RATIO,
+    modified_column=ROLLUP_MODIFIED_COLUMN,
+)
+
+# In-memory NumPy copy of the dashboard columns (opt-in, see columnar_snapshot.py); it answers
+# stats/charts/trends ahead of the rollup and the raw table while refreshed within SNAPSHOT_MAX_LAG_SECONDS
+SNAPSHOT_ENABLED = os.getenv("SNAPSHOT_ENABLED", "0").strip().lower() in ("1", "true", "yes")
+if SNAPSHOT_ENABLED and not numpy_available():
+    log.warning("SNAPSHOT_ENABLED is set but NumPy is not installed; using SQL for aggregates")
+    SNAPSHOT_ENABLED = False
+
+columnar_snapshot = ColumnarSnapshot(
+    get_db_connection,
+    dialect=DB_DIALECT,
+    refresh_interval=float(os.getenv("SNAPSHOT_REFRESH_SECONDS", "30")),
+    full_reload_every=int(os.getenv("SNAPSHOT_FULL_RELOAD_EVERY", "120")),
+    max_lag=float(os.getenv("SNAPSHOT_MAX_LAG_SECONDS", "300")),
+) if SNAPSHOT_ENABLED else None
+
+
+# Ticket comments live in their own append-only table. It is created on first use. A ticket's legacy
+# CSV comments are copied the first time a request touches it, and for every ticket at startup
+# unless COMMENTS_MIGRATE_ON_STARTUP=0 (`python comments.py --migrate` does the same ahead of a deploy)
+comment_store = CommentStore(get_db_connection, dialect=DB_DIALECT)
+COMMENTS_MIGRATE_ON_STARTUP = os.getenv("COMMENTS_MIGRATE_ON_STARTUP", "1").strip().lower() not in ("0", "false", "no")
+
+# In-process copy of Chatbot_Emp for login, /api/getemployees and token role checks. The employee
+# endpoints update it after each write; it is reloaded every EMPLOYEE_DIRECTORY_RECONCILE_SECONDS.
+employee_directory = EmployeeDirectory(
+    get_db_connection,
+    dialect=DB_DIALECT,
+    reconcile_interval=float(os.getenv("EMPLOYEE_DIRECTORY_RECONCILE_SECONDS", "300")),
+)
+
+
+def employees_written(emp_ids, deleted=False):
+    """After a committed Chatbot_Emp write: update the employee directory (a failure leaves it
+    to the next reconcile)."""
+    try:
+        if deleted:
+            for emp_id in emp_ids:
+                employee_directory.remove(emp_id)
+        else:
+            employee_directory.refresh_ids(emp_ids)
+    except Exception as e:
+        log.warning("Employee directory not refreshed after write, waiting for reconcile: %s", e)
+
+
+def snapshot_rows(kind, *args, **filters):
+    """Grouped rows from the columnar snapshot, or None when it is disabled or stale."""
+    if columnar_snapshot is None:
+        return None
+    with metrics.phase("snapshot"):
+        return getattr(columnar_snapshot, f"{kind}_rows")(*args, **filters)
+
+
 #Validate API Running or not (Function 2)
 @app.route('/')
 def home():
     return jsonify({"message": "Helpdesk Dashboard API is running!"})
 
 
-#Fetch data based on where condition (Function 3)
-def fetch_Chatbot_Transaction_State(date_filter=None, product=None, company=None, company_id=None, company_email=None):
-    """Fetch tickets from Chatbot_Transaction table with optional date, product, company name, and company id/email filters."""
-    connection = get_db_connection()
-    cursor = connection.cursor()
-
-    query = """
-        SELECT Ticket_Creation_Date,Ticket_No,Ticket_Status,Company_Work_Feedback,
-               Ticket_Priority,Ticket_Category,Ticket_Day_Open,
-               Product_Name, Company_Name
-        FROM Chatbot_Transaction
-        WHERE 1=1
+@app.route('/api/health', methods=['GET'])
+def health():
+    """Report DB reachability plus connection pool statistics (in-use, idle, wait time)."""
+    pool = get_db_pool()
+    status = "ok"
+    try:
+        conn = pool.getconn()
+        try:
+            cursor = conn.cursor()
+            cursor.execute("SELECT 1")
+            cursor.fetchall()
+            cursor.close()
+        finally:
+            conn.close()
+    except Exception as e:
+        pool_log.warning("Health check could not get a DB connection: %s", e)
+        status = "degraded"
+    return jsonify({
+        "status": status,
+        "pool": pool.stats(),
+        "response_cache": response_cache.stats(),
+        "compression": response_compressor.stats(),
+        "dimension_index": dimension_index.stats(),
+        "query_fanout": query_fanout.stats(),
+        "rollup": daily_rollup.stats() if ROLLUP_ENABLED else None,
+        "snapshot": columnar_snapshot.stats() if columnar_snapshot is not None else None,
+        "employee_directory": employee_directory.stats(),
+    }), 200 if status == "ok" else 503
+
+
+def resolve_names(dim, value, substring=False):
+    """Resolve a product/company filter value to the exact names stored in the table.
+
+    Returns None for "no filter" (empty or "All"). Matching ignores case and surrounding
+    spaces; with `substring` any name containing the value matches (the old LIKE '%x%').
+    The resolved names let the ticket query use = / IN instead of a non-sargable LIKE.
     """
-    params = []
+    value = normalise_choice(value)
+    if value is None:
+        return None
+    dimension_index.ensure_loaded()
+    names = dimension_index.match(dim, value, substring)
+    if not names:
+        # Possibly a name added since the last background refresh
+        dimension_index.refresh_if_stale()
+        names = dimension_index.match(dim, value, substring)
+    if substring:
+        # Keeps the substring for build_ticket_filters' LIKE fallback on very many matches
+        return SubstringMatch(names, value)
+    return names or [value]
+
+
+def same_names(a, b):
+    """Whether two resolve_names() results select the same rows."""
+    if a is None or b is None:
+        return a is None and b is None
+    return set(a) == set(b)
+
+
+def state_filter_args(date_filter=None, product=None, company=None, company_id=None, company_email=None):
+    """build_ticket_filters() arguments for the stats queries (product/company match as substrings)."""
+    start_date, end_date = parse_date_filter(date_filter)
+    return {
+        "start_date": start_date,
+        "end_date": end_date,
+        "products": resolve_names("products", product, substring=True),
+        "companies": resolve_names("companies", company, substring=True),
+        "company_id": company_id,
+        "company_email": company_email,
+    }
 
-    # Add optional filters
-    if date_filter:
 
-        #  query += " AND CAST(Ticket_Creation_Date AS DATE) = CAST(? AS DATE)"
-        #  params.append(date_filter)
+#Aggregate stats in the database (Function 3)
+def fetch_Chatbot_Transaction_Stats(date_filter=None, product=None, company=None, company_id=None, company_email=None):
+    """Return per-status ticket counts and Ticket_Day_Open sums for the stats filters.
+
+    Product and company names match as substrings (see state_filter_args). The database does
+    the grouping, so only one row per Ticket_Status comes back instead of every ticket.
+    Returns {status: (count, day_open_sum)}.
+    """
+    return fetch_stats_groups(state_filter_args(date_filter, product, company, company_id, company_email))
+
+
+def fetch_stats_groups(filters):
+    """{status: (count, day_open_sum)} for build_ticket_filters() arguments: snapshot, rollup or raw table."""
+    rows = snapshot_rows("stats", **filters)
+    if rows is None:
+        where, params = build_ticket_filters(**filters)
+        query = daily_rollup.stats_query(where) or (
+            "SELECT Ticket_Status, COUNT(*), SUM(COALESCE(Ticket_Day_Open, 0))"
+            " FROM Chatbot_Transaction" + where +
+            " GROUP BY Ticket_Status"
+        )
+        sql_log.debug("stats query", extra={"sql": query, "params": params})
+
+        connection = get_db_connection()
         try:
-            startdate, enddate = date_filter.split(" AND ")
-            query += " AND CAST(Ticket_Creation_Date AS DATE) BETWEEN CAST(? AS DATE) AND CAST(? AS DATE)"
-            params.extend([startdate.strip(), enddate.strip()])
-        except ValueError:
-            raise ValueError("Invalid date_filter format. Expected 'startdate AND enddate'.")
-
-    if  product: 
-        print("Product Filter Applied value State:", product.strip().lower() != "all")   
-        if product.strip().lower() != "all":      
-            query += " AND TRIM(Product_Name) LIKE TRIM(?)"                  
-            params.append(f"%{product}%")
-            print("Product Name 100:", product)  # Debug log
-    
+            cursor = connection.cursor()
+            cursor.execute(query, tuple(params))
+            rows = cursor.fetchall()
+            cursor.close()
+        finally:
+            connection.close()
 
-    # Filter by company name (optional)
-    if company:
-        print("Company Filter Applied value:", company.strip().lower() != "all")
-        if company.strip().lower() != "all":
-            query += " AND TRIM(Company_Name) LIKE TRIM(?)"
-            params.append(f"%{company}%")
-            print("Company Name 100:", company)  # Debug log
-
-    # Filter by Company_ID and Company_Email when provided (required at endpoints)
-    if company_id:
-        query += " AND TRIM(Company_ID) = TRIM(?)"
-        params.append(company_id)
-        print("Company_ID filter applied:", company_id)
-    if company_email:
-        query += " AND TRIM(Company_Email) = TRIM(?)"
-        params.append(company_email)
-        print("Company_Email filter applied:", company_email)
-
-
-
-    print("📌 Executing for State SQL:", query)
-    print("📌 Params:", params)
-
-    cursor.execute(query, tuple(params))
-    rows = cursor.fetchall()    
-    print(f"📊 Rows fetched from DB for State 300 A: {len(rows)}")  # Debug log
-    cursor.close()
-    connection.close()
-    return rows
+    groups = {}
+    for status, count, day_sum in rows:
+        prev_count, prev_sum = groups.get(status, (0, 0))
+        groups[status] = (prev_count + count, prev_sum + (day_sum or 0))
+    return groups
 
 
-#Fetch data based on where condition (Function 3)
-def fetch_Chatbot_Transaction_Chart(date_filter=None, product=None, company=None, company_id=None, company_email=None):
-    """Fetch tickets from Chatbot_Transaction table with optional date, product, company name, and company id/email filters."""
-    connection = get_db_connection()
-    cursor = connection.cursor()
-
-    query = """
-        SELECT Ticket_Creation_Date,Ticket_No,Ticket_Status,Company_Work_Feedback,
-               Ticket_Priority,Ticket_Category,Ticket_Day_Open,
-               Product_Name, Company_Name
-        FROM Chatbot_Transaction
-        WHERE 1=1
-    """
-    params = []
+def build_stats_payload(status_groups):
+    """Build the /api/stats response list from {status: (count, day_open_sum)}."""
+    total_tickets = sum(count for count, _ in status_groups.values())
+    if not total_tickets:
+        return []
 
-    # Add optional filters
-    if date_filter:
+    status_counts = {status: count for status, (count, _) in status_groups.items()}
+    open_day_sum = status_groups.get('Open', (0, 0))[1]
 
-        #  query += " AND CAST(Ticket_Creation_Date AS DATE) = CAST(? AS DATE)"
-        #  params.append(date_filter)
-        try:
-            startdate, enddate = date_filter.split(" AND ")
-            query += " AND CAST(Ticket_Creation_Date AS DATE) BETWEEN CAST(? AS DATE) AND CAST(? AS DATE)"
-            params.extend([startdate.strip(), enddate.strip()])
-        except ValueError:
-            raise ValueError("Invalid date_filter format. Expected 'startdate AND enddate'.")
-
-    print("Product Filter Applied chart:", product)
-    if  product:
-        print("I am here")
-        print("Product Filter Applied value chart:", product.strip().lower() != "all")    
-        if product.strip().lower() != "all":      
-         query += " AND TRIM(Product_Name) LIKE TRIM(?)"                  
-         params.append(f"{product.strip()}")
-         print("Product Name chart 100:", product)  # Debug log
-    
+    avg_days_open = int(open_day_sum / max(status_counts.get('Open', 1), 1))
+
+    return [
+        {"label": "Tickets", "value": total_tickets, "color": "#6f42c1",
+         "graphwidth": min(total_tickets, 100)},
 
-    # Filter by company name (optional)
-    if company:
-        if company.strip().lower() != "all":
-         query += " AND TRIM(Company_Name) LIKE TRIM(?)"
-         params.append(f"{company.strip()}")
-         print("Company Name 100:", company)  # Debug log
-
-    # Filter by Company_ID and Company_Email when provided (required at endpoints)
-    if company_id:
-        query += " AND TRIM(Company_ID) = TRIM(?)"
-        params.append(company_id)
-        print("Company_ID filter applied:", company_id)
-    if company_email:
-        query += " AND TRIM(Company_Email) = TRIM(?)"
-        params.append(company_email)
-        print("Company_Email filter applied:", company_email)
-
-
-
-    print("📌 Executing Chart SQL:", query)
-    print("📌 Params:", params)
-
-    cursor.execute(query, tuple(params))
-    rows = cursor.fetchall()    
-    print(f"📊 Rows fetched from DB 300 A: {len(rows)}")  # Debug log
-    cursor.close()
-    connection.close()
+        {"label": "Open", "value": status_counts.get('Open', 0), "color": "#dc3545",
+         "graphwidth": min(int((status_counts.get('Open', 0) / total_tickets) * 100), 100)},
+
+        {"label": "Resolved", "value": status_counts.get('Resolved', 0), "color": "#17a2b8",
+         "graphwidth": min(int((status_counts.get('Resolved', 0) / total_tickets) * 100), 100)},
+
+        {"label": "Closed", "value": status_counts.get('Closed', 0), "color": "#28a745",
+         "graphwidth": min(int((status_counts.get('Closed', 0) / total_tickets) * 100), 100)},
+
+        {"label": "Pending", "value": status_counts.get('Pending', 0), "color": "#CA279B",
+         "graphwidth": min(int((status_counts.get('Pending', 0) / total_tickets) * 100), 100)},
+
+        {"label": "Avg Days Open", "value": avg_days_open, "color": "#ffc107",
+         "graphwidth": min(avg_days_open * 5, 100)}
+    ]
+
+
+def chart_filter_args(date_filter=None, product=None, company=None, company_id=None, company_email=None):
+    """build_ticket_filters() arguments for the chart queries (product/company match exactly)."""
+    start_date, end_date = parse_date_filter(date_filter)
+    return {
+        "start_date": start_date,
+        "end_date": end_date,
+        "products": resolve_names("products", product),
+        "companies": resolve_names("companies", company),
+        "company_id": company_id,
+        "company_email": company_email,
+    }
+
+
+#Aggregate chart data in the database (Function 3)
+def fetch_chart_groups(date_filter=None, product=None, company=None, company_id=None, company_email=None, specs=CHART_SPECS):
+    """Run the single grouped query compiled from the chart specs and return its rows."""
+    filters = chart_filter_args(date_filter, product, company, company_id, company_email)
+    rows = snapshot_rows("chart", specs, **filters)
+    if rows is not None:
+        return rows
+    where, params = build_ticket_filters(**filters)
+    query = daily_rollup.chart_query(where, specs) or compile_chart_query(where, specs)
+
+    sql_log.debug("chart groups query", extra={"sql": query, "params": params})
+
+    connection = get_db_connection()
+    try:
+        cursor = connection.cursor()
+        cursor.execute(query, tuple(params))
+        rows = cursor.fetchall()
+        cursor.close()
+    finally:
+        connection.close()
     return rows
 
          
 
 # All Get Function (Section 4)
+def dimension_response(dim, render):
+    """Serve a dropdown list from the in-memory dimension index with an ETag.
+
+    Optional query parameter Company_ID (or company_id) scopes the list to one company.
+    """
+    company_id = request.args.get('Company_ID') or request.args.get('company_id')
+    dimension_index.ensure_loaded()
+    etag, body = dimension_index.render(dim, company_id or None, lambda values: app.json.response(render(values)).get_data())
+    response = Response(body, mimetype=app.json.mimetype)
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = "no-cache"
+    return response.make_conditional(request)
+
+
 @app.route('/api/dates', methods=['GET'])
 def get_dates():
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute("SELECT DISTINCT CAST(Ticket_Creation_Date AS DATE) FROM Chatbot_Transaction")
-    dates = [str(row[0]) for row in cursor.fetchall()]
-    conn.close()
-    return jsonify(dates)
+    return dimension_response("dates", lambda dates: dates)
 
 # NEW ENDPOINT: Return list of Product_Name for dropdown
 @app.route('/api/Product_Name', methods=['GET'])
 def get_Product_Name():
     """Return unique Product_Name for employee dropdown"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute("SELECT DISTINCT Product_Name FROM Chatbot_Transaction ORDER BY Product_Name")
-    employees = [{"id": i+1, "name": row[0]} for i, row in enumerate(cursor.fetchall())]
-    conn.close()
-    return jsonify(employees)
+    return dimension_response("products", lambda names: [{"id": i+1, "name": name} for i, name in enumerate(names)])
 
 # NEW ENDPOINT: Return list of Company_Name for dropdown
 @app.route('/api/companies', methods=['GET'])
 def get_companies():
     """Return unique Company_Name for company dropdown"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute("SELECT DISTINCT Company_Name FROM Chatbot_Transaction ORDER BY Company_Name")
-    companies = [{"id": i+1, "name": row[0]} for i, row in enumerate(cursor.fetchall())]
-    conn.close()
-    return jsonify(companies)
+    return dimension_response("companies", lambda names: [{"id": i+1, "name": name} for i, name in enumerate(names)])
+
+# Type-ahead for the product/company dropdowns, answered from the in-memory trigram index
+@app.route('/api/suggest/<dim>', methods=['GET'])
+def suggest_names(dim):
+    """Names containing `q` (case-insensitive), exact and prefix matches first.
+
+    Path: products or companies. Query parameters: q, limit (default 10, max 50), and
+    optional Company_ID (or company_id) to suggest only that company's names.
+    """
+    if dim not in ("products", "companies"):
+        return jsonify({"error": "Unknown dimension. Expected 'products' or 'companies'."}), 404
+    needle = (request.args.get('q') or '').strip()
+    try:
+        limit = min(max(int(request.args.get('limit', 10)), 1), 50)
+    except ValueError:
+        return jsonify({"error": "limit must be an integer"}), 400
+    company_id = request.args.get('Company_ID') or request.args.get('company_id')
+    if not needle:
+        return jsonify([])
+
+    dimension_index.ensure_loaded()
+    names = dimension_index.suggest(dim, needle, limit, company_id or None)
+    return jsonify([{"name": name} for name in names])
 
 @app.route('/api/stats', methods=['GET'])
+@response_cache.cached('stats', cache_ttl('stats'))
 def get_stats():
     date = request.args.get('date')
     product = request.args.get('Product_Name')
@@ -244,49 +535,25 @@ def get_stats():
     # Optional Company_ID and Company_Email for data scoping
     company_id = request.args.get('Company_ID') or request.args.get('company_id')
     company_email = request.args.get('Company_Email') or request.args.get('company_email')
-    print(f"📌 /api/stats requested for date={date}, product={product}, company={company}, Company_ID={company_id}, Company_Email={company_email}")
-
-    # Pass company filters into fetch function if provided; otherwise fetch across all companies
-    rows = fetch_Chatbot_Transaction_State(date, product.strip(), company.strip(), company_id=company_id, company_email=company_email)
-
-    print(f"📊 Rows for stats 500 B: {len(rows)}")  # Debug log
-
-    if not rows:
-        print("⚠️ No rows found for stats")
-        return jsonify([])
-    
-    print(f"📊 Sample row for stats: {rows}")  # Debug log
-    total_tickets = len(rows)
-
-    # FIX: Ticket_Status is column index 2
-    status_counts = Counter([r[2] for r in rows])
-    print(f"📊 Status counts 600: {status_counts}")  # Debug log
-
-    # FIX: Ticket_Day_Open is column index 6
-    avg_days_open = int( sum( r[6] if r[6] is not None else decimal.Decimal(0) for r in rows if r[2] == 'Open') / max(status_counts.get('Open', 1), 1))
+    log.debug("/api/stats requested", extra={"date": date, "product": product, "company": company,
+                                             "company_id": company_id, "company_email": company_email})
 
-    stats = [
-        {"label": "Tickets", "value": total_tickets, "color": "#6f42c1",
-         "graphwidth": min(total_tickets, 100)},
-
-        {"label": "Open", "value": status_counts.get('Open', 0), "color": "#dc3545",
-         "graphwidth": min(int((status_counts.get('Open', 0) / total_tickets) * 100), 100)},
-
-        {"label": "Resolved", "value": status_counts.get('Resolved', 0), "color": "#17a2b8",
-         "graphwidth": min(int((status_counts.get('Resolved', 0) / total_tickets) * 100), 100)},
-
-        {"label": "Closed", "value": status_counts.get('Closed', 0), "color": "#28a745",
-         "graphwidth": min(int((status_counts.get('Closed', 0) / total_tickets) * 100), 100)},
+    # Pass company filters into the aggregate query; only one row per status comes back
+    try:
+        status_groups = fetch_Chatbot_Transaction_Stats(date, product.strip(), company.strip(), company_id=company_id, company_email=company_email)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
 
-        {"label": "Pending", "value": status_counts.get('Pending', 0), "color": "#CA279B",
-         "graphwidth": min(int((status_counts.get('Pending', 0) / total_tickets) * 100), 100)},
+    log.debug("stats status groups", extra={"groups": len(status_groups)})
 
-        {"label": "Avg Days Open", "value": avg_days_open, "color": "#ffc107",
-         "graphwidth": min(avg_days_open * 5, 100)}
-    ]
+    with metrics.phase("aggregate"):
+        stats = build_stats_payload(status_groups)
+    if not stats:
+        log.debug("No rows found for stats")
     return jsonify(stats)
 
 @app.route('/api/charts', methods=['GET'])
+@response_cache.cached('charts', cache_ttl('charts'))
 def get_charts():
     date = request.args.get('date')
     product = request.args.get('product')
@@ -294,187 +561,213 @@ def get_charts():
     # Optional Company_ID and Company_Email for data scoping
     company_id = request.args.get('Company_ID') or request.args.get('company_id')
     company_email = request.args.get('Company_Email') or request.args.get('company_email')
-    print(f"📌 /api/charts requested for date={date}, product={product}, company={company}, Company_ID={company_id}, Company_Email={company_email}")
+    log.debug("/api/charts requested", extra={"date": date, "product": product, "company": company,
+                                              "company_id": company_id, "company_email": company_email})
 
-    # Pass company filters into fetch function if provided; otherwise fetch across all companies
-    rows = fetch_Chatbot_Transaction_Chart(date, product, company, company_id=company_id, company_email=company_email)
+    # Pass company filters into the grouped chart query; one row per label combination comes back
+    try:
+        groups = fetch_chart_groups(date, product, company, company_id=company_id, company_email=company_email)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
 
-    print(f"📊 Rows for stats 600 B: {len(rows)}")  # Debug log
+    log.debug("chart groups", extra={"groups": len(groups)})
 
-    if not rows:
-        print("⚠️ No rows found for charts")
+    if not groups:
+        log.debug("No rows found for charts")
         return jsonify([])
 
-     # -----------------------------
-    # COUNTS FROM DATABASE ROWS
-    # -----------------------------
-    status_counts = Counter([r[2] for r in rows])
-    feedback_counts = Counter([r[3] for r in rows])
-    severity_counts = Counter([str(r[4]).strip() for r in rows])
-    category_counts = Counter([r[5] for r in rows])
-
-    # -----------------------------
-    # FIXED TICKET STATUS ORDER
-    # -----------------------------
-    fixed_status_order = ["Open", "Pending", "Resolved", "Closed"]
-    status_labels = fixed_status_order
-    status_values = [status_counts.get(s, 0) for s in fixed_status_order]
-
-    # -----------------------------
-    # OPEN DAYS RANGE
-    # -----------------------------
-    open_days_ranges = {
-        '0-5 Days': 0, '6-10 Days': 0, '11-15 Days': 0,
-        '16-20 Days': 0, '21-25 Days': 0, '> 25 Days': 0
-    }
-
-    for r in rows:
-        days = r[6] if r[6] is not None else 0
-        if days <= 5:
-            open_days_ranges['0-5 Days'] += 1
-        elif days <= 10:
-            open_days_ranges['6-10 Days'] += 1
-        elif days <= 15:
-            open_days_ranges['11-15 Days'] += 1
-        elif days <= 20:
-            open_days_ranges['16-20 Days'] += 1
-        elif days <= 25:
-            open_days_ranges['21-25 Days'] += 1
-        else:
-            open_days_ranges['> 25 Days'] += 1
-
-    # -----------------------------
-    # FIXED SEVERITY ORDER
-    # -----------------------------
-    fixed_severity_order = ["High", "Medium", "Low"]
-    severity_labels = fixed_severity_order
-    severity_values = [severity_counts.get(s, 0) for s in fixed_severity_order]
-
-    # -----------------------------
-    # BUILD CHART RESPONSE
-    # -----------------------------
-    charts = [
-        # TICKET STATUS CHART
-        {
-            "title": "Ticket Status",
-            "type": "doughnut",
-            "data": {
-                "labels": status_labels,
-                "datasets": [{
-                    "data": status_values,
-                    "backgroundColor": ["#dc3545", "#CA279B", "#17a2b8", "#28a745"]
-                }]
-            }
-        },
-
-        # SATISFACTION CHART
-        {
-            "title": "Satisfaction",
-            "type": "bar",
-            "data": {
-                "labels": list(feedback_counts.keys()),
-                "datasets": [{
-                    "data": list(feedback_counts.values()),
-                    "backgroundColor": ["green", "blue", "gray", "red"]
-                }]
-            }
-        },
-
-        # SEVERITY CHART
-        {
-            "title": "Severity",
-            "type": "bar",
-            "data": {
-                "labels": severity_labels,
-                "datasets": [{
-                    "data": severity_values,
-                    "backgroundColor": ["red", "orange", "yellow"]
-                }]
-            }
-        },
-
-        # ISSUE CATEGORY CHART
-        {
-            "title": "Issue Category",
-            "type": "bar",
-            "data": {
-                "labels": list(category_counts.keys()),
-                "datasets": [{
-                    "data": list(category_counts.values()),
-                    "backgroundColor": ["purple", "blue", "green", "gray"]
-                }]
-            }
-        },
-
-        # OPEN DAYS CHART
-        {
-            "title": "Open Days",
-            "type": "bar",
-            "data": {
-                "labels": list(open_days_ranges.keys()),
-                "datasets": [{
-                    "data": list(open_days_ranges.values()),
-                    "backgroundColor": ["teal"]
-                }]
-            }
-        }
-    ]
+    with metrics.phase("aggregate"):
+        charts = build_charts(groups)
     return jsonify(charts)
 
+def parse_date_range(args):
+    """Read start/end dates from `start_date`/`end_date`, the `date` ("start AND end") or the `days` parameter.
+
+    Returns (start, end) as datetime.date or None. Without any of them both are None (all
+    history); a start without an end runs through today, and `days=N` without a start means
+    the last N days up to the end date.
+    """
+    start = args.get('start_date') or args.get('startDate')
+    end = args.get('end_date') or args.get('endDate')
+    date_filter = args.get('date')
+    days = args.get('days')
+    if not start and not end and date_filter:
+        start, end = parse_date_filter(date_filter)
+    else:
+        start = parse_day(start) if start else None
+        end = parse_day(end) if end else None
+    if days and not start:
+        try:
+            days = int(days)
+        except ValueError:
+            raise ValueError("days must be a positive integer")
+        if days < 1:
+            raise ValueError("days must be a positive integer")
+        end = end or datetime.date.today()
+        start = end - datetime.timedelta(days=days - 1)
+    elif start and not end:
+        end = datetime.date.today()
+    if start and end and start > end:
+        raise ValueError("start_date must be on or before end_date")
+    return start, end
+
+
 @app.route('/api/monthly-trends', methods=['GET'])
+@response_cache.cached('trends', cache_ttl('trends'))
 def get_monthly_trends():
+    """Ticket counts per status over time, bucketed and zero-filled on the server.
+
+    Query parameters (all optional):
+      - start_date / end_date (YYYY-MM-DD) or date ("start AND end"); all history by default
+      - days: the last N days (up to end_date or today) instead of a start date
+      - granularity: day (default), week, month or quarter
+      - Company_ID / Company_Email for data scoping
+    """
     # Optional company scope for monthly trends
     company_id = request.args.get('Company_ID') or request.args.get('company_id')
     company_email = request.args.get('Company_Email') or request.args.get('company_email')
+    granularity = (request.args.get('granularity') or 'day').strip().lower()
 
-    conn = get_db_connection()
+    try:
+        start_date, end_date = parse_date_range(request.args)
+        if start_date and end_date:
+            bucket_range(start_date, end_date, granularity)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    filters = {"start_date": start_date, "end_date": end_date, "company_id": company_id, "company_email": company_email}
+    rows = snapshot_rows("trend", granularity, **filters)
+    if rows is None:
+        where, params = build_ticket_filters(**filters)
+        query = daily_rollup.trend_query(where, granularity) or compile_trend_query(where, granularity, DB_DIALECT)
+        sql_log.debug("trends query", extra={"sql": query, "params": params})
+
+        conn = get_db_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.execute(query, tuple(params))
+            rows = cursor.fetchall()
+            cursor.close()
+        finally:
+            conn.close()
+
+    with metrics.phase("aggregate"):
+        trends = build_trends(rows, start_date, end_date, granularity)
+    return jsonify(trends)
+
+def execute_batch(conn, statements):
+    """Run several (sql, params) SELECTs and return a list of row lists.
+
+    On SQL Server the statements go out as one batch (one round trip) and the result sets are
+    read with nextset(); other dialects run them one after another on the same connection.
+    """
     cursor = conn.cursor()
+    try:
+        if DB_DIALECT == "mssql" and len(statements) > 1:
+            sql = ";\n".join(stmt for stmt, _ in statements)
+            params = [p for _, stmt_params in statements for p in stmt_params]
+            cursor.execute(sql, tuple(params))
+            results = [cursor.fetchall()]
+            while len(results) < len(statements) and cursor.nextset():
+                results.append(cursor.fetchall())
+            return results
+        results = []
+        for stmt, stmt_params in statements:
+            cursor.execute(stmt, tuple(stmt_params))
+            results.append(cursor.fetchall())
+        return results
+    finally:
+        cursor.close()
 
-    # Build query with optional filters
-    query = "SELECT Ticket_Creation_Date, Ticket_Status FROM Chatbot_Transaction"
-    params = []
-    if company_id:
-        query += " WHERE TRIM(Company_ID) = TRIM(?)"
-        params.append(company_id)
-        if company_email:
-            query += " AND TRIM(Company_Email) = TRIM(?)"
-            params.append(company_email)
-    elif company_email:
-        # company_id not provided but email is — filter by email only
-        query += " WHERE TRIM(Company_Email) = TRIM(?)"
-        params.append(company_email)
-
-    print(f"📌 /api/monthly-trends SQL: {query} | params: {params}")
-    if params:
-        cursor.execute(query, tuple(params))
-    else:
-        cursor.execute(query)
 
-    rows = cursor.fetchall()
-    conn.close()
+def stats_groups_from_chart_rows(rows, specs=CHART_SPECS):
+    """Derive {status: (count, day_open_sum)} from chart groups that carry DASHBOARD_MEASURES."""
+    dims = chart_dimensions(specs)
+    status_index = dims.index("Ticket_Status")
+    sum_index = len(dims)
+    groups = {}
+    for row in rows:
+        count, day_sum = groups.get(row[status_index], (0, 0))
+        groups[row[status_index]] = (count + row[-1], day_sum + (row[sum_index] or 0))
+    return groups
 
-    trend_data = {}
-    for Ticket_Creation_Date, Ticket_Status in rows:
-        if Ticket_Status not in trend_data:
-            trend_data[Ticket_Status] = {}
-        trend_data[Ticket_Status][Ticket_Creation_Date] = trend_data[Ticket_Status].get(Ticket_Creation_Date, 0) + 1
 
-    labels = sorted(list(set([date.strftime('%a, %d %b %Y') for date, _ in rows])))
+# Extra aggregate carried by the dashboard chart query so stats come from the same scan
+DASHBOARD_MEASURES = ["SUM(COALESCE(Ticket_Day_Open, 0))"]
 
-    datasets = []
-    colors = {"Open": "red", "Resolved": "green", "Pending": "orange", "Closed": "blue"}
 
-    for status, date_counts in trend_data.items():
-        data = [date_counts.get(label, 0) for label in labels]
-        datasets.append({
-            "label": status,
-            "data": data,
-            "borderColor": colors.get(status, "gray"),
-            "backgroundColor": colors.get(status, "gray"),
-            "fill": False
-        })
+@app.route('/api/dashboard', methods=['GET'])
+@response_cache.cached('dashboard', cache_ttl('dashboard'))
+def get_dashboard():
+    """Stats, charts and trends for one filter set in a single response.
+
+    Query parameters (all optional): date ("start AND end") or start_date/end_date (all history
+    if none), days (the last N days), product (or Product_Name), company (or Company_Name), Company_ID, Company_Email, granularity.
+    Each section matches product and company names like its own endpoint: exactly for charts
+    and trends, as substrings for stats (/api/stats), so the numbers agree.
+
+    When both matchings resolve to the same names (the usual case), stats are rolled up from
+    the chart groups (one scan for both); otherwise they take their own grouped query. The chart and trends
+    queries run concurrently on two pooled connections, so a dashboard load costs one request
+    and the time of the slower query; with QUERY_FANOUT_MAX_PARALLEL=1 they go out as one
+    batch on a single connection instead.
+    """
+    args = request.args
+    product = args.get('product') or args.get('Product_Name')
+    company = args.get('company') or args.get('Company_Name')
+    company_id = args.get('Company_ID') or args.get('company_id')
+    company_email = args.get('Company_Email') or args.get('company_email')
+    granularity = (args.get('granularity') or 'day').strip().lower()
+
+    try:
+        start_date, end_date = parse_date_range(args)
+        if start_date and end_date:
+            bucket_range(start_date, end_date, granularity)
+        products = resolve_names("products", product)
+        companies = resolve_names("companies", company)
+        stats_products = resolve_names("products", product, substring=True)
+        stats_companies = resolve_names("companies", company, substring=True)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    chart_filters = dict(start_date=start_date, end_date=end_date, products=products, companies=companies,
+                         company_id=company_id, company_email=company_email)
+    stats_filters = dict(chart_filters, products=stats_products, companies=stats_companies)
+    stats_from_charts = (same_names(products, stats_products) and same_names(companies, stats_companies))
+    chart_rows = snapshot_rows("chart", CHART_SPECS, DASHBOARD_MEASURES, **chart_filters)
+    trend_rows = snapshot_rows("trend", granularity, **chart_filters)
+
+    if chart_rows is None or trend_rows is None:
+        where, params = build_ticket_filters(**chart_filters)
+        statements = [
+            (daily_rollup.chart_query(where, CHART_SPECS, DASHBOARD_MEASURES)
+             or compile_chart_query(where, CHART_SPECS, measures=DASHBOARD_MEASURES), params),
+            (daily_rollup.trend_query(where, granularity)
+             or compile_trend_query(where, granularity, DB_DIALECT), params),
+        ]
+        sql_log.debug("dashboard batch", extra={"statements": statements})
+
+        if query_fanout.max_parallel > 1:
+            chart_rows, trend_rows = query_fanout.run(statements)
+        else:
+            conn = get_db_connection()
+            try:
+                chart_rows, trend_rows = execute_batch(conn, statements)
+            finally:
+                conn.close()
+
+    status_groups = None if stats_from_charts else fetch_stats_groups(stats_filters)
+
+    with metrics.phase("aggregate"):
+        if status_groups is None:
+            status_groups = stats_groups_from_chart_rows(chart_rows)
+        payload = {
+            "stats": build_stats_payload(status_groups),
+            "charts": build_charts(chart_rows) if chart_rows else [],
+            "trends": build_trends(trend_rows, start_date, end_date, granularity),
+        }
+    return jsonify(payload)
 
-    return jsonify({"labels": labels, "datasets": datasets})
 
 # CREATE - Add New Employee
 @app.route('/api/employees', methods=['POST'])
@@ -496,6 +789,7 @@ def create_employee():
             VALUES (?, ?, ?, ?, ?)
         """, tuple(data[field] for field in required_fields))
         conn.commit()
+        employees_written([data['Emp_ID']])
         return jsonify({"message": "✅ Employee added successfully!"}), 201
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -503,9 +797,97 @@ def create_employee():
         conn.close()
 
 
+# Most rows accepted by one bulk employee import
+EMPLOYEE_IMPORT_MAX_ROWS = int(os.getenv("EMPLOYEE_IMPORT_MAX_ROWS", "20000"))
+
+
+# CREATE / UPDATE - Bulk import employees
+@app.route('/api/employees/bulk', methods=['POST'])
+def import_employees():
+    """Insert new and update existing employees from a JSON array or a CSV upload.
+
+    Body: a JSON array (or {"employees": [...]}) of Chatbot_Emp rows; or CSV with a header
+    row, sent as text/csv or as a multipart file field "file". Query parameter dry_run=1
+    validates without writing.
+
+    Rows are validated up front. Invalid rows are reported and skipped; the valid ones are
+    applied in one transaction with a single set-based upsert (see employee_import.py). On
+    update, missing or empty values keep the stored value.
+    """
+    try:
+        if request.files.get('file') is not None:
+            parsed = employee_import.parse_csv_rows(request.files['file'].read().decode('utf-8-sig'))
+        elif request.is_json:
+            parsed = employee_import.parse_json_rows(request.get_json(silent=True))
+        elif request.mimetype in ('text/csv', 'application/csv', 'text/plain'):
+            parsed = employee_import.parse_csv_rows(request.get_data(as_text=True).lstrip('\ufeff'))
+        else:
+            return jsonify({"error": "Send a JSON array, text/csv, or a multipart 'file' upload"}), 400
+    except (ValueError, UnicodeDecodeError, csv.Error) as e:
+        return jsonify({"error": str(e)}), 400
+    if not parsed:
+        return jsonify({"error": "No employees provided"}), 400
+    if len(parsed) > EMPLOYEE_IMPORT_MAX_ROWS:
+        return jsonify({"error": f"At most {EMPLOYEE_IMPORT_MAX_ROWS} employees per import"}), 400
+    dry_run = (request.args.get('dry_run') or '').strip().lower() in ('1', 'true', 'yes')
+
+    conn = get_db_connection()
+    try:
+        cursor = conn.cursor()
+        normalised = employee_import.normalise_rows(parsed)
+        emp_ids = employee_import.emp_ids(normalised)
+        existing = employee_import.existing_emp_ids(cursor, emp_ids) if emp_ids else set()
+        valid, results = employee_import.validate(normalised, existing)
+        if valid and not dry_run:
+            employee_import.upsert(cursor, valid, DB_DIALECT)
+            conn.commit()
+    except Exception as e:
+        try:
+            conn.rollback()
+        except Exception:
+            pass
+        log.error("Employee import failed: %s", e, exc_info=True)
+        return jsonify({"error": str(e)}), 500
+    finally:
+        conn.close()
+
+    if valid and not dry_run:
+        employees_written([values["Emp_ID"] for _, values in valid])
+
+    summary = {
+        "inserted": sum(1 for r in results if r["status"] == "insert"),
+        "updated": sum(1 for r in results if r["status"] == "update"),
+        "invalid": sum(1 for r in results if r["status"] == "invalid"),
+        "dry_run": dry_run,
+        "results": results,
+    }
+    return jsonify(summary), 200 if valid else 400
+
+
 
 
 
+def stream_ticket_rows(conn, cursor, fields, batch_size=500):
+    """Yield the ticket list as a JSON array, `batch_size` rows at a time from fetchmany()."""
+    try:
+        convert = row_converter(cursor.description)
+        yield "["
+        first = True
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            chunk = []
+            for row in rows:
+                chunk.append(app.json.dumps(dict(zip(fields, convert(row)))))
+            yield ("" if first else ",") + ",".join(chunk)
+            first = False
+        yield "]"
+    finally:
+        cursor.close()
+        conn.close()
+
+
 # READ - Get tickets filtered by Company_ID and Company_Email
 @app.route('/api/tickets', methods=['GET'])
 def get_tickets_by_company():
@@ -514,6 +896,15 @@ def get_tickets_by_company():
     Query parameters (required):
       - company_id (or Company_ID)
       - company_email (or Company_Email)
+
+    Optional:
+      - fields: comma-separated projection, e.g. fields=Uniqueid,Ticket_No,Ticket_Status
+        (skip Ticket_Details for list views)
+      - limit and/or cursor: keyset pagination on (Ticket_Creation_Date, Uniqueid). The response
+        becomes {"items": [...], "next": <cursor or null>}; pass `next` back as `cursor`.
+      - stream=1: stream the (remaining) list as a JSON array while rows come off the cursor.
+
+    Without limit/cursor/stream the full list is returned as a JSON array, as before.
     """
     # Accept either lowercase or uppercase query parameter names for convenience
     company_id = request.args.get('company_id') or request.args.get('Company_ID')
@@ -522,60 +913,87 @@ def get_tickets_by_company():
     if not company_id or not company_email:
         return jsonify({"error": "Missing required query parameters: company_id and company_email"}), 400
 
+    stream = (request.args.get('stream') or '').strip().lower() in ('1', 'true', 'yes')
+    raw_cursor = request.args.get('cursor')
+    paged = not stream and (request.args.get('limit') is not None or raw_cursor is not None)
+    try:
+        fields = parse_fields(request.args.get('fields'))
+        limit = parse_page_size(request.args.get('limit')) if paged else None
+        after = decode_cursor(raw_cursor) if raw_cursor else None
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    where, params = build_ticket_filters(company_id=company_id, company_email=company_email)
+    # One extra row tells us whether there is a next page
+    query, params = compile_ticket_query(where, params, fields, after,
+                                         limit + 1 if limit else None, DB_DIALECT)
+
     conn = get_db_connection()
     if conn is None:
         return jsonify({"error": "Database connection failed"}), 500
 
     try:
         cursor = conn.cursor()
-        query = (
-            "SELECT Uniqueid, Ticket_No, Ticket_Category, Ticket_Details,"
-            " Ticket_Creation_Date, Ticket_Closing_Date, Ticket_Priority,"
-            " Ticket_Status, Ticket_Day_Open"
-            " FROM Chatbot_Transaction"
-            " WHERE Company_ID = ? AND Company_Email = ?"
-            " ORDER BY Ticket_Creation_Date DESC"
-        )
-        print(f"📌 /api/tickets SQL: {query} | params: ({company_id}, {company_email})")
-        cursor.execute(query, (company_id, company_email))
+        sql_log.debug("tickets query", extra={"sql": query, "params": params})
+        cursor.execute(query, tuple(params))
+        if stream:
+            # The generator owns the connection from here and returns it when done
+            response = Response(stream_ticket_rows(conn, cursor, fields), mimetype=app.json.mimetype)
+            conn = None
+            return response
+
         rows = cursor.fetchall()
 
-        # Build result using cursor.description for column names
-        columns = [col[0] for col in cursor.description] if cursor.description else []
-        results = []
-        for row in rows:
-            item = {}
-            for idx, col in enumerate(columns):
-                val = row[idx]
-                # convert dates to ISO format strings for JSON serializable
-                # convert Decimal to int/float for JSON serializable
-                if isinstance(val, decimal.Decimal):
-                    try:
-                        # if value is whole number, convert to int, else float
-                        if val == val.to_integral_value():
-                            val = int(val)
-                        else:
-                            val = float(val)
-                    except Exception:
-                        val = float(val)
-                if isinstance(val, (datetime.date, datetime.datetime)):
-                    try:
-                        val = val.isoformat()
-                    except Exception:
-                        val = str(val)
-                item[col] = val
-            results.append(item)
+        next_cursor = None
+        if paged and len(rows) > limit:
+            rows = rows[:limit]
+            columns = selected_columns(fields)
+            last = rows[-1]
+            next_cursor = encode_cursor(last[columns.index("Ticket_Creation_Date")], last[columns.index("Uniqueid")])
+
+        # Key columns selected only for the cursor are dropped by zip() against `fields`
+        results = rows_to_dicts(cursor, rows, fields)
 
+        cursor.close()
+        if paged:
+            return jsonify({"items": results, "next": next_cursor, "limit": limit}), 200
         return jsonify(results), 200
     except Exception as e:
-        logging.error(f"Error fetching tickets: {e}", exc_info=True)
+        log.error("Error fetching tickets: %s", e, exc_info=True)
         return jsonify({"error": str(e)}), 500
     finally:
-        conn.close()
+        if conn is not None:
+            conn.close()
 
 
 
 
+def comments_from_body(data):
+    """Non-empty comment strings from a JSON body with `comment` (string) or `comments` (list)."""
+    raw_comment = data.get('comment')
+    raw_comments = data.get('comments')
+    new_comments = []
+    if raw_comments is not None:
+        if not isinstance(raw_comments, (list, tuple)):
+            raise ValueError("Field 'comments' must be a list of strings")
+        new_comments = [str(c).strip() for c in raw_comments if c and str(c).strip()]
+    elif raw_comment is not None:
+        if not isinstance(raw_comment, (str,)):
+            # allow numbers etc by converting to str
+            raw_comment = str(raw_comment)
+        raw_comment = raw_comment.strip()
+        if raw_comment:
+            new_comments = [raw_comment]
+    if not new_comments:
+        raise ValueError("No comment(s) provided")
+    return new_comments
+
+
+def ticket_matches_company(ticket, company_id, company_email):
+    return (str(ticket[2] or "").strip() == str(company_id).strip()
+            and str(ticket[3] or "").strip() == str(company_email).strip())
+
+
 @app.route('/api/get-comments', methods=['GET'])
 def get_comments():
     """Return Comments (CSV string) for a ticket identified by Ticket_No.
@@ -584,40 +1002,37 @@ def get_comments():
       - ticket_no or Ticket_No or uniqueid (required)
 
     Returns JSON: { "Ticket_No": <ticket_no>, "Comments": "comma,separated,values" }
+    Kept for compatibility; /api/tickets/<uniqueid>/comments pages through the comments instead.
     """
     ticket_no = request.args.get('ticket_no') or request.args.get('Ticket_No') or request.args.get('uniqueid') or request.args.get('UniqueId')
     if not ticket_no:
         return jsonify({"error": "Missing required query parameter: ticket_no (or Ticket_No/uniqueid)"}), 400
 
-    conn = get_db_connection()
-    if conn is None:
-        return jsonify({"error": "Database connection failed"}), 500
-
+    conn = None
     try:
+        comment_store.ensure_ready()
+        conn = get_db_connection()
         cursor = conn.cursor()
-        cursor.execute("SELECT Comment FROM Chatbot_Transaction WHERE Ticket_No = ?", (ticket_no,))
-        row = cursor.fetchone()
-        if not row:
+        ticket = comment_store.find_ticket_by_number(cursor, ticket_no)
+        if not ticket:
             return jsonify({"message": "No record found for given Ticket_No"}), 404
+        if comment_store.migrate_tickets(cursor, [ticket[0]]):
+            conn.commit()
 
-        comments = row[0] or ""
-
-        # Normalize whitespace around commas
-        parts = [p.strip() for p in comments.split(',') if p and p.strip()]
-        csv = ",".join(parts)
-
+        csv = join_csv(comment_store.all_texts(cursor, ticket[0]))
         return jsonify({"Ticket_No": ticket_no, "Comments": csv}), 200
     except Exception as e:
-        logging.error(f"Error fetching comments for Ticket_No {ticket_no}: {e}", exc_info=True)
+        log.error("Error fetching comments for Ticket_No %s: %s", ticket_no, e, exc_info=True)
         return jsonify({"error": str(e)}), 500
     finally:
-        conn.close()
+        if conn is not None:
+            conn.close()
 
 
-# UPDATE - Add comment(s) to Comment column for a ticket
+# UPDATE - Add comment(s) to a ticket
 @app.route('/api/comments', methods=['PUT'])
 def add_comments():
-    """Append comment(s) to the Comment column for a ticket matching company and ticket id.
+    """Append comment(s) to a ticket matching company and ticket id.
 
     Expected JSON body (either-case keys accepted):
       - company_id or Company_ID (required)
@@ -626,9 +1041,11 @@ def add_comments():
       - comment (string) or comments (list of strings) (required)
 
         Behavior:
-            - Fetches existing `Comment` value (CSV string); if found, appends new comment(s) (sanitized).
-            - If no existing comment is found, adds the single comment provided in the input parameter.
-            - Updates the row and returns the updated CSV string.
+            - If the ticket already has comments, all new comment(s) are appended (commas become ';').
+            - If it has none, only the first comment provided is added.
+            - Returns every comment of the ticket as a CSV string, as before.
+
+    Comments are rows in the comments table (see comments.py), so an append is one INSERT.
     """
     data = request.get_json() or {}
 
@@ -637,157 +1054,305 @@ def add_comments():
     ticket_no = data.get('ticket_no') or data.get('Ticket_No') 
     uniqueid = data.get('uniqueid') or data.get('Uniqueid')
 
-    # Accept either single comment string or list of comments
-    raw_comment = data.get('comment')
-    raw_comments = data.get('comments')
-
     if not company_id or not company_email or not ticket_no or not uniqueid:
         return jsonify({"error": "Missing required fields: company_id, company_email and ticket_no/uniqueid"}), 400
 
-    # Build list of new comments
-    new_comments = []
-    if raw_comments is not None:
-        if not isinstance(raw_comments, (list, tuple)):
-            return jsonify({"error": "Field 'comments' must be a list of strings"}), 400
-        new_comments = [str(c).strip() for c in raw_comments if c and str(c).strip()]
-    elif raw_comment is not None:
-        if not isinstance(raw_comment, (str,)):
-            # allow numbers etc by converting to str
-            raw_comment = str(raw_comment)
-        raw_comment = raw_comment.strip()
-        if raw_comment:
-            new_comments = [raw_comment]
-
-    if not new_comments:
-        return jsonify({"error": "No comment(s) provided"}), 400
+    try:
+        new_comments = comments_from_body(data)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
 
-    # Sanitize comments: replace any commas to avoid breaking CSV storage
+    # Sanitize comments: replace any commas so the CSV response stays unambiguous
     sanitized = [c.replace(',', ';').strip() for c in new_comments]
 
-    conn = get_db_connection()
-    if conn is None:
-        return jsonify({"error": "Database connection failed"}), 500
+    # Normalize inputs (convert to str and strip whitespace)
+    company_id = str(company_id).strip()
+    company_email = str(company_email).strip()
+    ticket_no = str(ticket_no).strip()
 
+    conn = None
     try:
+        comment_store.ensure_ready()
+        conn = get_db_connection()
         cursor = conn.cursor()
 
-        # Normalize inputs (convert to str and strip whitespace)
-        company_id = str(company_id).strip()
-        company_email = str(company_email).strip()
-        ticket_no = str(ticket_no).strip()
-
-        # Parse uniqueid: Uniqueid column is integer in DB; accept int or numeric string from client
-        uniqueid_raw = uniqueid
-        uniqueid_int = None
-        try:
-            uniqueid_int = int(uniqueid_raw)
-            uniqueid_param = uniqueid_int
-        except Exception:
-            # fallback to string form if not an int
-            uniqueid_param = str(uniqueid_raw).strip()
-
-        # Attempt 1: exact match using Uniqueid as-is (int if parsed, else string)
-        sql_exact = (
-            "SELECT Comment FROM Chatbot_Transaction "
-            "WHERE Company_ID = ? AND Company_Email = ? AND Ticket_No = ? AND Uniqueid = ?"
-        )
-        print(f"Executing SQL (exact): {sql_exact} | params: ({company_id},{company_email},{ticket_no},{uniqueid_param})")
-        cursor.execute(sql_exact, (company_id, company_email, ticket_no, uniqueid_param))
-        row = cursor.fetchone()
-
-        # Attempt 2: trimmed-columns equality (handles stored values with stray spaces)
-        if not row:
-            # Use CAST/CONVERT to compare Uniqueid when it's stored as an integer
-            sql_trim = (
-                "SELECT Comment FROM Chatbot_Transaction "
-                "WHERE TRIM(Company_ID) = TRIM(?) AND TRIM(Company_Email) = TRIM(?) "
-                "AND TRIM(Ticket_No) = TRIM(?) AND TRIM(CONVERT(VARCHAR(50), Uniqueid)) = TRIM(?)"
-            )
-            print(f"Attempting SQL (trim): {sql_trim} | params: ({company_id},{company_email},{ticket_no},{uniqueid_param})")
-            cursor.execute(sql_trim, (company_id, company_email, ticket_no, str(uniqueid_param)))
-            row = cursor.fetchone()
-
-        # Attempt 3: fallback to Ticket_No only (in case Company_ID/Email don't exactly match)
-        fallback_used = False
-        if not row:
-            # Fallback: match by Ticket_No and Uniqueid (convert Uniqueid to varchar for trim comparison)
-            sql_ticket_only = (
-                "SELECT Comment, Company_ID, Company_Email FROM Chatbot_Transaction "
-                "WHERE TRIM(Ticket_No) = TRIM(?) AND TRIM(CONVERT(VARCHAR(50), Uniqueid)) = TRIM(?)"
-            )
-            print(f"Attempting SQL (ticket only): {sql_ticket_only} | params: ({ticket_no},{uniqueid_param})")
-            cursor.execute(sql_ticket_only, (ticket_no, str(uniqueid_param)))
-            row = cursor.fetchone()
-            if row:
-                fallback_used = True
-
-        if not row:
+        # One primary-key seek; Ticket_No must match, Company_ID/Email mismatches are only logged
+        ticket = comment_store.find_ticket(cursor, uniqueid)
+        if not ticket or str(ticket[1] or "").strip() != ticket_no:
             return jsonify({
                 "error": "No matching record found for given identifiers",
                 "tried": {
                     "company_id": company_id,
                     "company_email": company_email,
                     "ticket_no": ticket_no,
-                    "uniqueid": uniqueid_raw
+                    "uniqueid": uniqueid
                 }
             }), 404
+        if not ticket_matches_company(ticket, company_id, company_email):
+            log.warning("Fallback match by Ticket_No used. DB Company_ID=%s, Company_Email=%s", ticket[2], ticket[3])
 
-        # If ticket-only query returned extra columns, handle accordingly
-        if fallback_used:
-            # row contains (Comment, Company_ID, Company_Email)
-            existing = row[0] or ""
-            logging.warning(f"Fallback match by Ticket_No used. DB Company_ID={row[1]}, Company_Email={row[2]}")
-        else:
-            existing = row[0] or ""
-        parts = [p.strip() for p in existing.split(',') if p and p.strip()]
-
-        # Behavior change: if existing comments found, append all sanitized comments;
-        # if no existing comment, add only a single comment (the first one provided).
-        if parts:
-            # existing comments present -> append all sanitized comments
-            parts.extend(sanitized)
-        else:
+        comment_store.migrate_tickets(cursor, [ticket[0]])
+        if not comment_store.has_comments(cursor, ticket[0]):
             # no existing comments -> add only the first sanitized comment
-            parts = [sanitized[0]] if sanitized else []
-
-        updated_csv = ",".join(parts)
-
-        sql_update = (
-            "UPDATE Chatbot_Transaction SET Comment = ? "
-            "WHERE Company_ID = ? AND Company_Email = ? AND Ticket_No = ? AND Uniqueid = ?"
-        )
-        params_update = (updated_csv, company_id, company_email, ticket_no, uniqueid_param)
-        print(f"📌 Executing UPDATE SQL: {sql_update} | params: {params_update}")
-        cursor.execute(sql_update, params_update)
+            sanitized = sanitized[:1]
+        comment_store.append(cursor, ticket, sanitized)
         conn.commit()
 
         return jsonify({
             "Ticket_No": ticket_no,
-            "Comments": updated_csv,
+            "Comments": join_csv(comment_store.all_texts(cursor, ticket[0])),
             "added": sanitized
         }), 200
     except Exception as e:
-        logging.error(f"Error updating comments for Ticket_No {ticket_no}: {e}", exc_info=True)
+        log.error("Error updating comments for Ticket_No %s: %s", ticket_no, e, exc_info=True)
         return jsonify({"error": str(e)}), 500
     finally:
-        conn.close()
+        if conn is not None:
+            conn.close()
 
 
+def company_ticket(cursor, uniqueid, args):
+    """The ticket `uniqueid` if it belongs to the Company_ID/Company_Email in `args`, else an error response."""
+    company_id = args.get('company_id') or args.get('Company_ID')
+    company_email = args.get('company_email') or args.get('Company_Email')
+    if not company_id or not company_email:
+        return None, (jsonify({"error": "Missing required parameters: company_id and company_email"}), 400)
+    ticket = comment_store.find_ticket(cursor, uniqueid)
+    if not ticket or not ticket_matches_company(ticket, company_id, company_email):
+        return None, (jsonify({"error": "No matching ticket for given company"}), 404)
+    return ticket, None
+
+
+# READ - Comments of a ticket, newest first, one page at a time
+@app.route('/api/tickets/<int:uniqueid>/comments', methods=['GET'])
+def list_ticket_comments(uniqueid):
+    """Query parameters: company_id, company_email (required); limit (default 50, max 500);
+    before: the `next_before` value of the previous page.
+
+    Returns { "Uniqueid", "Ticket_No", "comments": [{"id", "comment", "created_at"}], "next_before" }.
+    """
+    try:
+        limit = parse_comment_page_size(request.args.get('limit'))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    try:
+        before = int(request.args['before']) if request.args.get('before') else None
+    except ValueError:
+        return jsonify({"error": "before must be an integer"}), 400
+
+    conn = None
+    try:
+        comment_store.ensure_ready()
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        ticket, error = company_ticket(cursor, uniqueid, request.args)
+        if error:
+            return error
+        if comment_store.migrate_tickets(cursor, [ticket[0]]):
+            conn.commit()
+        rows, next_before = comment_store.page(cursor, ticket[0], limit, before)
+        return jsonify({
+            "Uniqueid": ticket[0],
+            "Ticket_No": ticket[1],
+            "comments": [{"id": cid, "comment": text, "created_at": created} for cid, text, created in rows],
+            "next_before": next_before,
+        }), 200
+    except Exception as e:
+        log.error("Error listing comments for ticket %s: %s", uniqueid, e, exc_info=True)
+        return jsonify({"error": str(e)}), 500
+    finally:
+        if conn is not None:
+            conn.close()
+
+
+# CREATE - Append comment(s) to a ticket
+@app.route('/api/tickets/<int:uniqueid>/comments', methods=['POST'])
+def append_ticket_comments(uniqueid):
+    """JSON body: company_id, company_email, and comment (string) or comments (list of strings).
+
+    Comments are stored as given (commas included) with one INSERT. Returns 201 with the added comments.
+    """
+    data = request.get_json(silent=True) or {}
+    try:
+        texts = comments_from_body(data)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    conn = None
+    try:
+        comment_store.ensure_ready()
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        ticket, error = company_ticket(cursor, uniqueid, data)
+        if error:
+            return error
+        comment_store.migrate_tickets(cursor, [ticket[0]])
+        comment_store.append(cursor, ticket, texts)
+        conn.commit()
+        return jsonify({"Uniqueid": ticket[0], "Ticket_No": ticket[1], "added": texts}), 201
+    except Exception as e:
+        log.error("Error adding comments to ticket %s: %s", uniqueid, e, exc_info=True)
+        return jsonify({"error": str(e)}), 500
+    finally:
+        if conn is not None:
+            conn.close()
+
+
+
+# Most items accepted by one bulk comment request
+COMMENTS_BULK_MAX_ITEMS = int(os.getenv("COMMENTS_BULK_MAX_ITEMS", "1000"))
+
+
+# CREATE - Append comments to many tickets in one request
+@app.route('/api/comments/bulk', methods=['POST'])
+def add_comments_bulk():
+    """Append comments to many tickets at once.
+
+    JSON body: {"items": [{company_id, company_email, ticket_no, uniqueid, comment | comments}, ...]}
+    (either-case keys accepted, at most COMMENTS_BULK_MAX_ITEMS items).
+
+    All tickets are looked up with set-based IN queries. Every append then goes into one
+    transaction as multi-row INSERTs, so 500 tickets cost a handful of round trips. Each
+    item must match its ticket's Ticket_No, Company_ID and Company_Email; comments are
+    stored as given. The response lists one result per item, in request order, with
+    status "added", "not_found" or "invalid".
+    """
+    data = request.get_json(silent=True) or {}
+    items = data.get('items')
+    if not isinstance(items, list) or not items:
+        return jsonify({"error": "Field 'items' must be a non-empty list"}), 400
+    if len(items) > COMMENTS_BULK_MAX_ITEMS:
+        return jsonify({"error": f"At most {COMMENTS_BULK_MAX_ITEMS} items per request"}), 400
+
+    results = []
+    pending = []
+    for index, item in enumerate(items):
+        if not isinstance(item, dict):
+            results.append({"index": index, "status": "invalid", "error": "Item must be an object"})
+            continue
+        company_id = item.get('company_id') or item.get('Company_ID')
+        company_email = item.get('company_email') or item.get('Company_Email')
+        ticket_no = item.get('ticket_no') or item.get('Ticket_No')
+        uniqueid = item.get('uniqueid') or item.get('Uniqueid')
+        result = {"index": index, "uniqueid": uniqueid}
+        results.append(result)
+        if not company_id or not company_email or not ticket_no or uniqueid is None:
+            result.update(status="invalid", error="Missing required fields: company_id, company_email, ticket_no and uniqueid")
+            continue
+        try:
+            uniqueid = int(uniqueid)
+        except (TypeError, ValueError):
+            result.update(status="invalid", error="uniqueid must be an integer")
+            continue
+        try:
+            texts = comments_from_body(item)
+        except ValueError as e:
+            result.update(status="invalid", error=str(e))
+            continue
+        pending.append((result, uniqueid, str(ticket_no).strip(), company_id, company_email, texts))
+
+    conn = None
+    try:
+        if pending:
+            comment_store.ensure_ready()
+            conn = get_db_connection()
+            cursor = conn.cursor()
+            tickets = comment_store.find_tickets(cursor, [p[1] for p in pending])
+            rows = []
+            for result, uniqueid, ticket_no, company_id, company_email, texts in pending:
+                ticket = tickets.get(uniqueid)
+                if (not ticket or str(ticket[1] or "").strip() != ticket_no
+                        or not ticket_matches_company(ticket, company_id, company_email)):
+                    result.update(status="not_found", error="No matching ticket for given identifiers")
+                    continue
+                rows.extend(ticket + (text,) for text in texts)
+                result.update(status="added", added=len(texts))
+            if rows:
+                comment_store.migrate_tickets(cursor, [row[0] for row in rows])
+                comment_store.append_rows(cursor, rows)
+                conn.commit()
+    except Exception as e:
+        log.error("Error in bulk comment append: %s", e, exc_info=True)
+        return jsonify({"error": str(e)}), 500
+    finally:
+        if conn is not None:
+            conn.close()
+
+    added = sum(r.get("added", 0) for r in results)
+    failed = sum(1 for r in results if r["status"] != "added")
+    return jsonify({"results": results, "comments_added": added, "items_failed": failed}), 200
+
 
 # READ - Get All Employees
 @app.route('/api/getemployees', methods=['GET'])
 def get_all_employees():
+    """Return employees without their Password.
+
+    Optional query parameters:
+      - fields: comma-separated projection, e.g. fields=Emp_ID,Emp_Name,Role
+      - company_id, role, department_id: exact-match filters
+      - q: prefix search on Emp_Name or Email_Id
+      - limit with cursor or offset: pages ordered by Emp_ID. The response becomes
+        {"items": [...], "next": <cursor or null>, "limit": n}; pass `next` back as `cursor`
+        (an index seek), or use offset for numbered pages.
+
+    Without limit/cursor/offset the full (filtered) list is returned as a JSON array, as before.
+    The unfiltered full list is served from the employee directory; everything else is one SQL query.
+    """
+    raw_cursor = request.args.get('cursor')
+    paged = any(request.args.get(name) is not None for name in ('limit', 'cursor', 'offset'))
+    try:
+        fields = employee_list.parse_fields(request.args.get('fields'))
+        limit = employee_list.parse_page_size(request.args.get('limit')) if paged else None
+        offset = employee_list.parse_offset(request.args.get('offset'))
+        after = employee_list.decode_cursor(raw_cursor) if raw_cursor else None
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    if after is not None and offset is not None:
+        return jsonify({"error": "Use either cursor or offset, not both"}), 400
+
+    filters = {}
+    for name, column in employee_list.FILTER_COLUMNS:
+        value = normalise_choice(request.args.get(name) or request.args.get(column))
+        if value is not None:
+            filters[column] = value
+    search = (request.args.get('q') or '').strip()
+
+    if not paged and not filters and not search:
+        try:
+            return jsonify([{f: e.get(f) for f in fields} for e in employee_directory.all()]), 200
+        except Exception as e:
+            log.warning("Employee directory unavailable, listing employees from SQL: %s", e)
+
+    where, params = employee_list.build_employee_filters(filters, search, DB_DIALECT)
+    # One extra row tells us whether there is a next page
+    query, params = employee_list.compile_employee_query(where, params, fields, after,
+                                                         limit + 1 if limit else None, offset, DB_DIALECT)
+
     conn = get_db_connection()
     if conn is None:
         return jsonify({"error": "Database connection failed"}), 500
 
     try:
         cursor = conn.cursor()
-        cursor.execute("SELECT * FROM Chatbot_Emp")
-        columns = [column[0] for column in cursor.description]
-        employees = [dict(zip(columns, row)) for row in cursor.fetchall()]
+        sql_log.debug("employees query", extra={"sql": query, "params": params})
+        cursor.execute(query, tuple(params))
+        rows = cursor.fetchall()
+
+        next_cursor = None
+        if paged and len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = employee_list.encode_cursor(
+                rows[-1][employee_list.selected_columns(fields).index(employee_list.KEY_FIELD)])
+
+        # The key column selected only for the cursor is dropped by zip() against `fields`
+        employees = rows_to_dicts(cursor, rows, fields)
+        cursor.close()
+        if paged:
+            return jsonify({"items": employees, "next": next_cursor, "limit": limit}), 200
         return jsonify(employees), 200
     except Exception as e:
+        log.error("Error fetching employees: %s", e, exc_info=True)
         return jsonify({"error": str(e)}), 500
     finally:
         conn.close()
@@ -822,6 +1387,7 @@ def update_employee(emp_id):
         conn.commit()
         if cursor.rowcount == 0:
             return jsonify({"message": f"No employee found with Emp_ID {emp_id}"}), 404
+        employees_written([emp_id])
         return jsonify({"message": "✅ Employee updated successfully!"}), 200
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -842,6 +1408,7 @@ def delete_employee(emp_id):
         conn.commit()
         if cursor.rowcount == 0:
             return jsonify({"message": f"No employee found with Emp_ID {emp_id}"}), 404
+        employees_written([emp_id], deleted=True)
         return jsonify({"message": "🗑️ Employee deleted successfully!"}), 200
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -863,6 +1430,16 @@ def token_required(f):
             current_user = {'Emp_ID': data['Emp_ID'], 'Role': data['Role']}
         except:
             return jsonify({'message': 'Token is invalid!'}), 401
+        # The current role comes from the employee directory, so a role change or a deleted
+        # employee takes effect before the token expires; the token's role is the fallback.
+        try:
+            employee = employee_directory.by_emp_id(current_user['Emp_ID'])
+        except Exception as e:
+            auth_log.warning("Employee directory unavailable, using the token's role: %s", e)
+        else:
+            if employee is None:
+                return jsonify({'message': 'Token is invalid!'}), 401
+            current_user['Role'] = employee.get('Role')
         return f(current_user, *args, **kwargs)
     return decorated
 
@@ -874,68 +1451,96 @@ def protected_route(current_user):
 # READ - Get Employee by Email and Password
 @app.route('/api/auth/login', methods=['POST'])
 def login():
-    # --- Enhanced Debugging ---
-    print(f"--- Login Request Received ---")
-    print(f"Request Headers: {request.headers}")
-    
+    # Never log request headers, bodies or passwords here: they carry credentials.
     if not request.is_json:
-        logging.warning("Request is not JSON. Body might be empty or have wrong Content-Type.")
+        auth_log.warning("Request is not JSON. Body might be empty or have wrong Content-Type.")
         return jsonify({"message": "Invalid request: Content-Type must be application/json"}), 400
 
     data = request.get_json()
-    print(f"Request JSON Body: {data}")
 
     email = data.get('email')
     password = data.get('password')
 
     if not email or not password:
-        logging.error("Missing 'email' or 'password' in request body.")
+        auth_log.warning("Missing 'email' or 'password' in request body.")
         return jsonify({'message': 'Email and password are required'}), 400
     
-    print(f"Login attempt for user: {email}")
-
-    conn = get_db_connection()
-    if conn is None:
-        logging.critical("Database connection failed.")
-        return jsonify({"error": "Database connection failed"}), 500
+    auth_log.debug("Login attempt", extra={"email": email})
 
     try:
-        cursor = conn.cursor()
-        cursor.execute("SELECT * FROM Chatbot_Emp WHERE Email_Id = ?", (email,))
-        row = cursor.fetchone()
-        
-        if not row:
-            logging.warning(f"User not found for email: {email}")
+        employee = employee_directory.by_email(email)
+
+        if not employee:
+            auth_log.info("User not found", extra={"email": email})
             return jsonify({'message': 'User not found'}), 401
 
         # Assuming the password in the database is plain text. 
         # In a real application, you should hash passwords.
-        db_password = row.Password.strip() # Use .strip() to remove leading/trailing whitespace
+        db_password = (employee.get('Password') or '').strip() # Use .strip() to remove leading/trailing whitespace
         password_match = (password == db_password)
-        
-        print(f"Password check for '{email}': Provided='{password}', DB='{db_password}', Match={password_match}")
+
 
         if password_match:
-            print(f"Password match successful for {email}.")
+            auth_log.debug("Login succeeded", extra={"email": email})
             token = jwt.encode({
-                'Emp_ID': row.Emp_ID,
-                'Role': row.Role,
+                'Emp_ID': employee.get('Emp_ID'),
+                'Role': employee.get('Role'),
                 'exp': datetime.datetime.now(datetime.timezone.utc) + datetime.timedelta(minutes=30)
             }, app.config['SECRET_KEY'], algorithm="HS256")
-            
-            columns = [column[0] for column in cursor.description]
-            employee = dict(zip(columns, row))
-            
+
             return jsonify({'token': token, 'user': employee})
 
-        logging.warning(f"Invalid password for user: {email}")
+        auth_log.info("Invalid password", extra={"email": email})
         return jsonify({'message': 'Invalid password'}), 401
     except Exception as e:
-        logging.error(f"An exception occurred during login: {e}", exc_info=True)
+        auth_log.error("An exception occurred during login: %s", e, exc_info=True)
         return jsonify({"error": str(e)}), 500
-    finally:
-        if conn:
-            conn.close()
+
+def start_background_services():
+    """Load the in-memory indexes and start their refresh threads (app.run and the ASGI lifespan).
+
+    Each failure is logged and left to the component's lazy load or its SQL fallback.
+    """
+    if COMMENTS_MIGRATE_ON_STARTUP:
+        try:
+            tickets, comments = comment_store.migrate_legacy()
+            if comments:
+                log.info("Copied %s legacy comments of %s tickets into %s", comments, tickets, COMMENT_TABLE)
+        except Exception as e:
+            log.warning("Legacy comments not migrated at startup, run `python comments.py --migrate`: %s", e)
+    try:
+        dimension_index.start()
+    except Exception as e:
+        log.warning("Dimension index not loaded at startup, will retry on first request: %s", e)
+    if ROLLUP_ENABLED:
+        try:
+            daily_rollup.start()
+        except Exception as e:
+            log.warning("Daily rollup not built at startup, queries use the raw table: %s", e)
+    if columnar_snapshot is not None:
+        try:
+            columnar_snapshot.start()
+        except Exception as e:
+            log.warning("Columnar snapshot not loaded at startup, aggregates use SQL: %s", e)
+    try:
+        employee_directory.start()
+    except Exception as e:
+        log.warning("Employee directory not loaded at startup, will retry on first request: %s", e)
+
+
+def stop_background_services():
+    """Stop the refresh threads and close the connection pool."""
+    dimension_index.stop()
+    daily_rollup.stop()
+    if columnar_snapshot is not None:
+        columnar_snapshot.stop()
+    employee_directory.stop()
+    get_db_pool().close()
+
 
 if __name__ == '__main__':
-    app.run(debug=True)
+    start_background_services()
+    try:
+        app.run(debug=True)
+    finally:
+        stop_background_services()
@@ -0,0 +1,205 @@
+"""ASGI entry point: serve the Flask app from an event loop with DB work on a bounded executor.
+
+Run with any ASGI server, e.g.:
+
+    pip install uvicorn
+    uvicorn asgi:application --host 0.0.0.0 --port 5000
+
+Connections, request bodies and response sending are handled on the event loop.
+Views still make blocking pyodbc calls, so they run on ASGI_WORKERS threads: at
+most ASGI_WORKERS requests are inside a view at once, the same limit as a threaded
+WSGI server with that many threads, and further requests wait as coroutines until
+a thread is free. The default worker count is DB_POOL_MAX, because more threads
+than pooled connections would only block on pool checkout. What the event loop
+adds is that waiting requests and slow clients hold no thread, and that a backlog
+past ASGI_MAX_PENDING is shed with 503 rather than queued without bound. Streamed
+bodies (/api/tickets?stream=1) are pulled from the executor chunk by chunk, so a
+slow reader holds a thread only while the next chunk is fetched.
+
+Environment:
+    ASGI_WORKERS       executor threads running views (default DB_POOL_MAX)
+    ASGI_MAX_PENDING   requests allowed to wait for a worker before new ones get
+                       503 with Retry-After (default 1000)
+
+Routes and response formats are unchanged; this adapts the WSGI app, it does not
+replace it (python app.py still runs the development server).
+"""
+import asyncio
+import io
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+from app import DB_POOL_MAX, app, start_background_services, stop_background_services
+from log_setup import get_logger
+
+log = get_logger("asgi")
+
+ASGI_WORKERS = int(os.getenv("ASGI_WORKERS", str(DB_POOL_MAX)))
+ASGI_MAX_PENDING = int(os.getenv("ASGI_MAX_PENDING", "1000"))
+
+_DONE = object()
+
+
+def build_environ(scope, body):
+    """PEP 3333 environ for an ASGI HTTP scope and its complete request body."""
+    server = scope.get("server") or ("localhost", 80)
+    client = scope.get("client") or ("", 0)
+    environ = {
+        "REQUEST_METHOD": scope["method"],
+        "SCRIPT_NAME": scope.get("root_path", "").encode("utf-8").decode("latin-1"),
+        "PATH_INFO": scope["path"].encode("utf-8").decode("latin-1"),
+        "QUERY_STRING": scope.get("query_string", b"").decode("latin-1"),
+        "SERVER_NAME": str(server[0]),
+        "SERVER_PORT": str(server[1] if server[1] is not None else 80),
+        "SERVER_PROTOCOL": f"HTTP/{scope.get('http_version', '1.1')}",
+        "REMOTE_ADDR": client[0],
+        "REMOTE_PORT": str(client[1]),
+        "CONTENT_LENGTH": str(len(body)),
+        "wsgi.version": (1, 0),
+        "wsgi.url_scheme": scope.get("scheme", "http"),
+        "wsgi.input": io.BytesIO(body),
+        "wsgi.errors": sys.stderr,
+        "wsgi.multithread": True,
+        "wsgi.multiprocess": True,
+        "wsgi.run_once": False,
+    }
+    for raw_name, raw_value in scope.get("headers", []):
+        name = raw_name.decode("latin-1").upper().replace("-", "_")
+        value = raw_value.decode("latin-1")
+        if name == "CONTENT_TYPE":
+            environ["CONTENT_TYPE"] = value
+            continue
+        if name == "CONTENT_LENGTH":
+            continue
+        key = f"HTTP_{name}"
+        environ[key] = f"{environ[key]},{value}" if key in environ else value
+    return environ
+
+
+class AsgiAdapter:
+    """Run a WSGI app under ASGI, executing it on a bounded thread pool.
+
+    Concurrency inside the app is capped at `workers`; the adapter only moves the
+    waiting (and socket I/O) off those threads.
+    """
+
+    def __init__(self, wsgi_app, workers=ASGI_WORKERS, max_pending=ASGI_MAX_PENDING,
+                 on_startup=None, on_shutdown=None):
+        self.wsgi_app = wsgi_app
+        self.workers = max(1, workers)
+        self.max_pending = max_pending
+        self.on_startup = on_startup
+        self.on_shutdown = on_shutdown
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="asgi-worker")
+        self._active = 0
+
+    def stats(self):
+        return {"workers": self.workers, "active_requests": self._active, "max_pending": self.max_pending}
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+        elif scope["type"] == "http":
+            await self._http(scope, receive, send)
+
+    async def _lifespan(self, receive, send):
+        loop = asyncio.get_running_loop()
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                try:
+                    if self.on_startup is not None:
+                        await loop.run_in_executor(self._executor, self.on_startup)
+                except Exception as e:
+                    log.error("ASGI startup failed: %s", e, exc_info=True)
+                    await send({"type": "lifespan.startup.failed", "message": str(e)})
+                    return
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                try:
+                    if self.on_shutdown is not None:
+                        await loop.run_in_executor(self._executor, self.on_shutdown)
+                finally:
+                    self._executor.shutdown(wait=False)
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    async def _http(self, scope, receive, send):
+        chunks = []
+        while True:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                return
+            chunks.append(message.get("body", b""))
+            if not message.get("more_body"):
+                break
+
+        # Requests beyond the worker count wait as coroutines; past max_pending, shed load
+        if self._active >= self.workers + self.max_pending:
+            await send({"type": "http.response.start", "status": 503,
+                        "headers": [(b"content-type", b"application/json"), (b"retry-after", b"1")]})
+            await send({"type": "http.response.body", "body": b'{"error": "Server busy, retry shortly"}\n'})
+            return
+
+        self._active += 1
+        try:
+            await self._run(build_environ(scope, b"".join(chunks)), send)
+        finally:
+            self._active -= 1
+
+    async def _run(self, environ, send):
+        loop = asyncio.get_running_loop()
+        response = {}
+        written = []
+
+        def start_response(status, headers, exc_info=None):
+            response["status"] = int(status.split(" ", 1)[0])
+            response["headers"] = headers
+            # Legacy write() callable; its bytes go out before the iterable's
+            return written.append
+
+        def call_app():
+            result = self.wsgi_app(environ, start_response)
+            iterator = iter(result)
+            has_length = any(k.lower() == "content-length" for k, _ in response.get("headers", ()))
+            if has_length:
+                # Buffered response: read it all while we are on the worker thread
+                try:
+                    return result, None, b"".join(written) + b"".join(iterator)
+                finally:
+                    _close(result)
+            first = next(iterator, _DONE)
+            if written:
+                first = b"".join(written) + (b"" if first is _DONE else first)
+            return result, iterator, first
+
+        result, iterator, first = await loop.run_in_executor(self._executor, call_app)
+        try:
+            await send({
+                "type": "http.response.start",
+                "status": response["status"],
+                "headers": [(k.lower().encode("latin-1"), v.encode("latin-1")) for k, v in response["headers"]],
+            })
+            if iterator is None:
+                await send({"type": "http.response.body", "body": first})
+                return
+            chunk = first
+            while chunk is not _DONE:
+                if chunk:
+                    await send({"type": "http.response.body", "body": chunk, "more_body": True})
+                # Streamed bodies may fetch from the database between chunks
+                chunk = await loop.run_in_executor(self._executor, next, iterator, _DONE)
+            await send({"type": "http.response.body", "body": b""})
+        finally:
+            if iterator is not None:
+                await loop.run_in_executor(self._executor, _close, result)
+
+
+def _close(result):
+    close = getattr(result, "close", None)
+    if close is not None:
+        close()
+
+
+application = AsgiAdapter(app, on_startup=start_background_services, on_shutdown=stop_background_services)
@@ -0,0 +1,233 @@
+"""Synthetic Chatbot_Transaction / Chatbot_Emp data in a local SQLite stand-in.
+
+Usage:
+    python bench_data.py --rows 100000 --db bench.db
+    python bench_data.py --rows 10000000 --db bench-10m.db --skew 1.2
+
+Products and companies follow a Zipf-like distribution (a few names own most of
+the tickets, as in production); status, priority, category and feedback use fixed
+weights. Generation is seeded, so the same arguments give the same database.
+Rows are streamed into SQLite in batches, so 10M rows do not need 10M rows of memory.
+
+The same module lets the app run against that file without SQL Server:
+connect(path) opens a connection whose rows allow attribute access like pyodbc
+rows, and install_pyodbc_stand_in() provides a placeholder pyodbc module when
+the real driver cannot be imported (no ODBC libraries on the machine).
+"""
+import argparse
+import datetime
+import itertools
+import os
+import random
+import sqlite3
+import sys
+import types
+
+from index_advisor import RECOMMENDED_INDEXES, index_ddl
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS Chatbot_Transaction (
+    Uniqueid INTEGER PRIMARY KEY,
+    Ticket_No TEXT,
+    Ticket_Category TEXT,
+    Ticket_Details TEXT,
+    Ticket_Creation_Date TEXT,
+    Ticket_Closing_Date TEXT,
+    Ticket_Priority TEXT,
+    Ticket_Status TEXT,
+    Ticket_Day_Open INTEGER,
+    Company_Work_Feedback TEXT,
+    Product_Name TEXT,
+    Company_Name TEXT,
+    Company_ID TEXT,
+    Company_Email TEXT,
+    Comment TEXT
+);
+CREATE TABLE IF NOT EXISTS Chatbot_Emp (
+    Emp_ID TEXT PRIMARY KEY,
+    Emp_Name TEXT,
+    Email_Id TEXT,
+    Company_ID TEXT,
+    Department_ID TEXT,
+    Role TEXT,
+    Other TEXT,
+    App_Role TEXT,
+    Password TEXT
+);
+"""
+
+STATUS_WEIGHTS = {"Closed": 45, "Resolved": 25, "Open": 20, "Pending": 10}
+PRIORITY_WEIGHTS = {"Low": 50, "Medium": 35, "High": 15}
+CATEGORY_WEIGHTS = {"Software": 35, "Network": 20, "Hardware": 15, "Access": 15, "Billing": 10, "Other": 5}
+FEEDBACK_WEIGHTS = {"Excellent": 30, "Good": 40, "Average": 20, "Poor": 10}
+ROLES = ["Agent", "Manager", "Admin"]
+
+# Tickets end on this date so a given seed always produces the same rows
+END_DATE = datetime.datetime(2025, 12, 31, 23, 59, 59)
+
+BATCH_SIZE = 10000
+
+
+def zipf_weights(n, skew):
+    """Weights 1/rank^skew for ranks 1..n (skew=0 is uniform)."""
+    return [1.0 / (rank ** skew) for rank in range(1, n + 1)]
+
+
+def companies(n):
+    """(Company_ID, Company_Name, Company_Email) for `n` synthetic companies."""
+    return [(f"C{i:04d}", f"Company {i:04d}", f"support@company{i:04d}.example") for i in range(1, n + 1)]
+
+
+def products(n):
+    return [f"Product {i:03d}" for i in range(1, n + 1)]
+
+
+def _weighted(rng, weights, k):
+    return rng.choices(list(weights), weights=list(weights.values()), k=k)
+
+
+def ticket_rows(count, seed=1, skew=1.1, n_products=50, n_companies=200, days=730):
+    """Yield Chatbot_Transaction rows (in column order) for `count` tickets."""
+    rng = random.Random(seed)
+    product_names = products(n_products)
+    company_rows = companies(n_companies)
+    product_weights = list(itertools.accumulate(zipf_weights(n_products, skew)))
+    company_weights = list(itertools.accumulate(zipf_weights(n_companies, skew)))
+    start = END_DATE - datetime.timedelta(days=days)
+    span = days * 86400
+
+    uniqueid = 0
+    while uniqueid < count:
+        k = min(BATCH_SIZE, count - uniqueid)
+        statuses = _weighted(rng, STATUS_WEIGHTS, k)
+        priorities = _weighted(rng, PRIORITY_WEIGHTS, k)
+        categories = _weighted(rng, CATEGORY_WEIGHTS, k)
+        feedback = _weighted(rng, FEEDBACK_WEIGHTS, k)
+        product_picks = rng.choices(product_names, cum_weights=product_weights, k=k)
+        company_picks = rng.choices(company_rows, cum_weights=company_weights, k=k)
+        for i in range(k):
+            uniqueid += 1
+            created = start + datetime.timedelta(seconds=rng.randrange(span))
+            status = statuses[i]
+            if status in ("Open", "Pending"):
+                closed = None
+                day_open = (END_DATE - created).days
+            else:
+                day_open = min(int(rng.expovariate(1 / 4.0)), 90)
+                closed = (created + datetime.timedelta(days=day_open)).strftime("%Y-%m-%d %H:%M:%S")
+            company_id, company_name, company_email = company_picks[i]
+            yield (
+                uniqueid, f"TKT{uniqueid:08d}", categories[i],
+                f"{categories[i]} issue reported for {product_picks[i]}",
+                created.strftime("%Y-%m-%d %H:%M:%S"), closed, priorities[i], status, day_open,
+                feedback[i], product_picks[i], company_name, company_id, company_email, None,
+            )
+
+
+def employee_rows(count, seed=1, n_companies=200):
+    rng = random.Random(seed + 1)
+    company_rows = companies(n_companies)
+    for i in range(1, count + 1):
+        company_id = rng.choice(company_rows)[0]
+        yield (f"E{i:06d}", f"Employee {i}", f"employee{i}@example.com", company_id,
+               f"D{rng.randint(1, 20):02d}", rng.choice(ROLES), None, "user", "password")
+
+
+def generate(path, rows=100000, employees=1000, seed=1, skew=1.1, n_products=50, n_companies=200,
+             days=730, indexes=True):
+    """(Re)create `path` with synthetic data; returns the number of ticket rows written."""
+    if os.path.exists(path):
+        os.remove(path)
+    conn = sqlite3.connect(path)
+    try:
+        conn.execute("PRAGMA journal_mode = OFF")
+        conn.execute("PRAGMA synchronous = OFF")
+        conn.executescript(SCHEMA)
+        tickets = ticket_rows(rows, seed, skew, n_products, n_companies, days)
+        while True:
+            batch = list(itertools.islice(tickets, BATCH_SIZE))
+            if not batch:
+                break
+            conn.executemany(f"INSERT INTO Chatbot_Transaction VALUES ({', '.join('?' * 15)})", batch)
+        conn.executemany(f"INSERT INTO Chatbot_Emp VALUES ({', '.join('?' * 9)})",
+                         employee_rows(employees, seed, n_companies))
+        if indexes:
+            for name, table, keys, include, _ in RECOMMENDED_INDEXES:
+                conn.execute(index_ddl(name, table, keys, include, dialect="sqlite"))
+        conn.commit()
+        conn.execute("ANALYZE")
+    finally:
+        conn.close()
+    return rows
+
+
+class Row(tuple):
+    """Tuple row with attribute access by column name, like a pyodbc.Row."""
+    __slots__ = ()
+    _columns = {}
+
+    def __getattr__(self, name):
+        try:
+            return self[self._columns[name]]
+        except KeyError:
+            raise AttributeError(name)
+
+
+_row_classes = {}
+
+
+def _row_factory(cursor, values):
+    names = tuple(column[0] for column in cursor.description)
+    cls = _row_classes.get(names)
+    if cls is None:
+        cls = _row_classes[names] = type("Row", (Row,), {"__slots__": (), "_columns": {n: i for i, n in enumerate(names)}})
+    return cls(values)
+
+
+def connect(path):
+    """SQLite connection usable from any thread, returning pyodbc-style rows."""
+    conn = sqlite3.connect(path, check_same_thread=False)
+    conn.row_factory = _row_factory
+    return conn
+
+
+def install_pyodbc_stand_in():
+    """Make `import pyodbc` succeed when the ODBC driver libraries are not installed.
+
+    The placeholder only carries pyodbc.Error and a connect() that always fails, so
+    the app has to be given an explicit connection factory (init_db_pool(connect=...)).
+    """
+    try:
+        import pyodbc  # noqa: F401
+        return False
+    except ImportError:
+        module = types.ModuleType("pyodbc")
+        module.Error = sqlite3.Error
+
+        def connect(*args, **kwargs):
+            raise sqlite3.Error("pyodbc is not available; use a local connection factory")
+        module.connect = connect
+        sys.modules["pyodbc"] = module
+        return True
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--db", default="bench.db", help="SQLite file to (re)create")
+    parser.add_argument("--rows", type=int, default=100000, help="Chatbot_Transaction rows (10k-10M)")
+    parser.add_argument("--employees", type=int, default=1000)
+    parser.add_argument("--products", type=int, default=50)
+    parser.add_argument("--companies", type=int, default=200)
+    parser.add_argument("--days", type=int, default=730, help="span of Ticket_Creation_Date")
+    parser.add_argument("--skew", type=float, default=1.1, help="Zipf exponent for products/companies")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--no-indexes", action="store_true", help="skip the index_advisor indexes")
+    args = parser.parse_args(argv)
+
+    generate(args.db, args.rows, args.employees, args.seed, args.skew, args.products,
+             args.companies, args.days, indexes=not args.no_indexes)
+    print(f"Wrote {args.rows} tickets and {args.employees} employees to {args.db}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,361 @@
+"""Benchmark the API endpoints against a synthetic SQLite dataset.
+
+Usage:
+    python benchmark.py --rows 100000                       # generate bench-100000.db if needed, run everything
+    python benchmark.py --rows 1000000 --only stats,charts  # a subset of scenarios
+    python benchmark.py --output after.json --compare before.json
+
+Requests go through Flask's test client (no network), with DB_DIALECT=sqlite and
+the pool pointed at the bench_data database. The response cache is disabled unless
+--cache is given, so every request reaches the database.
+
+For each scenario the results file records request count, errors, throughput,
+latency percentiles (ms) and the peak Python allocation of a single request
+(tracemalloc, measured in a separate pass so it does not slow the timed loop),
+plus the process's peak RSS. --compare prints the change against an earlier
+results file and --fail-over PCT exits non-zero when any p50/p95 got slower by
+more than PCT percent.
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import random
+import sqlite3
+import subprocess
+import sys
+import time
+import tracemalloc
+from urllib.parse import urlencode
+
+import bench_data
+from comments import COMMENT_TABLE
+
+# Window the dated scenarios query; bench_data tickets end on 2025-12-31
+DATE_FROM = "2025-01-01"
+DATE_TO = "2025-12-31"
+TREND_FROM = "2025-10-01"
+
+
+def percentile(sorted_values, pct):
+    """Linear-interpolated percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    pos = (len(sorted_values) - 1) * pct / 100.0
+    lo = int(pos)
+    hi = min(lo + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (pos - lo)
+
+
+def latency_summary(latencies_ms):
+    values = sorted(latencies_ms)
+    if not values:
+        return {}
+    return {
+        "min": round(values[0], 3),
+        "mean": round(sum(values) / len(values), 3),
+        "p50": round(percentile(values, 50), 3),
+        "p90": round(percentile(values, 90), 3),
+        "p95": round(percentile(values, 95), 3),
+        "p99": round(percentile(values, 99), 3),
+        "max": round(values[-1], 3),
+    }
+
+
+def sample_values(path, limit=20):
+    """Hot and cold filter values from the dataset, so requests look like real traffic."""
+    conn = sqlite3.connect(path)
+    try:
+        companies = conn.execute(
+            "SELECT Company_ID, Company_Email, Company_Name, COUNT(*) FROM Chatbot_Transaction"
+            " GROUP BY Company_ID, Company_Email, Company_Name ORDER BY COUNT(*) DESC").fetchall()
+        products = [r[0] for r in conn.execute(
+            "SELECT Product_Name FROM Chatbot_Transaction GROUP BY Product_Name"
+            f" ORDER BY COUNT(*) DESC LIMIT {limit}")]
+        tickets = conn.execute(
+            "SELECT Company_ID, Company_Email, Ticket_No, Uniqueid FROM Chatbot_Transaction"
+            f" ORDER BY Uniqueid DESC LIMIT {limit * 10}").fetchall()
+        employees = conn.execute(f"SELECT Email_Id, Password FROM Chatbot_Emp LIMIT {limit}").fetchall()
+    finally:
+        conn.close()
+    return {
+        "hot_companies": companies[:limit],
+        # Companies from the long tail have few tickets; the full /api/tickets list stays small
+        "cold_companies": companies[-limit:],
+        "products": products,
+        "tickets": tickets,
+        "employees": employees,
+    }
+
+
+def scenarios(values):
+    """name -> function(rng) returning (method, url, json_body)."""
+    def pick(rng, key):
+        return rng.choice(values[key])
+
+    def url(path, **params):
+        return f"{path}?{urlencode(params)}"
+
+    def stats(rng):
+        company = pick(rng, "hot_companies")[2] if rng.random() < 0.3 else ""
+        product = pick(rng, "products") if rng.random() < 0.3 else ""
+        date = f"{DATE_FROM} AND {DATE_TO}" if rng.random() < 0.5 else ""
+        return "GET", url("/api/stats", date=date, Product_Name=product, Company_Name=company), None
+
+    def charts(rng):
+        company = pick(rng, "hot_companies")[2] if rng.random() < 0.3 else ""
+        product = pick(rng, "products") if rng.random() < 0.3 else ""
+        date = f"{DATE_FROM} AND {DATE_TO}" if rng.random() < 0.5 else ""
+        return "GET", url("/api/charts", date=date, product=product, company=company), None
+
+    def monthly_trends(rng):
+        params = {"start_date": TREND_FROM, "end_date": DATE_TO, "granularity": rng.choice(["day", "week", "month"])}
+        if rng.random() < 0.5:
+            params["Company_ID"] = pick(rng, "hot_companies")[0]
+        return "GET", url("/api/monthly-trends", **params), None
+
+    def dashboard(rng):
+        params = {"start_date": TREND_FROM, "end_date": DATE_TO}
+        if rng.random() < 0.5:
+            params["Company_ID"] = pick(rng, "hot_companies")[0]
+        return "GET", url("/api/dashboard", **params), None
+
+    def tickets_page(rng):
+        company_id, email = pick(rng, "hot_companies")[:2]
+        return "GET", url("/api/tickets", company_id=company_id, company_email=email, limit=100), None
+
+    def tickets_full(rng):
+        company_id, email = pick(rng, "cold_companies")[:2]
+        return "GET", url("/api/tickets", company_id=company_id, company_email=email), None
+
+    def add_comments(rng):
+        company_id, email, ticket_no, uniqueid = pick(rng, "tickets")
+        body = {"company_id": company_id, "company_email": email, "ticket_no": ticket_no,
+                "uniqueid": uniqueid, "comment": f"benchmark note {rng.randrange(10**6)}"}
+        return "PUT", "/api/comments", body
+
+    def login(rng):
+        email, password = pick(rng, "employees")
+        return "POST", "/api/auth/login", {"email": email, "password": password}
+
+    return {
+        "stats": stats,
+        "charts": charts,
+        "monthly_trends": monthly_trends,
+        "dashboard": dashboard,
+        "tickets_page": tickets_page,
+        "tickets_full": tickets_full,
+        "dates": lambda rng: ("GET", "/api/dates", None),
+        "products": lambda rng: ("GET", "/api/Product_Name", None),
+        "companies": lambda rng: ("GET", "/api/companies", None),
+        "add_comments": add_comments,
+        "login": login,
+    }
+
+
+def send(client, method, url, body):
+    response = client.open(url, method=method, json=body)
+    data = response.get_data()
+    return response.status_code, len(data)
+
+
+def run_scenario(client, build, iterations, warmup, memory_iterations, seed):
+    rng = random.Random(seed)
+    for _ in range(warmup):
+        send(client, *build(rng))
+
+    latencies = []
+    errors = 0
+    total_bytes = 0
+    started = time.perf_counter()
+    for _ in range(iterations):
+        request = build(rng)
+        t0 = time.perf_counter()
+        status, size = send(client, *request)
+        latencies.append((time.perf_counter() - t0) * 1000)
+        total_bytes += size
+        if status >= 400:
+            errors += 1
+    elapsed = time.perf_counter() - started
+
+    peak = 0
+    if memory_iterations:
+        tracemalloc.start()
+        try:
+            for _ in range(memory_iterations):
+                request = build(rng)
+                tracemalloc.reset_peak()
+                send(client, *request)
+                peak = max(peak, tracemalloc.get_traced_memory()[1])
+        finally:
+            tracemalloc.stop()
+
+    return {
+        "requests": iterations,
+        "errors": errors,
+        "throughput_rps": round(iterations / elapsed, 2) if elapsed else None,
+        "latency_ms": latency_summary(latencies),
+        "avg_response_bytes": total_bytes // iterations if iterations else 0,
+        "peak_alloc_bytes": peak,
+    }
+
+
+def max_rss_bytes():
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    return rss if sys.platform == "darwin" else rss * 1024
+
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), timeout=5).stdout.strip() or None
+    except Exception:
+        return None
+
+
+def prepare_database(path, rows, seed, skew, regenerate):
+    if not regenerate and os.path.exists(path):
+        conn = sqlite3.connect(path)
+        try:
+            existing = conn.execute("SELECT COUNT(*) FROM Chatbot_Transaction").fetchone()[0]
+        except sqlite3.Error:
+            existing = None
+        finally:
+            conn.close()
+        if existing == rows:
+            # add_comments appends comments; start every run from the same state
+            conn = sqlite3.connect(path)
+            try:
+                conn.execute("UPDATE Chatbot_Transaction SET Comment = NULL WHERE Comment IS NOT NULL")
+                try:
+                    conn.execute(f"DELETE FROM {COMMENT_TABLE}")
+                except sqlite3.OperationalError:
+                    pass  # comments table not created yet
+                conn.commit()
+            finally:
+                conn.close()
+            return False
+    bench_data.generate(path, rows, seed=seed, skew=skew)
+    return True
+
+
+def load_app(path, cache, rollup=False, snapshot=False):
+    """Import the app against the SQLite file (environment must be set before import)."""
+    os.environ["DB_DIALECT"] = "sqlite"
+    os.environ["RESPONSE_CACHE_ENABLED"] = "1" if cache else "0"
+    os.environ["ROLLUP_ENABLED"] = "1" if rollup else "0"
+    os.environ["SNAPSHOT_ENABLED"] = "1" if snapshot else "0"
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+    bench_data.install_pyodbc_stand_in()
+    import app as appmod
+    appmod.init_db_pool(lambda: bench_data.connect(path))
+    if rollup:
+        appmod.daily_rollup.start()
+    if snapshot:
+        appmod.columnar_snapshot.start()
+    return appmod
+
+
+def compare(current, baseline, fail_over=None):
+    """Print the change per scenario; return True when a latency regressed past `fail_over` %."""
+    regressed = False
+    print(f"\n{'scenario':<16}{'p50 ms':>26}{'p95 ms':>26}{'req/s':>26}")
+    for name, result in current["results"].items():
+        before = baseline.get("results", {}).get(name)
+        if not before:
+            print(f"{name:<16}{'(new)':>26}")
+            continue
+        cells = []
+        for key, higher_is_worse in (("p50", True), ("p95", True), ("rps", False)):
+            if key == "rps":
+                old, new = before.get("throughput_rps"), result.get("throughput_rps")
+            else:
+                old, new = before["latency_ms"].get(key), result["latency_ms"].get(key)
+            if not old or new is None:
+                cells.append(f"{'-':>26}")
+                continue
+            change = (new - old) / old * 100
+            if higher_is_worse and fail_over is not None and change > fail_over:
+                regressed = True
+            cells.append(f"{old:.2f} -> {new:.2f} ({change:+.0f}%)".rjust(26))
+        print(f"{name:<16}" + "".join(cells))
+    return regressed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--db", help="SQLite file (default bench-<rows>.db, generated when missing)")
+    parser.add_argument("--regenerate", action="store_true", help="rebuild the database even if it exists")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--skew", type=float, default=1.1)
+    parser.add_argument("--iterations", type=int, default=50, help="timed requests per scenario")
+    parser.add_argument("--warmup", type=int, default=5)
+    parser.add_argument("--memory-iterations", type=int, default=3, help="requests traced for peak allocation (0 = skip)")
+    parser.add_argument("--only", help="comma-separated scenario names")
+    parser.add_argument("--cache", action="store_true", help="keep the response cache enabled")
+    parser.add_argument("--rollup", action="store_true", help="serve aggregates from the daily rollup table")
+    parser.add_argument("--snapshot", action="store_true", help="serve aggregates from the NumPy columnar snapshot")
+    parser.add_argument("--output", default="bench-results.json")
+    parser.add_argument("--compare", help="earlier results file to compare against")
+    parser.add_argument("--fail-over", type=float, help="exit 1 when p50/p95 regress by more than this percent")
+    args = parser.parse_args(argv)
+
+    path = args.db or f"bench-{args.rows}.db"
+    t0 = time.perf_counter()
+    if prepare_database(path, args.rows, args.seed, args.skew, args.regenerate):
+        print(f"Generated {args.rows} rows into {path} in {time.perf_counter() - t0:.1f}s")
+
+    appmod = load_app(path, args.cache, args.rollup, args.snapshot)
+    client = appmod.app.test_client()
+    available = scenarios(sample_values(path))
+    names = [n.strip() for n in args.only.split(",")] if args.only else list(available)
+    unknown = [n for n in names if n not in available]
+    if unknown:
+        parser.error(f"unknown scenario(s) {', '.join(unknown)}; choose from {', '.join(available)}")
+
+    results = {}
+    for name in names:
+        results[name] = run_scenario(client, available[name], args.iterations, args.warmup,
+                                     args.memory_iterations, args.seed)
+        r = results[name]
+        print(f"{name:<16} {r['throughput_rps'] or 0:>9.1f} req/s  p50 {r['latency_ms']['p50']:>8.2f} ms"
+              f"  p95 {r['latency_ms']['p95']:>8.2f} ms  p99 {r['latency_ms']['p99']:>8.2f} ms"
+              f"  errors {r['errors']}")
+
+    report = {
+        "meta": {
+            "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+            "git_revision": git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "rows": args.rows,
+            "seed": args.seed,
+            "skew": args.skew,
+            "iterations": args.iterations,
+            "cache": args.cache,
+            "rollup": args.rollup,
+            "snapshot": args.snapshot,
+            "json_backend": type(appmod.app.json).__name__,
+        },
+        "results": results,
+        "max_rss_bytes": max_rss_bytes(),
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            if compare(report, json.load(f), args.fail_over):
+                sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
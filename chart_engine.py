@@ -0,0 +1,157 @@
+"""Declarative chart definitions for /api/charts.
+
+Each chart is described by a dict in CHART_SPECS:
+
+    title, type     -- passed straight through to the Chart.js payload
+    column          -- Chatbot_Transaction column the chart counts by
+    labels          -- optional fixed label order; values outside it are dropped.
+                       Without it the labels found are sorted by value (NULL last),
+                       so a label keeps its position, and its color, as counts change
+    buckets         -- optional {"edges": [...], "labels": [...]} numeric ranges;
+                       value <= edges[i] falls into labels[i], anything larger into
+                       the last label
+    null_as         -- value used for NULLs before bucketing
+    strip           -- compare labels as str(value).strip()
+    top_n, other_label -- keep the N largest labels (still in label order) and sum
+                       the rest into "Other"
+    colors          -- dataset backgroundColor list
+
+All charts are computed from one grouped query (see compile_chart_query): the
+database groups by every chart dimension at once (bucketed columns become a CASE
+expression), so the result size depends on the number of distinct label
+combinations, never on the number of tickets. The per-chart totals are then rolled
+up from that small result in Python.
+"""
+from collections import OrderedDict
+
+
+OPEN_DAYS_EDGES = [5, 10, 15, 20, 25]
+OPEN_DAYS_LABELS = ['0-5 Days', '6-10 Days', '11-15 Days', '16-20 Days', '21-25 Days', '> 25 Days']
+
+CHART_SPECS = [
+    {
+        "title": "Ticket Status",
+        "type": "doughnut",
+        "column": "Ticket_Status",
+        "labels": ["Open", "Pending", "Resolved", "Closed"],
+        "colors": ["#dc3545", "#CA279B", "#17a2b8", "#28a745"],
+    },
+    {
+        "title": "Satisfaction",
+        "type": "bar",
+        "column": "Company_Work_Feedback",
+        "colors": ["green", "blue", "gray", "red"],
+    },
+    {
+        "title": "Severity",
+        "type": "bar",
+        "column": "Ticket_Priority",
+        "strip": True,
+        "labels": ["High", "Medium", "Low"],
+        "colors": ["red", "orange", "yellow"],
+    },
+    {
+        "title": "Issue Category",
+        "type": "bar",
+        "column": "Ticket_Category",
+        "colors": ["purple", "blue", "green", "gray"],
+    },
+    {
+        "title": "Open Days",
+        "type": "bar",
+        "column": "Ticket_Day_Open",
+        "null_as": 0,
+        "buckets": {"edges": OPEN_DAYS_EDGES, "labels": OPEN_DAYS_LABELS},
+        "colors": ["teal"],
+    },
+]
+
+
+def dimension_sql(spec):
+    """SQL expression a chart groups by (a CASE bucket index for bucketed charts)."""
+    column = spec["column"]
+    buckets = spec.get("buckets")
+    if not buckets:
+        return column
+    value = column
+    if spec.get("null_as") is not None:
+        value = f"COALESCE({column}, {spec['null_as']!r})"
+    whens = " ".join(f"WHEN {value} <= {edge!r} THEN {i}" for i, edge in enumerate(buckets["edges"]))
+    return f"CASE {whens} ELSE {len(buckets['edges'])} END"
+
+
+def chart_dimensions(specs=CHART_SPECS):
+    """Distinct dimension expressions used by `specs`, in first-use order."""
+    return list(OrderedDict.fromkeys(dimension_sql(spec) for spec in specs))
+
+
+def compile_chart_query(where="", specs=CHART_SPECS, table="Chatbot_Transaction", measures=(),
+                        count_sql="COUNT(*)", dimensions=None):
+    """Compile `specs` into one grouped query; `where` is a ready ' WHERE ...' clause.
+
+    Result columns are the dimensions, then any extra aggregate `measures`, then the count.
+    A pre-aggregated table passes its own `count_sql` (e.g. SUM(Ticket_Count)) and the
+    columns holding each of chart_dimensions(specs) as `dimensions`.
+    """
+    dims = dimensions or chart_dimensions(specs)
+    select = ", ".join(dims)
+    extra = "".join(f", {m}" for m in measures)
+    return f"SELECT {select}{extra}, {count_sql} FROM {table}{where} GROUP BY {select}"
+
+
+def _chart_counts(spec, dim_index, grouped_rows):
+    counts = {}
+    buckets = spec.get("buckets")
+    for row in grouped_rows:
+        key = row[dim_index]
+        if buckets:
+            key = buckets["labels"][int(key)]
+        elif key is None and spec.get("null_as") is not None:
+            key = spec["null_as"]
+        if spec.get("strip"):
+            key = str(key).strip()
+        counts[key] = counts.get(key, 0) + row[-1]
+    return counts
+
+
+def _label_key(label):
+    return (label is None, str(label))
+
+
+def _ordered_labels(spec, counts):
+    if spec.get("buckets"):
+        return list(spec["buckets"]["labels"]), False
+    if spec.get("labels"):
+        return list(spec["labels"]), False
+    # No fixed order: by label, never by count, so positions (and colors) only move when labels appear
+    return sorted(counts, key=_label_key), True
+
+
+def build_charts(grouped_rows, specs=CHART_SPECS):
+    """Roll the grouped query result up into the /api/charts response list."""
+    dims = chart_dimensions(specs)
+    charts = []
+    for spec in specs:
+        counts = _chart_counts(spec, dims.index(dimension_sql(spec)), grouped_rows)
+        labels, free_labels = _ordered_labels(spec, counts)
+        values = [counts.get(label, 0) for label in labels]
+
+        top_n = spec.get("top_n")
+        if free_labels and top_n and len(labels) > top_n:
+            largest = set(sorted(labels, key=lambda k: (-counts[k], _label_key(k)))[:top_n])
+            other = sum(counts[k] for k in labels if k not in largest)
+            labels = [k for k in labels if k in largest] + [spec.get("other_label", "Other")]
+            values = [counts[k] for k in labels[:-1]] + [other]
+
+        charts.append({
+            "title": spec["title"],
+            "type": spec["type"],
+            "data": {
+                "labels": labels,
+                "datasets": [{
+                    "data": values,
+                    "backgroundColor": list(spec.get("colors", [])),
+                }]
+            }
+        })
+    return charts
@@ -0,0 +1,434 @@
+"""In-memory columnar copy of the dashboard columns of Chatbot_Transaction (optional, needs NumPy).
+
+Every ticket becomes one position in a set of flat arrays:
+
+- Ticket_Creation_Date    int32 days since 1970-01-01 (NULL -> NO_DAY)
+- Ticket_Day_Open         int32, plus a bool array marking NULLs
+- status, priority, category, feedback, product, company name/id/email
+                          dictionary-encoded: small unsigned codes into a value list
+
+Filters become boolean masks, and group-bys become np.bincount over a combined
+code. The engine returns the same grouped rows the SQL path would:
+(status, count, day_open_sum) for stats, compile_chart_query() rows for charts
+and (bucket, status, count) for trends. app.py then feeds those rows to the
+unchanged payload builders, so responses are identical to the database path.
+
+The snapshot is loaded once and then refreshed by Uniqueid high-water mark
+(new tickets are appended); a periodic full reload picks up updates and deletes.
+Readers always see a complete, immutable version; refreshes build a new one and
+swap it in.
+"""
+import datetime
+import logging
+import sys
+import threading
+import time
+
+try:
+    import numpy as np
+except ImportError:  # optional dependency; the SQL path is used without it
+    np = None
+
+from chart_engine import CHART_SPECS, dimension_sql
+from trends import GRANULARITIES, to_date
+
+log = logging.getLogger("dashboard.snapshot")
+
+EPOCH = datetime.date(1970, 1, 1)
+NO_DAY = -(2 ** 31)
+
+CODED_COLUMNS = [
+    "Ticket_Status", "Ticket_Priority", "Ticket_Category", "Company_Work_Feedback",
+    "Product_Name", "Company_Name", "Company_ID", "Company_Email",
+]
+LOAD_COLUMNS = ["Uniqueid", "Ticket_Creation_Date", "Ticket_Day_Open"] + CODED_COLUMNS
+
+# Aggregates (as spelled in the SQL path) the snapshot can compute
+DAY_OPEN_SUM = "SUM(COALESCE(Ticket_Day_Open, 0))"
+
+# Combined group keys up to this many slots are counted with bincount, larger ones with unique()
+BINCOUNT_LIMIT = 1 << 22
+
+
+def numpy_available():
+    return np is not None
+
+
+def _day_number(value):
+    if value is None:
+        return NO_DAY
+    return (to_date(value) - EPOCH).days
+
+
+class _Dictionary:
+    """Append-only value <-> code mapping for one column."""
+
+    def __init__(self):
+        self.values = []
+        self.codes = {}
+
+    def encode(self, value):
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def copy(self):
+        other = _Dictionary()
+        other.values = list(self.values)
+        other.codes = dict(self.codes)
+        return other
+
+
+class _Version:
+    """One immutable snapshot: arrays + dictionaries + the Uniqueid they cover."""
+
+    def __init__(self, watermark, days, day_open, day_open_null, codes, dictionaries):
+        self.watermark = watermark
+        self.days = days
+        self.day_open = day_open
+        self.day_open_null = day_open_null
+        self.codes = codes
+        self.dictionaries = dictionaries
+
+    @property
+    def rows(self):
+        return len(self.days)
+
+    def nbytes(self):
+        arrays = [self.days, self.day_open, self.day_open_null] + list(self.codes.values())
+        size = sum(a.nbytes for a in arrays)
+        for dictionary in self.dictionaries.values():
+            size += sys.getsizeof(dictionary.values) + sys.getsizeof(dictionary.codes)
+            size += sum(sys.getsizeof(v) for v in dictionary.values)
+        return size
+
+
+def _compact(codes, size):
+    """Store codes in the smallest unsigned dtype that holds `size` distinct values."""
+    return codes.astype(np.min_scalar_type(max(size - 1, 0)), copy=False)
+
+
+class ColumnarSnapshot:
+    def __init__(self, get_connection, dialect="mssql", refresh_interval=60.0, full_reload_every=60,
+                 max_lag=300.0, batch_size=50000, table="Chatbot_Transaction"):
+        if np is None:
+            raise RuntimeError("The columnar snapshot needs NumPy (pip install numpy)")
+        self._get_connection = get_connection
+        self.dialect = dialect
+        self.refresh_interval = refresh_interval
+        self.full_reload_every = full_reload_every
+        self.max_lag = max_lag
+        self.batch_size = batch_size
+        self.table = table
+
+        self._lock = threading.Lock()
+        self._version = None
+        self._last_refresh = 0.0
+        self._refreshes = 0
+        self._full_reloads = 0
+        self._load_seconds = 0.0
+        self._served = 0
+        self._thread = None
+        self._stop = threading.Event()
+
+    # -- loading ------------------------------------------------------------
+
+    def _fetch(self, low, high):
+        where = " WHERE Uniqueid <= ?"
+        params = [high]
+        if low is not None:
+            where += " AND Uniqueid > ?"
+            params.append(low)
+        conn = self._get_connection()
+        try:
+            cursor = conn.cursor()
+            try:
+                cursor.execute(f"SELECT {', '.join(LOAD_COLUMNS)} FROM {self.table}{where}", tuple(params))
+                while True:
+                    rows = cursor.fetchmany(self.batch_size)
+                    if not rows:
+                        break
+                    yield rows
+            finally:
+                cursor.close()
+        finally:
+            conn.close()
+
+    def _high_watermark(self):
+        conn = self._get_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.execute(f"SELECT MAX(Uniqueid) FROM {self.table}")
+            row = cursor.fetchone()
+            cursor.close()
+        finally:
+            conn.close()
+        return row[0] if row else None
+
+    def _encode(self, low, high, dictionaries):
+        """Read rows in (low, high] and return the new arrays (dictionaries grow in place)."""
+        days, day_open, day_open_null = [], [], []
+        codes = {column: [] for column in CODED_COLUMNS}
+        encoders = [(codes[c].append, dictionaries[c].encode, i + 3) for i, c in enumerate(CODED_COLUMNS)]
+        for rows in self._fetch(low, high):
+            for row in rows:
+                days.append(_day_number(row[1]))
+                value = row[2]
+                day_open.append(0 if value is None else int(value))
+                day_open_null.append(value is None)
+                for append, encode, i in encoders:
+                    append(encode(row[i]))
+        return (
+            np.array(days, dtype=np.int32),
+            np.array(day_open, dtype=np.int32),
+            np.array(day_open_null, dtype=bool),
+            {column: np.array(values, dtype=np.int64) for column, values in codes.items()},
+        )
+
+    def refresh(self, full=False):
+        """Append new tickets (or reload everything when `full`). Returns rows loaded."""
+        started = time.perf_counter()
+        current = self._version
+        high = self._high_watermark()
+        if current is None:
+            full = True
+        low = None if full else current.watermark
+
+        if not full and (high is None or (low is not None and high <= low)):
+            version, loaded = current, 0
+        elif high is None:
+            version = _Version(None, np.zeros(0, np.int32), np.zeros(0, np.int32), np.zeros(0, bool),
+                               {c: np.zeros(0, np.uint8) for c in CODED_COLUMNS},
+                               {c: _Dictionary() for c in CODED_COLUMNS})
+            loaded = 0
+        else:
+            # Incremental loads extend copies, so readers of the current version are unaffected
+            dictionaries = ({c: _Dictionary() for c in CODED_COLUMNS} if full
+                            else {c: d.copy() for c, d in current.dictionaries.items()})
+            days, day_open, day_open_null, codes = self._encode(low, high, dictionaries)
+            loaded = len(days)
+            if not full:
+                days = np.concatenate([current.days, days])
+                day_open = np.concatenate([current.day_open, day_open])
+                day_open_null = np.concatenate([current.day_open_null, day_open_null])
+                codes = {c: np.concatenate([current.codes[c], codes[c]]) for c in CODED_COLUMNS}
+            codes = {c: _compact(codes[c], len(dictionaries[c].values)) for c in CODED_COLUMNS}
+            version = _Version(high, days, day_open, day_open_null, codes, dictionaries)
+
+        with self._lock:
+            self._version = version
+            self._last_refresh = time.monotonic()
+            self._refreshes += 1
+            if full:
+                self._full_reloads += 1
+                self._load_seconds = time.perf_counter() - started
+        log.debug("snapshot refreshed", extra={"rows": loaded, "total": version.rows, "watermark": high})
+        return loaded
+
+    # -- background refresh ---------------------------------------------------
+
+    def start(self):
+        """Load the snapshot and start the background refresh thread."""
+        if self._version is None:
+            self.refresh(full=True)
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="columnar-snapshot", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        cycles = 0
+        while not self._stop.wait(self.refresh_interval):
+            cycles += 1
+            full = bool(self.full_reload_every) and cycles % self.full_reload_every == 0
+            try:
+                self.refresh(full=full)
+            except Exception as e:
+                log.warning("Snapshot refresh failed: %s", e)
+
+    # -- reads ----------------------------------------------------------------
+
+    def usable(self):
+        """True when a snapshot is loaded and was refreshed within `max_lag` seconds."""
+        if self._version is None:
+            return False
+        return not self.max_lag or time.monotonic() - self._last_refresh <= self.max_lag
+
+    def _equals(self, stored, wanted):
+        # SQL Server's default collation ignores case and trailing spaces in '='
+        if stored is None:
+            return False
+        if self.dialect == "mssql":
+            return str(stored).rstrip().casefold() == str(wanted).rstrip().casefold()
+        return str(stored) == str(wanted)
+
+    def _match_codes(self, version, column, names):
+        dictionary = version.dictionaries[column]
+        return [code for code, stored in enumerate(dictionary.values)
+                if any(self._equals(stored, name) for name in names)]
+
+    def _mask(self, version, start_date=None, end_date=None, products=None, companies=None,
+              company_id=None, company_email=None):
+        """Boolean row mask for build_ticket_filters() arguments (None = every row)."""
+        mask = None
+
+        def restrict(condition):
+            nonlocal mask
+            mask = condition if mask is None else mask & condition
+
+        if start_date is not None:
+            restrict(version.days >= (start_date - EPOCH).days)
+        if end_date is not None:
+            restrict((version.days <= (end_date - EPOCH).days) & (version.days != NO_DAY))
+        filters = [("Product_Name", products), ("Company_Name", companies)]
+        if company_id is not None and str(company_id).strip():
+            filters.append(("Company_ID", [str(company_id).strip()]))
+        if company_email is not None and str(company_email).strip():
+            filters.append(("Company_Email", [str(company_email).strip()]))
+        for column, names in filters:
+            if names is None:
+                continue
+            codes = self._match_codes(version, column, list(names))
+            column_codes = version.codes[column]
+            if not codes:
+                restrict(np.zeros(len(column_codes), dtype=bool))
+            elif len(codes) == 1:
+                restrict(column_codes == codes[0])
+            else:
+                restrict(np.isin(column_codes, codes))
+        return mask
+
+    def _dimension(self, version, spec):
+        """(codes, radix, decode) for one chart dimension, or None if the snapshot lacks it."""
+        column = spec["column"]
+        buckets = spec.get("buckets")
+        if buckets:
+            if column != "Ticket_Day_Open":
+                return None
+            edges = np.asarray(buckets["edges"])
+            index = np.searchsorted(edges, version.day_open, side="left")
+            null_as = spec.get("null_as")
+            if null_as is None:
+                # CASE WHEN NULL <= edge is never true -> ELSE branch
+                index = np.where(version.day_open_null, len(edges), index)
+            else:
+                index = np.where(version.day_open_null, np.searchsorted(edges, null_as, side="left"), index)
+            return index, len(edges) + 1, int
+        if column not in version.codes:
+            return None
+        values = version.dictionaries[column].values
+        return version.codes[column], len(values), values.__getitem__
+
+    def _group(self, keys, radices, mask, weights=None):
+        """Count rows per combination of `keys`; returns (key tuples, counts, weight sums)."""
+        combined = np.zeros(len(keys[0]) if keys else 0, dtype=np.int64)
+        for key, radix in zip(keys, radices):
+            combined = combined * radix + key
+        if mask is not None:
+            combined = combined[mask]
+            weights = weights[mask] if weights is not None else None
+        total = 1
+        for radix in radices:
+            total *= radix
+        if total <= BINCOUNT_LIMIT:
+            counts = np.bincount(combined, minlength=total)
+            present = np.nonzero(counts)[0]
+            counts = counts[present]
+            sums = np.bincount(combined, weights, minlength=total)[present] if weights is not None else None
+        else:
+            present, inverse, counts = np.unique(combined, return_inverse=True, return_counts=True)
+            sums = np.bincount(inverse, weights) if weights is not None else None
+        parts = []
+        rest = present
+        for radix in reversed(radices):
+            parts.append(rest % radix)
+            rest = rest // radix
+        return list(zip(*[p.tolist() for p in reversed(parts)])), counts.tolist(), \
+            (None if sums is None else [int(round(s)) for s in sums.tolist()])
+
+    def stats_rows(self, **filters):
+        """(Ticket_Status, count, day_open_sum) rows, or None when the snapshot is not usable."""
+        if not self.usable():
+            return None
+        version = self._version
+        self._served += 1
+        status = version.dictionaries["Ticket_Status"].values
+        keys, counts, sums = self._group([version.codes["Ticket_Status"]], [len(status)],
+                                         self._mask(version, **filters), version.day_open)
+        return [(status[k[0]], count, total) for k, count, total in zip(keys, counts, sums)]
+
+    def chart_rows(self, specs=CHART_SPECS, measures=(), **filters):
+        """Rows shaped like compile_chart_query(where, specs, measures=measures), or None."""
+        if not self.usable() or any(m != DAY_OPEN_SUM for m in measures):
+            return None
+        version = self._version
+        dims = {}
+        for spec in specs:
+            key = dimension_sql(spec)
+            if key not in dims:
+                dims[key] = self._dimension(version, spec)
+                if dims[key] is None:
+                    return None
+        self._served += 1
+        dims = list(dims.values())
+        keys, counts, sums = self._group([d[0] for d in dims], [d[1] for d in dims],
+                                         self._mask(version, **filters),
+                                         version.day_open if measures else None)
+        decoders = [d[2] for d in dims]
+        rows = []
+        for i, key in enumerate(keys):
+            row = [decode(code) for decode, code in zip(decoders, key)]
+            row.extend(sums[i] for _ in measures)
+            row.append(counts[i])
+            rows.append(tuple(row))
+        return rows
+
+    def trend_rows(self, granularity, **filters):
+        """(bucket start date, Ticket_Status, count) rows, or None when not usable."""
+        if not self.usable() or granularity not in GRANULARITIES:
+            return None
+        version = self._version
+        self._served += 1
+        mask = self._mask(version, **filters)
+        days = version.days if mask is None else version.days[mask]
+        status = version.codes["Ticket_Status"] if mask is None else version.codes["Ticket_Status"][mask]
+        valid = days != NO_DAY
+        days, status = days[valid], status[valid]
+        if not len(days):
+            return []
+        if granularity == "week":
+            # 1970-01-01 was a Thursday; weeks start on Monday
+            buckets = days - (days + 3) % 7
+        elif granularity in ("month", "quarter"):
+            months = days.astype("datetime64[D]").astype("datetime64[M]").astype(np.int64)
+            if granularity == "quarter":
+                months = months - months % 3
+            buckets = months.astype("datetime64[M]").astype("datetime64[D]").astype(np.int64)
+        else:
+            buckets = days.astype(np.int64)
+        first = int(buckets.min())
+        names = version.dictionaries["Ticket_Status"].values
+        keys, counts, _ = self._group([buckets - first, status.astype(np.int64)],
+                                      [int(buckets.max()) - first + 1, len(names)], None)
+        return [(EPOCH + datetime.timedelta(days=first + b), names[s], count)
+                for (b, s), count in zip(keys, counts)]
+
+    def stats(self):
+        version = self._version
+        return {
+            "loaded": version is not None,
+            "usable": self.usable(),
+            "rows": version.rows if version is not None else 0,
+            "memory_bytes": version.nbytes() if version is not None else 0,
+            "watermark": version.watermark if version is not None else None,
+            "refreshes": self._refreshes,
+            "full_reloads": self._full_reloads,
+            "last_full_load_seconds": round(self._load_seconds, 3),
+            "queries_served": self._served,
+            "seconds_since_refresh": round(time.monotonic() - self._last_refresh, 1) if version is not None else None,
+        }
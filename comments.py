@@ -0,0 +1,295 @@
+"""Append-only ticket comments stored in Chatbot_Transaction_Comment.
+
+Comments used to live in Chatbot_Transaction.Comment as one comma-joined
+string that every append read, split, re-joined and wrote back. That cost grew
+with the history, and two concurrent appends could lose one of them. Now each
+comment is one row keyed by an increasing Comment_ID. An append is a single
+INSERT, and reads are newest-first pages that seek on (Uniqueid, Comment_ID).
+
+Existing CSV comments are copied into the table per ticket, and each copied ticket
+gets a row in Chatbot_Transaction_Comment_Legacy. A request that reads or appends
+comments first copies its ticket if that row is missing, in the same transaction,
+so legacy comments always come before new ones and are never lost to an early
+append. App startup (unless COMMENTS_MIGRATE_ON_STARTUP=0) or
+``python comments.py --migrate`` copies every remaining ticket ahead of time. Both
+paths insert the marker first, so two copies of one ticket cannot both succeed.
+The old column is left untouched.
+
+    python comments.py                     # print the SQL Server DDL
+    python comments.py --dialect sqlite    # SQLite DDL
+    python comments.py --migrate           # create the table and copy CSV comments
+"""
+import argparse
+import logging
+import threading
+
+log = logging.getLogger("dashboard.comments")
+
+COMMENT_TABLE = "Chatbot_Transaction_Comment"
+# One row per ticket whose CSV comments were copied (or found empty)
+LEGACY_TABLE = "Chatbot_Transaction_Comment_Legacy"
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+# Rows per INSERT statement (5 parameters each; SQL Server allows 2100 per statement)
+APPEND_CHUNK = 400
+# Ticket ids per lookup query
+LOOKUP_CHUNK = 1000
+
+
+def comment_ddl(dialect="mssql", table=COMMENT_TABLE, legacy_table=LEGACY_TABLE):
+    """Idempotent CREATE statements for the comments table and its migration markers."""
+    if dialect == "sqlite":
+        return [
+            f"CREATE TABLE IF NOT EXISTS {table} (Comment_ID INTEGER PRIMARY KEY AUTOINCREMENT,"
+            " Uniqueid INTEGER NOT NULL, Ticket_No TEXT, Company_ID TEXT, Company_Email TEXT,"
+            " Comment_Text TEXT NOT NULL, Created_At TEXT DEFAULT CURRENT_TIMESTAMP)",
+            f"CREATE INDEX IF NOT EXISTS IX_{table}_Ticket ON {table} (Uniqueid, Comment_ID)",
+            f"CREATE TABLE IF NOT EXISTS {legacy_table} (Uniqueid INTEGER PRIMARY KEY,"
+            " Comments INTEGER NOT NULL, Migrated_At TEXT DEFAULT CURRENT_TIMESTAMP)",
+        ]
+    return [
+        f"IF OBJECT_ID(N'dbo.{table}', N'U') IS NULL CREATE TABLE dbo.{table} ("
+        "Comment_ID BIGINT IDENTITY(1,1) PRIMARY KEY, Uniqueid INT NOT NULL, Ticket_No NVARCHAR(100) NULL,"
+        " Company_ID NVARCHAR(100) NULL, Company_Email NVARCHAR(255) NULL, Comment_Text NVARCHAR(MAX) NOT NULL,"
+        " Created_At DATETIME2 NOT NULL DEFAULT SYSUTCDATETIME())",
+        f"IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = N'IX_{table}_Ticket')"
+        f" CREATE INDEX IX_{table}_Ticket ON dbo.{table} (Uniqueid, Comment_ID DESC)",
+        f"IF OBJECT_ID(N'dbo.{legacy_table}', N'U') IS NULL CREATE TABLE dbo.{legacy_table} ("
+        "Uniqueid INT NOT NULL PRIMARY KEY, Comments INT NOT NULL,"
+        " Migrated_At DATETIME2 NOT NULL DEFAULT SYSUTCDATETIME())",
+    ]
+
+
+def split_csv(value):
+    """Comments held in a legacy Comment CSV value, oldest first."""
+    return [p.strip() for p in (value or "").split(",") if p and p.strip()]
+
+
+def join_csv(texts):
+    """Legacy CSV form; commas inside a comment become ';' as the old storage did."""
+    return ",".join(t.replace(",", ";").strip() for t in texts)
+
+
+def parse_page_size(raw):
+    if raw is None or raw == "":
+        return DEFAULT_PAGE_SIZE
+    try:
+        size = int(raw)
+    except ValueError:
+        raise ValueError("limit must be an integer")
+    if size < 1:
+        raise ValueError("limit must be at least 1")
+    return min(size, MAX_PAGE_SIZE)
+
+
+class CommentStore:
+    def __init__(self, get_connection, dialect="mssql", table=COMMENT_TABLE, source="Chatbot_Transaction",
+                 migrate_batch=500, legacy_table=LEGACY_TABLE):
+        self._get_connection = get_connection
+        self.dialect = dialect
+        self.table = table
+        self.legacy_table = legacy_table
+        self.source = source
+        self.migrate_batch = migrate_batch
+        self._ready = False
+        self._ready_lock = threading.Lock()
+
+    def _limit(self, sql, limit):
+        """Add a row limit to a `SELECT ...` statement in this dialect."""
+        if self.dialect == "sqlite":
+            return f"{sql} LIMIT {int(limit)}"
+        return sql.replace("SELECT ", f"SELECT TOP ({int(limit)}) ", 1)
+
+    # -- schema and migration ---------------------------------------------------
+
+    def ensure_ready(self):
+        """Create the tables on first use (once per process); see migrate_tickets() for the CSV copy."""
+        if self._ready:
+            return
+        with self._ready_lock:
+            if self._ready:
+                return
+            conn = self._get_connection()
+            try:
+                self.create_schema(conn)
+            finally:
+                conn.close()
+            self._ready = True
+
+    def migrate_legacy(self):
+        """Create the tables and copy every ticket's CSV comments; returns (tickets, comments) copied."""
+        conn = self._get_connection()
+        try:
+            self.create_schema(conn)
+            result = self.migrate(conn)
+        finally:
+            conn.close()
+        self._ready = True
+        return result
+
+    def create_schema(self, conn):
+        cursor = conn.cursor()
+        for statement in comment_ddl(self.dialect, self.table, self.legacy_table):
+            cursor.execute(statement)
+        cursor.close()
+        conn.commit()
+
+    def _unmigrated_sql(self, where):
+        return (f"SELECT Uniqueid, Ticket_No, Company_ID, Company_Email, Comment FROM {self.source} t"
+                f" WHERE {where} AND Comment IS NOT NULL AND Comment <> ''"
+                f" AND NOT EXISTS (SELECT 1 FROM {self.legacy_table} m WHERE m.Uniqueid = t.Uniqueid)")
+
+    def _copy(self, cursor, row):
+        """Copy one ticket's CSV comments; returns how many, or None if another copy got there first."""
+        uniqueid, ticket_no, company_id, company_email, csv = row
+        texts = split_csv(csv)
+        try:
+            # The marker goes in first: a concurrent copy of the same ticket waits on its key, then fails
+            cursor.execute(f"INSERT INTO {self.legacy_table} (Uniqueid, Comments) VALUES (?, ?)",
+                           (uniqueid, len(texts)))
+        except Exception:
+            cursor.execute(f"SELECT 1 FROM {self.legacy_table} WHERE Uniqueid = ?", (uniqueid,))
+            if cursor.fetchone() is None:
+                raise
+            return None
+        self.append_rows(cursor, [(uniqueid, ticket_no, company_id, company_email, text) for text in texts])
+        return len(texts)
+
+    def migrate_tickets(self, cursor, uniqueids):
+        """Copy the CSV comments of these tickets if not done yet; returns the tickets copied.
+
+        Called before reading or appending comments, so legacy comments keep the lowest
+        Comment_IDs of their ticket. The caller commits when the result is non-zero. Once
+        the tickets are migrated this is one indexed lookup per LOOKUP_CHUNK tickets.
+        """
+        ids = list(dict.fromkeys(uniqueids))
+        copied = 0
+        for start in range(0, len(ids), LOOKUP_CHUNK):
+            chunk = ids[start:start + LOOKUP_CHUNK]
+            cursor.execute(self._unmigrated_sql(f"Uniqueid IN ({', '.join('?' for _ in chunk)})"), tuple(chunk))
+            for row in cursor.fetchall():
+                if self._copy(cursor, tuple(row)) is not None:
+                    copied += 1
+        return copied
+
+    def migrate(self, conn):
+        """Copy CSV comments of every ticket not migrated yet; returns (tickets, comments) copied.
+
+        Commits after every batch of `migrate_batch` tickets.
+        """
+        cursor = conn.cursor()
+        select = self._limit(self._unmigrated_sql("Uniqueid > ?") + " ORDER BY Uniqueid", self.migrate_batch)
+        tickets = comments = 0
+        last = -1
+        while True:
+            cursor.execute(select, (last,))
+            rows = cursor.fetchall()
+            if not rows:
+                break
+            for row in rows:
+                copied = self._copy(cursor, tuple(row))
+                if copied is not None:
+                    tickets += 1
+                    comments += copied
+            conn.commit()
+            last = rows[-1][0]
+        cursor.close()
+        return tickets, comments
+
+    # -- tickets ----------------------------------------------------------------
+
+    def find_ticket(self, cursor, uniqueid):
+        """(Uniqueid, Ticket_No, Company_ID, Company_Email) for a ticket id, or None (one PK seek)."""
+        try:
+            uniqueid = int(uniqueid)
+        except (TypeError, ValueError):
+            uniqueid = str(uniqueid).strip()
+        cursor.execute(
+            f"SELECT Uniqueid, Ticket_No, Company_ID, Company_Email FROM {self.source} WHERE Uniqueid = ?",
+            (uniqueid,))
+        return cursor.fetchone()
+
+    def find_tickets(self, cursor, uniqueids):
+        """{Uniqueid: (Uniqueid, Ticket_No, Company_ID, Company_Email)} for many ids, LOOKUP_CHUNK per query."""
+        ids = list(dict.fromkeys(uniqueids))
+        found = {}
+        for start in range(0, len(ids), LOOKUP_CHUNK):
+            chunk = ids[start:start + LOOKUP_CHUNK]
+            cursor.execute(
+                f"SELECT Uniqueid, Ticket_No, Company_ID, Company_Email FROM {self.source}"
+                f" WHERE Uniqueid IN ({', '.join('?' for _ in chunk)})", tuple(chunk))
+            for row in cursor.fetchall():
+                found[row[0]] = tuple(row)
+        return found
+
+    def find_ticket_by_number(self, cursor, ticket_no):
+        cursor.execute(
+            self._limit(f"SELECT Uniqueid, Ticket_No, Company_ID, Company_Email FROM {self.source}"
+                        " WHERE Ticket_No = ?", 1),
+            (ticket_no,))
+        return cursor.fetchone()
+
+    # -- comments ---------------------------------------------------------------
+
+    def append(self, cursor, ticket, texts):
+        """Insert `texts` (oldest first) for `ticket`; the caller commits."""
+        uniqueid, ticket_no, company_id, company_email = ticket[:4]
+        self.append_rows(cursor, [(uniqueid, ticket_no, company_id, company_email, text) for text in texts])
+
+    def append_rows(self, cursor, rows):
+        """Insert (Uniqueid, Ticket_No, Company_ID, Company_Email, text) rows with multi-row INSERTs.
+
+        Each statement carries up to APPEND_CHUNK rows to stay under SQL Server's parameter limit.
+        """
+        for start in range(0, len(rows), APPEND_CHUNK):
+            chunk = rows[start:start + APPEND_CHUNK]
+            cursor.execute(
+                f"INSERT INTO {self.table} (Uniqueid, Ticket_No, Company_ID, Company_Email, Comment_Text)"
+                f" VALUES {', '.join('(?, ?, ?, ?, ?)' for _ in chunk)}",
+                tuple(value for row in chunk for value in row))
+
+    def has_comments(self, cursor, uniqueid):
+        cursor.execute(self._limit(f"SELECT 1 FROM {self.table} WHERE Uniqueid = ?", 1), (uniqueid,))
+        return cursor.fetchone() is not None
+
+    def page(self, cursor, uniqueid, limit=DEFAULT_PAGE_SIZE, before=None):
+        """Newest-first comments: ([(Comment_ID, text, created_at), ...], next `before` or None)."""
+        where = "Uniqueid = ?"
+        params = [uniqueid]
+        if before is not None:
+            where += " AND Comment_ID < ?"
+            params.append(int(before))
+        cursor.execute(
+            self._limit(f"SELECT Comment_ID, Comment_Text, Created_At FROM {self.table}"
+                        f" WHERE {where} ORDER BY Comment_ID DESC", limit + 1),
+            tuple(params))
+        rows = cursor.fetchall()
+        more = len(rows) > limit
+        rows = [tuple(row) for row in rows[:limit]]
+        return rows, (rows[-1][0] if more else None)
+
+    def all_texts(self, cursor, uniqueid):
+        """Every comment of a ticket, oldest first (for the legacy CSV responses)."""
+        cursor.execute(f"SELECT Comment_Text FROM {self.table} WHERE Uniqueid = ? ORDER BY Comment_ID", (uniqueid,))
+        return [row[0] for row in cursor.fetchall()]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Print the comments table DDL or migrate CSV comments.")
+    parser.add_argument("--dialect", choices=["mssql", "sqlite"], default="mssql")
+    parser.add_argument("--migrate", action="store_true",
+                        help="create the table and copy Chatbot_Transaction.Comment using the app's .env settings")
+    args = parser.parse_args(argv)
+    if args.migrate:
+        import app
+        tickets, comments = CommentStore(app.get_db_connection, app.DB_DIALECT).migrate_legacy()
+        log.info("Migrated %s comments from %s tickets", comments, tickets)
+        return
+    for statement in comment_ddl(args.dialect):
+        print(statement + (";" if args.dialect == "sqlite" else "\nGO"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,263 @@
+"""Response compression negotiated from Accept-Encoding.
+
+gzip always works (zlib is in the standard library); zstd and br are offered when
+the optional ``zstandard`` / ``brotli`` packages are installed. Among the
+encodings the client accepts with the highest q-value, the server prefers zstd,
+then br, then gzip.
+
+Buffered bodies smaller than ``min_size`` bytes are sent as they are, since
+compressing them costs more than it saves. Streamed responses (the ticket list
+with stream=1) are read until ``min_size`` bytes have arrived to make the same
+decision, then compressed chunk by chunk. Each chunk is flushed, so the client
+still receives rows as they come off the cursor. Compressed responses get a weak
+ETag, because the bytes differ per encoding. The response cache compares ETags
+weakly, so a compressed entry still revalidates with a 304. ResponseCache calls
+`compress_entry` so that each cached body is compressed once per encoding, not
+once per request. A body that does not get smaller is sent uncompressed, whether
+cached or not.
+"""
+import itertools
+import threading
+import zlib
+
+from flask import request
+
+try:
+    import brotli
+except ImportError:  # optional
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # optional
+    zstandard = None
+
+
+DEFAULT_LEVELS = {"zstd": 3, "br": 5, "gzip": 6}
+
+COMPRESSIBLE_TYPES = {"application/json", "application/javascript", "application/xml", "image/svg+xml"}
+
+
+def available_encodings():
+    """Encodings this process can produce, in server preference order."""
+    encodings = []
+    if zstandard is not None:
+        encodings.append("zstd")
+    if brotli is not None:
+        encodings.append("br")
+    encodings.append("gzip")
+    return encodings
+
+
+def compressible(mimetype):
+    return bool(mimetype) and (mimetype.startswith("text/") or mimetype in COMPRESSIBLE_TYPES
+                               or mimetype.endswith("+json"))
+
+
+class _GzipStream:
+    def __init__(self, level):
+        self._obj = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def chunk(self, data):
+        return self._obj.compress(data) + self._obj.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self):
+        return self._obj.flush()
+
+
+class _BrotliStream:
+    def __init__(self, level):
+        self._obj = brotli.Compressor(quality=level)
+
+    def chunk(self, data):
+        return self._obj.process(data) + self._obj.flush()
+
+    def finish(self):
+        return self._obj.finish()
+
+
+class _ZstdStream:
+    def __init__(self, level):
+        self._obj = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def chunk(self, data):
+        return self._obj.compress(data) + self._obj.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self):
+        return self._obj.flush()
+
+
+_STREAMS = {"gzip": _GzipStream, "br": _BrotliStream, "zstd": _ZstdStream}
+
+
+class ResponseCompressor:
+    def __init__(self, enabled=True, min_size=1024, levels=None, encodings=None):
+        """`encodings` restricts (and orders) what is offered; unavailable ones are dropped."""
+        self.enabled = enabled
+        self.min_size = min_size
+        self.levels = dict(DEFAULT_LEVELS, **(levels or {}))
+        available = available_encodings()
+        self.encodings = [e for e in (encodings or available) if e in available]
+        self._lock = threading.Lock()
+        self.counts = {e: 0 for e in self.encodings}
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.streamed = 0
+
+    def negotiate(self, accept_encodings):
+        """Best encoding for a werkzeug Accept-Encoding value, or None for identity."""
+        best = None
+        best_quality = 0
+        for encoding in self.encodings:
+            quality = accept_encodings.quality(encoding)
+            if quality > best_quality:
+                best, best_quality = encoding, quality
+        return best
+
+    def choose(self, request, mimetype, size=None):
+        """Encoding to use for a response body, or None. `size` None means streamed."""
+        if not self.enabled or not compressible(mimetype):
+            return None
+        if size is not None and size < self.min_size:
+            return None
+        return self.negotiate(request.accept_encodings)
+
+    def compress(self, data, encoding):
+        level = self.levels[encoding]
+        if encoding == "gzip":
+            body = zlib.compress(data, level, wbits=31)
+        elif encoding == "br":
+            body = brotli.compress(data, quality=level)
+        else:
+            body = zstandard.ZstdCompressor(level=level).compress(data)
+        self._record(encoding, len(data), len(body))
+        return body
+
+    def compress_stream(self, chunks, encoding, source=None):
+        """Compress an iterable of byte chunks, flushing after each so rows keep flowing.
+
+        `source` (default `chunks`) is closed when the stream ends or is abandoned.
+        """
+        stream = _STREAMS[encoding](self.levels[encoding])
+        size_in = size_out = 0
+        try:
+            for chunk in chunks:
+                if not chunk:
+                    continue
+                out = stream.chunk(chunk)
+                size_in += len(chunk)
+                size_out += len(out)
+                yield out
+            out = stream.finish()
+            size_out += len(out)
+            yield out
+        finally:
+            # Hands the database connection of a streaming view back even if the client went away
+            close = getattr(chunks if source is None else source, "close", None)
+            if close is not None:
+                close()
+            self._record(encoding, size_in, size_out, streamed=True)
+
+    def compress_entry(self, entry, encoding):
+        """Compressed body of a ResponseCache entry, made on first use and kept with the entry.
+
+        None when compressing does not make the body smaller; the entry is then sent as it is.
+        """
+        if encoding not in entry.encoded:
+            body = self.compress(entry.body, encoding)
+            entry.encoded[encoding] = body if len(body) < len(entry.body) else None
+        return entry.encoded[encoding]
+
+    def _record(self, encoding, size_in, size_out, streamed=False):
+        with self._lock:
+            self.counts[encoding] = self.counts.get(encoding, 0) + 1
+            self.bytes_in += size_in
+            self.bytes_out += size_out
+            if streamed:
+                self.streamed += 1
+
+    def _peek(self, chunks, source):
+        """Read chunks until `min_size` bytes have arrived or the body ends: (chunks read, size)."""
+        head = []
+        size = 0
+        try:
+            for chunk in chunks:
+                head.append(chunk)
+                size += len(chunk)
+                if size >= self.min_size:
+                    return head, size
+        except BaseException:
+            close = getattr(source, "close", None)
+            if close is not None:
+                close()
+            raise
+        close = getattr(source, "close", None)
+        if close is not None:
+            close()
+        return head, size
+
+    @staticmethod
+    def mark_identity(response):
+        """Tell after_request the body was already considered and is best sent uncompressed."""
+        response.vary.add("Accept-Encoding")
+        response.compression_skipped = True
+
+    @staticmethod
+    def mark_encoded(response, encoding):
+        response.headers["Content-Encoding"] = encoding
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            response.set_etag(etag, weak=True)
+
+    def after_request(self, response):
+        """Compress a Flask response in place when the client accepts an encoding."""
+        if not self.enabled or not compressible(response.mimetype):
+            return response
+        response.vary.add("Accept-Encoding")
+        if ("Content-Encoding" in response.headers or response.direct_passthrough
+                or getattr(response, "compression_skipped", False)
+                or response.status_code < 200 or response.status_code in (204, 206, 304)
+                or "no-transform" in (response.headers.get("Cache-Control") or "")):
+            return response
+
+        if response.is_streamed:
+            encoding = self.choose(request, response.mimetype)
+            if encoding is None:
+                return response
+            source = response.response
+            chunks = response.iter_encoded()
+            head, size = self._peek(chunks, source)
+            if size < self.min_size:
+                # The whole body arrived within the threshold: send it as it is
+                response.response = head
+                return response
+            response.response = self.compress_stream(itertools.chain(head, chunks), encoding, source)
+            response.headers.pop("Content-Length", None)
+        else:
+            data = response.get_data()
+            encoding = self.choose(request, response.mimetype, len(data))
+            if encoding is None:
+                return response
+            body = self.compress(data, encoding)
+            if len(body) >= len(data):
+                return response
+            response.set_data(body)
+        self.mark_encoded(response, encoding)
+        return response
+
+    def init_app(self, app):
+        app.after_request(self.after_request)
+        return app
+
+    def stats(self):
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "encodings": list(self.encodings),
+                "min_size": self.min_size,
+                "levels": {e: self.levels[e] for e in self.encodings},
+                "responses": dict(self.counts),
+                "streamed": self.streamed,
+                "bytes_in": self.bytes_in,
+                "bytes_out": self.bytes_out,
+            }
@@ -0,0 +1,264 @@
+"""Thread-safe connection pool used behind get_db_connection().
+
+The pool is driver agnostic: it is given a zero-argument ``connect`` callable
+(``pyodbc.connect`` bound to the connection string in production, or
+``sqlite3.connect`` / a fake driver when testing) and hands out wrapped
+connections whose ``close()`` returns them to the pool instead of tearing
+down the TCP/TLS/login session.
+"""
+import threading
+import time
+from collections import deque
+
+
+class PoolTimeout(Exception):
+    """Raised when no connection became available within the checkout timeout."""
+
+
+class PooledConnection:
+    """Proxy around a raw DB-API connection that goes back to the pool on close()."""
+
+    def __init__(self, pool, raw, created_at):
+        self._pool = pool
+        self._raw = raw
+        self.created_at = created_at
+        self.last_used = created_at
+        self._checked_out = False
+
+    def __getattr__(self, name):
+        # commit(), rollback(), add_output_converter(), ... go to the driver
+        return getattr(self._raw, name)
+
+    def cursor(self, *args, **kwargs):
+        cursor = self._raw.cursor(*args, **kwargs)
+        factory = self._pool.cursor_factory
+        return cursor if factory is None else factory(cursor)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    @property
+    def raw(self):
+        return self._raw
+
+    def close(self):
+        """Return the connection to the pool (idempotent)."""
+        if self._checked_out:
+            self._checked_out = False
+            self._pool._release(self)
+
+    def invalidate(self):
+        """Drop the underlying connection instead of returning it to the pool."""
+        if self._checked_out:
+            self._checked_out = False
+            self._pool._release(self, discard=True)
+
+
+class ConnectionPool:
+    """Bounded pool with checkout validation, max-age recycling and wait statistics.
+
+    - ``min_size`` connections are opened eagerly and kept around.
+    - At most ``max_size`` connections exist at once; further checkouts block for
+      up to ``timeout`` seconds and then raise :class:`PoolTimeout`.
+    - Connections older than ``max_age`` seconds are closed and replaced.
+    - A connection idle for longer than ``ping_interval`` seconds is validated with
+      ``validate_query`` before it is handed out (``ping_interval=0`` validates on
+      every checkout).
+    - ``cursor_factory``, when given, wraps every cursor handed out by a pooled
+      connection (e.g. to time queries); pool-internal validation uses raw cursors.
+    """
+
+    def __init__(self, connect, min_size=1, max_size=10, timeout=5.0, max_age=1800.0,
+                 ping_interval=10.0, validate_query="SELECT 1", cursor_factory=None):
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1")
+        if min_size < 0 or min_size > max_size:
+            raise ValueError("min_size must be between 0 and max_size")
+        self._connect = connect
+        self.min_size = min_size
+        self.max_size = max_size
+        self.timeout = timeout
+        self.max_age = max_age
+        self.ping_interval = ping_interval
+        self.validate_query = validate_query
+        self.cursor_factory = cursor_factory
+
+        self._lock = threading.Condition(threading.Lock())
+        self._idle = deque()
+        self._size = 0
+        self._in_use = 0
+        self._closed = False
+
+        self._created = 0
+        self._recycled = 0
+        self._invalidated = 0
+        self._checkouts = 0
+        self._waits = 0
+        self._timeouts = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+        for _ in range(min_size):
+            with self._lock:
+                self._size += 1
+            try:
+                conn = self._open()
+            except Exception:
+                with self._lock:
+                    self._size -= 1
+                raise
+            with self._lock:
+                self._idle.append(conn)
+
+    # -- internals --------------------------------------------------------
+
+    def _open(self):
+        raw = self._connect()
+        with self._lock:
+            self._created += 1
+        return PooledConnection(self, raw, time.monotonic())
+
+    def _close_raw(self, conn):
+        try:
+            conn.raw.close()
+        except Exception:
+            pass
+
+    def _expired(self, conn, now):
+        return self.max_age is not None and self.max_age > 0 and now - conn.created_at >= self.max_age
+
+    def _is_healthy(self, conn, now):
+        if self.ping_interval is not None and now - conn.last_used < self.ping_interval:
+            return True
+        try:
+            cursor = conn.raw.cursor()
+            try:
+                cursor.execute(self.validate_query)
+                cursor.fetchall()
+            finally:
+                cursor.close()
+            return True
+        except Exception:
+            return False
+
+    def _release(self, conn, discard=False):
+        if not discard:
+            try:
+                # Never hand the next request an open transaction.
+                conn.raw.rollback()
+            except Exception:
+                discard = True
+        now = time.monotonic()
+        if not discard and self._expired(conn, now):
+            discard = True
+            with self._lock:
+                self._recycled += 1
+        if discard:
+            self._close_raw(conn)
+        with self._lock:
+            self._in_use -= 1
+            if discard or self._closed:
+                self._size -= 1
+                if self._closed and not discard:
+                    self._close_raw(conn)
+            else:
+                conn.last_used = now
+                self._idle.append(conn)
+            self._lock.notify()
+
+    # -- public API -------------------------------------------------------
+
+    def getconn(self, timeout=None):
+        """Check out a validated connection, blocking up to ``timeout`` seconds."""
+        timeout = self.timeout if timeout is None else timeout
+        start = time.monotonic()
+        deadline = start + timeout
+        waited = False
+        while True:
+            conn = None
+            should_open = False
+            with self._lock:
+                if self._closed:
+                    raise PoolTimeout("Connection pool is closed")
+                while not self._idle and self._size >= self.max_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._timeouts += 1
+                        raise PoolTimeout(
+                            f"Timed out after {timeout:.1f}s waiting for a database connection "
+                            f"(pool max_size={self.max_size})")
+                    waited = True
+                    self._lock.wait(remaining)
+                if self._idle:
+                    conn = self._idle.pop()
+                else:
+                    self._size += 1
+                    should_open = True
+                self._in_use += 1
+
+            now = time.monotonic()
+            try:
+                if should_open:
+                    conn = self._open()
+                elif self._expired(conn, now) or not self._is_healthy(conn, now):
+                    self._close_raw(conn)
+                    with self._lock:
+                        if self._expired(conn, now):
+                            self._recycled += 1
+                        else:
+                            self._invalidated += 1
+                        self._size -= 1
+                        self._in_use -= 1
+                        self._lock.notify()
+                    continue
+            except Exception:
+                with self._lock:
+                    self._size -= 1
+                    self._in_use -= 1
+                    self._lock.notify()
+                raise
+
+            elapsed = time.monotonic() - start
+            with self._lock:
+                self._checkouts += 1
+                if waited:
+                    self._waits += 1
+                self._wait_total += elapsed
+                if elapsed > self._wait_max:
+                    self._wait_max = elapsed
+            conn._checked_out = True
+            return conn
+
+    def stats(self):
+        """Return a JSON-serialisable snapshot of the pool state and counters."""
+        with self._lock:
+            checkouts = self._checkouts
+            return {
+                "min_size": self.min_size,
+                "max_size": self.max_size,
+                "size": self._size,
+                "in_use": self._in_use,
+                "idle": len(self._idle),
+                "checkouts": checkouts,
+                "waits": self._waits,
+                "timeouts": self._timeouts,
+                "created": self._created,
+                "recycled": self._recycled,
+                "invalidated": self._invalidated,
+                "wait_avg_ms": round(self._wait_total / checkouts * 1000, 3) if checkouts else 0.0,
+                "wait_max_ms": round(self._wait_max * 1000, 3),
+            }
+
+    def close(self):
+        """Close idle connections; checked-out ones are closed when released."""
+        with self._lock:
+            self._closed = True
+            idle = list(self._idle)
+            self._idle.clear()
+            self._size -= len(idle)
+            self._lock.notify_all()
+        for conn in idle:
+            self._close_raw(conn)
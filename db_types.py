@@ -0,0 +1,113 @@
+"""Convert SQL values to JSON-ready Python values once, at fetch time.
+
+Two layers:
+
+- register_output_converters(conn) installs pyodbc output converters so DECIMAL /
+  NUMERIC columns come back from the driver as int/float instead of Decimal.
+- row_converter(cursor.description) compiles one converter per column from the
+  cursor's type codes (Decimal -> int/float, date/datetime/time -> ISO string);
+  columns whose type is unknown (e.g. SQLite) fall back to a per-value check.
+"""
+import datetime
+import decimal
+
+
+def decimal_value(val):
+    """Decimal -> int when whole, else float.
+
+    int/float pass through unchanged: with register_output_converters() installed the driver
+    already returns them, while cursor.description still reports Decimal for the column.
+    """
+    if isinstance(val, (int, float)):
+        return val
+    try:
+        if val == val.to_integral_value():
+            return int(val)
+        return float(val)
+    except Exception:
+        return float(val)
+
+
+def iso_value(val):
+    try:
+        return val.isoformat()
+    except Exception:
+        return str(val)
+
+
+def json_value(val):
+    """Generic per-value conversion used when the column type is not known up front."""
+    if isinstance(val, decimal.Decimal):
+        return decimal_value(val)
+    if isinstance(val, (datetime.date, datetime.datetime, datetime.time)):
+        return iso_value(val)
+    return val
+
+
+def _nullable(func):
+    def convert(val):
+        return None if val is None else func(val)
+    return convert
+
+
+# cursor.description type_code -> converter
+CONVERTERS = {
+    decimal.Decimal: _nullable(decimal_value),
+    datetime.datetime: _nullable(iso_value),
+    datetime.date: _nullable(iso_value),
+    datetime.time: _nullable(iso_value),
+}
+
+# Types that are already JSON-ready and need no conversion
+PASSTHROUGH = (str, int, float, bool)
+
+
+def register_converter(type_code, func):
+    """Register (or override) the converter used for columns reporting `type_code`."""
+    CONVERTERS[type_code] = _nullable(func)
+
+
+def row_converter(description):
+    """Compile a function turning a driver row into a list of JSON-ready values."""
+    converters = []
+    for column in description or ():
+        type_code = column[1]
+        if type_code in CONVERTERS:
+            converters.append(CONVERTERS[type_code])
+        elif isinstance(type_code, type) and issubclass(type_code, PASSTHROUGH):
+            converters.append(None)
+        else:
+            converters.append(json_value)
+
+    if not any(converters):
+        return list
+
+    def convert(row):
+        return [val if func is None else func(val) for func, val in zip(converters, row)]
+    return convert
+
+
+def rows_to_dicts(cursor, rows=None, columns=None):
+    """Fetch (or take) rows from `cursor` and return them as JSON-ready dicts."""
+    if rows is None:
+        rows = cursor.fetchall()
+    names = columns or [col[0] for col in cursor.description]
+    convert = row_converter(cursor.description)
+    return [dict(zip(names, convert(row))) for row in rows]
+
+
+def _decimal_from_text(raw):
+    if raw is None:
+        return None
+    return decimal_value(decimal.Decimal(raw.decode("ascii") if isinstance(raw, bytes) else raw))
+
+
+def register_output_converters(conn):
+    """Install driver-level converters on a pyodbc connection (no-op for other drivers)."""
+    add = getattr(conn, "add_output_converter", None)
+    if add is None:
+        return conn
+    import pyodbc
+    for sql_type in (pyodbc.SQL_DECIMAL, pyodbc.SQL_NUMERIC):
+        add(sql_type, _decimal_from_text)
+    return conn
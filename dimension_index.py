@@ -0,0 +1,255 @@
+"""In-memory index of the dropdown dimensions (ticket dates, product names, company names).
+
+The index is loaded once and then kept fresh by a background thread that only
+reads rows above the last seen ``Uniqueid`` (high-water mark). A periodic full
+reload picks up updates and deletes that an append-only watermark cannot see.
+Values are kept per Company_ID so the dropdowns can be scoped to one tenant.
+
+Request handlers read from memory only; rendered JSON bodies and their ETags are
+memoised until the next change, and so is the trigram index (see name_index.py)
+used to match product/company names.
+"""
+import hashlib
+import logging
+import threading
+import time
+
+from name_index import NgramIndex
+from trends import bucket_sql, to_date
+
+log = logging.getLogger("dashboard.dimensions")
+
+
+class DimensionIndex:
+    def __init__(self, get_connection, dialect="mssql", refresh_interval=60.0, full_reload_every=60,
+                 table="Chatbot_Transaction", fanout=None):
+        self._get_connection = get_connection
+        # Optional QueryFanout: the per-dimension queries then run concurrently
+        self._fanout = fanout
+        self.refresh_interval = refresh_interval
+        self.full_reload_every = full_reload_every
+        self.table = table
+        self.expressions = {
+            "dates": bucket_sql("Ticket_Creation_Date", "day", dialect),
+            "products": "Product_Name",
+            "companies": "Company_Name",
+        }
+
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()
+        self._values = {dim: {} for dim in self.expressions}
+        self._watermark = None
+        self._version = 0
+        self._rendered = {}
+        self._name_indexes = {}
+        self._loaded = False
+        self._refreshes = 0
+        self._last_refresh = 0.0
+        self._thread = None
+        self._stop = threading.Event()
+
+    # -- loading ------------------------------------------------------------
+
+    def _normalise(self, dim, value):
+        if value is None:
+            return None
+        if dim == "dates":
+            return to_date(value).isoformat()
+        return value
+
+    def _query(self, statements):
+        """Run [(sql, params), ...] and return each statement's rows."""
+        if self._fanout is not None:
+            return self._fanout.run(statements)
+        conn = self._get_connection()
+        try:
+            cursor = conn.cursor()
+            results = []
+            for sql, params in statements:
+                cursor.execute(sql, tuple(params))
+                results.append(cursor.fetchall())
+            cursor.close()
+            return results
+        finally:
+            conn.close()
+
+    def refresh(self, full=False):
+        """Pull new rows (or everything when `full`) into the index. Returns rows applied."""
+        [rows] = self._query([(f"SELECT MAX(Uniqueid) FROM {self.table}", [])])
+        high = rows[0][0] if rows else None
+        low = None if full else self._watermark
+        if high is None or (low is not None and high <= low):
+            if full:
+                self._swap({dim: {} for dim in self.expressions}, high)
+            return 0
+
+        # Bounded by the watermark read above, so the per-dimension queries see the same rows
+        where = " WHERE Uniqueid <= ?"
+        params = [high]
+        if low is not None:
+            where += " AND Uniqueid > ?"
+            params.append(low)
+
+        statements = [
+            (f"SELECT Company_ID, {expr} FROM {self.table}{where} GROUP BY Company_ID, {expr}", params)
+            for expr in self.expressions.values()
+        ]
+        fresh = {}
+        applied = 0
+        for dim, dim_rows in zip(self.expressions, self._query(statements)):
+            by_company = {}
+            for company_id, value in dim_rows:
+                value = self._normalise(dim, value)
+                if value is None:
+                    continue
+                key = str(company_id).strip() if company_id is not None else None
+                by_company.setdefault(key, set()).add(value)
+                applied += 1
+            fresh[dim] = by_company
+
+        if full:
+            self._swap(fresh, high)
+        else:
+            self._merge(fresh, high)
+        return applied
+
+    def _swap(self, values, watermark):
+        with self._lock:
+            changed = values != self._values
+            self._values = values
+            self._watermark = watermark
+            self._loaded = True
+            self._refreshes += 1
+            self._last_refresh = time.monotonic()
+            if changed:
+                self._version += 1
+                self._rendered.clear()
+                self._name_indexes.clear()
+
+    def _merge(self, fresh, watermark):
+        with self._lock:
+            changed = False
+            for dim, by_company in fresh.items():
+                current = self._values[dim]
+                for company_id, values in by_company.items():
+                    existing = current.setdefault(company_id, set())
+                    if not values <= existing:
+                        existing |= values
+                        changed = True
+            self._watermark = watermark
+            self._loaded = True
+            self._refreshes += 1
+            self._last_refresh = time.monotonic()
+            if changed:
+                self._version += 1
+                self._rendered.clear()
+                self._name_indexes.clear()
+
+    def ensure_loaded(self):
+        """Block until the first full load has happened (only the first caller queries)."""
+        if self._loaded:
+            return
+        with self._load_lock:
+            if not self._loaded:
+                self.refresh(full=True)
+
+    def refresh_if_stale(self, min_interval=1.0):
+        """Incremental refresh, skipped if one ran less than `min_interval` seconds ago."""
+        if time.monotonic() - self._last_refresh < min_interval:
+            return 0
+        return self.refresh()
+
+    # -- background refresh ---------------------------------------------------
+
+    def start(self):
+        """Load the index (if needed) and start the background refresh thread."""
+        self.ensure_loaded()
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="dimension-index", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        cycles = 0
+        while not self._stop.wait(self.refresh_interval):
+            cycles += 1
+            full = bool(self.full_reload_every) and cycles % self.full_reload_every == 0
+            try:
+                self.refresh(full=full)
+            except Exception as e:
+                log.warning("Dimension index refresh failed: %s", e)
+
+    # -- reads ----------------------------------------------------------------
+
+    def values(self, dim, company_id=None):
+        """Sorted distinct values of `dim`, optionally only for one Company_ID."""
+        with self._lock:
+            by_company = self._values[dim]
+            if company_id is not None:
+                found = set(by_company.get(str(company_id).strip(), ()))
+            else:
+                found = set().union(*by_company.values()) if by_company else set()
+        return sorted(found, key=lambda v: (str(v).casefold(), str(v)))
+
+    def name_index(self, dim):
+        """Trigram index over all values of `dim`, rebuilt after the values change."""
+        with self._lock:
+            version = self._version
+            index = self._name_indexes.get(dim)
+            if index is None:
+                by_company = self._values[dim]
+                values = set().union(*by_company.values()) if by_company else set()
+        if index is not None:
+            return index
+        index = NgramIndex(sorted(values, key=str))
+        with self._lock:
+            if self._version == version:
+                self._name_indexes[dim] = index
+        return index
+
+    def match(self, dim, needle, substring=False):
+        """Stored values of `dim` equal to (or containing) `needle`.
+
+        Comparison ignores case and surrounding whitespace, like the TRIM()/LIKE predicates it
+        replaces under SQL Server's default case-insensitive collation.
+        """
+        index = self.name_index(dim)
+        found = index.contains(needle) if substring else index.exact(needle)
+        return sorted(found, key=str)
+
+    def suggest(self, dim, needle, limit=10, company_id=None):
+        """Type-ahead: up to `limit` values of `dim` containing `needle`, best matches first."""
+        allowed = set(self.values(dim, company_id)) if company_id is not None else None
+        return self.name_index(dim).suggest(needle, limit, allowed)
+
+    def render(self, dim, company_id, render):
+        """Return (etag, body) for `dim`, memoised until the index changes.
+
+        `render(values)` turns the sorted value list into response bytes.
+        """
+        key = (dim, str(company_id).strip() if company_id is not None else None)
+        with self._lock:
+            version = self._version
+            cached = self._rendered.get(key)
+        if cached is not None:
+            return cached
+        body = render(self.values(dim, key[1]))
+        result = (hashlib.blake2b(body, digest_size=16).hexdigest(), body)
+        with self._lock:
+            if self._version == version:
+                self._rendered[key] = result
+        return result
+
+    def stats(self):
+        with self._lock:
+            return {
+                "loaded": self._loaded,
+                "watermark": self._watermark,
+                "version": self._version,
+                "refreshes": self._refreshes,
+                "companies": len(self._values["companies"]),
+                "sizes": {dim: len(set().union(*v.values())) if v else 0 for dim, v in self._values.items()},
+            }
@@ -0,0 +1,232 @@
+"""In-process copy of Chatbot_Emp, indexed by Emp_ID and Email_Id.
+
+Login, /api/getemployees and token checks read employees from here instead of
+querying the table on every call, so a burst of sign-ins at shift start costs no
+database round trips. The directory is loaded once. The employee endpoints of
+this process update it write-through after they commit: they re-read or drop
+the rows they touched. A background reconcile reloads the whole table
+periodically to pick up changes made elsewhere (other processes, direct SQL).
+A write-through that lands while a reload is reading the table is not lost: the
+reload notes the ids written meanwhile and re-reads them, after their commit,
+before it swaps in the new maps.
+
+A lookup by email or Emp_ID that misses falls back to one indexed query, so an
+employee added by another process can sign in (and use their token) before the
+next reconcile.
+"""
+import logging
+import threading
+import time
+
+from db_types import rows_to_dicts
+
+log = logging.getLogger("dashboard.employees")
+
+# Rows per `Emp_ID IN (...)` re-read
+LOOKUP_CHUNK = 1000
+
+
+class EmployeeDirectory:
+    def __init__(self, get_connection, dialect="mssql", reconcile_interval=300.0, table="Chatbot_Emp"):
+        self._get_connection = get_connection
+        self.dialect = dialect
+        self.reconcile_interval = reconcile_interval
+        self.table = table
+
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()
+        self._by_id = {}
+        self._by_email = {}
+        # Ids written through during a reload ({id: generation}); None when no reload runs
+        self._written = None
+        self._generation = 0
+        self._loaded = False
+        self._reloads = 0
+        self._db_lookups = 0
+        self._last_reload = 0.0
+        self._thread = None
+        self._stop = threading.Event()
+
+    def _email_key(self, email):
+        # SQL Server's default collation compares Email_Id case- and trailing-space-insensitively
+        if email is None:
+            return None
+        email = str(email)
+        return email.rstrip().casefold() if self.dialect == "mssql" else email
+
+    def _id_key(self, emp_id):
+        return None if emp_id is None else str(emp_id).strip()
+
+    def _query(self, sql, params=()):
+        conn = self._get_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.execute(sql, tuple(params))
+            employees = rows_to_dicts(cursor)
+            cursor.close()
+            return employees
+        finally:
+            conn.close()
+
+    def _index_email(self, by_email, employee):
+        key = self._email_key(employee.get("Email_Id"))
+        if key is not None:
+            # Like fetchone() on the old query: the first employee with that email wins
+            by_email.setdefault(key, employee)
+
+    # -- loading ------------------------------------------------------------
+
+    def _read_ids(self, ids):
+        """{id: employee} for those of `ids` still in the table."""
+        found = {}
+        for start in range(0, len(ids), LOOKUP_CHUNK):
+            chunk = ids[start:start + LOOKUP_CHUNK]
+            for employee in self._query(
+                    f"SELECT * FROM {self.table} WHERE Emp_ID IN ({', '.join('?' for _ in chunk)})", chunk):
+                found[self._id_key(employee.get("Emp_ID"))] = employee
+        return found
+
+    def _apply(self, by_id, ids, found):
+        for emp_id in ids:
+            if emp_id in found:
+                by_id[emp_id] = found[emp_id]
+            else:
+                by_id.pop(emp_id, None)
+
+    def _email_index(self, by_id):
+        by_email = {}
+        for employee in by_id.values():
+            self._index_email(by_email, employee)
+        return by_email
+
+    def _note_written(self, ids):
+        # Caller holds self._lock
+        self._generation += 1
+        if self._written is not None:
+            for emp_id in ids:
+                self._written[emp_id] = self._generation
+
+    def reload(self):
+        """Replace the directory with the current table contents. Returns the employee count."""
+        with self._load_lock:
+            return self._reload()
+
+    def _reload(self):
+        with self._lock:
+            self._written = {}
+            since = self._generation
+        try:
+            by_id = {}
+            for employee in self._query(f"SELECT * FROM {self.table}"):
+                by_id[self._id_key(employee.get("Emp_ID"))] = employee
+            while True:
+                with self._lock:
+                    stale = [emp_id for emp_id, generation in self._written.items() if generation > since]
+                    if not stale:
+                        self._by_id = by_id
+                        self._by_email = self._email_index(by_id)
+                        self._loaded = True
+                        self._reloads += 1
+                        self._last_reload = time.monotonic()
+                        return len(by_id)
+                    since = self._generation
+                # Written while the table was being read: the full read may predate the commit
+                self._apply(by_id, stale, self._read_ids(stale))
+        finally:
+            with self._lock:
+                self._written = None
+
+    def ensure_loaded(self):
+        if self._loaded:
+            return
+        with self._load_lock:
+            if not self._loaded:
+                self._reload()
+
+    def refresh_ids(self, emp_ids):
+        """Write-through: re-read `emp_ids` from the table; ids no longer there are dropped."""
+        ids = list(dict.fromkeys(self._id_key(e) for e in emp_ids if e is not None))
+        if not ids:
+            return
+        if not self._loaded:
+            with self._lock:
+                self._note_written(ids)
+            return
+        found = self._read_ids(ids)
+        with self._lock:
+            self._note_written(ids)
+            by_id = dict(self._by_id)
+            self._apply(by_id, ids, found)
+            self._by_id = by_id
+            self._by_email = self._email_index(by_id)
+
+    def remove(self, emp_id):
+        """Write-through for a delete."""
+        key = self._id_key(emp_id)
+        with self._lock:
+            self._note_written([key])
+            if key not in self._by_id:
+                return
+            by_id = dict(self._by_id)
+            del by_id[key]
+            self._by_id = by_id
+            self._by_email = self._email_index(by_id)
+
+    # -- background reconcile ---------------------------------------------------
+
+    def start(self):
+        self.ensure_loaded()
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="employee-directory", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.wait(self.reconcile_interval):
+            try:
+                self.reload()
+            except Exception as e:
+                log.warning("Employee directory reconcile failed: %s", e)
+
+    # -- reads ----------------------------------------------------------------
+
+    @property
+    def loaded(self):
+        return self._loaded
+
+    def _fetch(self, column, value):
+        """One indexed lookup for an employee the directory does not hold yet."""
+        self._db_lookups += 1
+        rows = self._query(f"SELECT * FROM {self.table} WHERE {column} = ?", (value,))
+        if rows:
+            self.refresh_ids([rows[0].get("Emp_ID")])
+            return rows[0]
+        return None
+
+    def by_email(self, email):
+        """The employee dict for `email`, from memory or (on a miss) one database lookup."""
+        self.ensure_loaded()
+        employee = self._by_email.get(self._email_key(email))
+        return employee if employee is not None else self._fetch("Email_Id", email)
+
+    def by_emp_id(self, emp_id):
+        """The employee dict for `emp_id`, from memory or (on a miss) one database lookup."""
+        self.ensure_loaded()
+        employee = self._by_id.get(self._id_key(emp_id))
+        return employee if employee is not None else self._fetch("Emp_ID", emp_id)
+
+    def all(self):
+        self.ensure_loaded()
+        return list(self._by_id.values())
+
+    def stats(self):
+        return {
+            "loaded": self._loaded,
+            "employees": len(self._by_id),
+            "reloads": self._reloads,
+            "db_lookups": self._db_lookups,
+            "seconds_since_reload": round(time.monotonic() - self._last_reload, 1) if self._loaded else None,
+        }
@@ -0,0 +1,168 @@
+"""Bulk import / upsert of Chatbot_Emp rows from JSON or CSV.
+
+The rows are parsed and validated in Python first; every problem is reported
+against its row number and nothing is written for that row. Valid rows are
+staged in a temporary table with multi-row INSERTs. A single set-based upsert
+then applies them: MERGE on SQL Server, INSERT ... ON CONFLICT on SQLite.
+Unknown Emp_IDs are inserted; known ones are updated, and a missing or empty
+value keeps what is stored. Everything runs in one transaction.
+"""
+import csv
+import io
+
+EMP_COLUMNS = ["Emp_ID", "Emp_Name", "Email_Id", "Company_ID", "Department_ID", "Role", "Other", "App_Role", "Password"]
+
+# Needed to create an employee (as for POST /api/employees); updates only need Emp_ID
+REQUIRED_FOR_INSERT = ["Emp_ID", "Emp_Name", "Email_Id", "Company_ID", "Role"]
+
+STAGE_TABLE = "Chatbot_Emp_Stage"
+
+# Staged rows per INSERT statement (9 parameters each; SQL Server allows 2100 per statement)
+STAGE_CHUNK = 200
+# Emp_IDs per existence lookup
+LOOKUP_CHUNK = 1000
+
+_COLUMN_LOOKUP = {c.lower(): c for c in EMP_COLUMNS}
+
+
+def _clean(value):
+    if value is None:
+        return None
+    value = str(value).strip()
+    return value or None
+
+
+def parse_json_rows(data):
+    """[(row number, {column: value}), ...] from a JSON list (or {"employees": [...]})."""
+    if isinstance(data, dict):
+        data = data.get("employees")
+    if not isinstance(data, list):
+        raise ValueError("Expected a JSON array of employees or {\"employees\": [...]}")
+    return list(enumerate(data, start=1))
+
+
+def parse_csv_rows(text):
+    """[(line number, {column: value}), ...] from CSV text with a header row."""
+    reader = csv.DictReader(io.StringIO(text))
+    if not reader.fieldnames:
+        raise ValueError("CSV upload is empty")
+    unknown = [name for name in reader.fieldnames if name and name.strip().lower() not in _COLUMN_LOOKUP]
+    if unknown:
+        raise ValueError(f"Unknown CSV column(s) {', '.join(unknown)}. Allowed: {', '.join(EMP_COLUMNS)}")
+    # Data starts on line 2, after the header
+    return [(reader.line_num, row) for row in reader]
+
+
+def normalise_row(raw):
+    """(values by canonical column name, errors) for one parsed row."""
+    if not isinstance(raw, dict):
+        return None, ["Row must be an object"]
+    values = {}
+    errors = []
+    for key, value in raw.items():
+        column = _COLUMN_LOOKUP.get(str(key).strip().lower()) if key is not None else None
+        if column is None:
+            errors.append(f"Unknown field '{key}'")
+            continue
+        if isinstance(value, (dict, list)):
+            errors.append(f"Field '{column}' must be a scalar")
+            continue
+        values[column] = _clean(value)
+    if not values.get("Emp_ID"):
+        errors.append("Emp_ID is required")
+    if values.get("Email_Id") and "@" not in values["Email_Id"]:
+        errors.append("Email_Id is not an email address")
+    return values, errors
+
+
+def existing_emp_ids(cursor, emp_ids):
+    """The subset of `emp_ids` already in Chatbot_Emp."""
+    ids = list(dict.fromkeys(emp_ids))
+    found = set()
+    for start in range(0, len(ids), LOOKUP_CHUNK):
+        chunk = ids[start:start + LOOKUP_CHUNK]
+        cursor.execute(f"SELECT Emp_ID FROM Chatbot_Emp WHERE Emp_ID IN ({', '.join('?' for _ in chunk)})",
+                       tuple(chunk))
+        found.update(str(row[0]).strip() for row in cursor.fetchall())
+    return found
+
+
+def normalise_rows(parsed):
+    """[(row number, values, errors), ...] for parse_json_rows()/parse_csv_rows() output."""
+    return [(number,) + normalise_row(raw) for number, raw in parsed]
+
+
+def emp_ids(normalised):
+    return [values["Emp_ID"] for _, values, _ in normalised if values and values.get("Emp_ID")]
+
+
+def validate(normalised, existing):
+    """Split normalised rows into (valid [(row number, values)], results for every row).
+
+    `existing` is the set of Emp_IDs already stored; new employees need REQUIRED_FOR_INSERT.
+    Each result is {"row", "Emp_ID", "status", ["errors"]}; valid rows get status
+    "insert" or "update".
+    """
+    valid = []
+    results = []
+    first_seen = {}
+    for number, values, errors in normalised:
+        errors = list(errors)
+        emp_id = (values or {}).get("Emp_ID")
+        if emp_id and emp_id in first_seen:
+            errors.append(f"Duplicate Emp_ID (first seen in row {first_seen[emp_id]})")
+        elif emp_id:
+            first_seen[emp_id] = number
+        action = "update" if emp_id in existing else "insert"
+        if not errors and action == "insert":
+            missing = [c for c in REQUIRED_FOR_INSERT if not values.get(c)]
+            if missing:
+                errors.append(f"New employee is missing {', '.join(missing)}")
+        result = {"row": number, "Emp_ID": emp_id}
+        if errors:
+            result.update(status="invalid", errors=errors)
+        else:
+            result["status"] = action
+            valid.append((number, values))
+        results.append(result)
+    return valid, results
+
+
+def _stage_ddl(dialect):
+    if dialect == "sqlite":
+        columns = ", ".join(f"{c} TEXT" + (" PRIMARY KEY" if c == "Emp_ID" else "") for c in EMP_COLUMNS)
+        return [f"DROP TABLE IF EXISTS temp.{STAGE_TABLE}", f"CREATE TEMP TABLE {STAGE_TABLE} ({columns})"]
+    columns = ", ".join(f"{c} NVARCHAR(400) " + ("NOT NULL PRIMARY KEY" if c == "Emp_ID" else "NULL") for c in EMP_COLUMNS)
+    return [
+        f"IF OBJECT_ID('tempdb..#{STAGE_TABLE}') IS NOT NULL DROP TABLE #{STAGE_TABLE}",
+        f"CREATE TABLE #{STAGE_TABLE} ({columns})",
+    ]
+
+
+def _upsert_sql(dialect):
+    names = ", ".join(EMP_COLUMNS)
+    updates = [c for c in EMP_COLUMNS if c != "Emp_ID"]
+    if dialect == "sqlite":
+        assignments = ", ".join(f"{c} = COALESCE(excluded.{c}, Chatbot_Emp.{c})" for c in updates)
+        # WHERE true disambiguates ON CONFLICT after INSERT ... SELECT
+        return (f"INSERT INTO Chatbot_Emp ({names}) SELECT {names} FROM temp.{STAGE_TABLE} WHERE true"
+                f" ON CONFLICT(Emp_ID) DO UPDATE SET {assignments}")
+    assignments = ", ".join(f"t.{c} = COALESCE(s.{c}, t.{c})" for c in updates)
+    return (f"MERGE Chatbot_Emp WITH (HOLDLOCK) AS t USING #{STAGE_TABLE} AS s ON t.Emp_ID = s.Emp_ID"
+            f" WHEN MATCHED THEN UPDATE SET {assignments}"
+            f" WHEN NOT MATCHED THEN INSERT ({names}) VALUES ({', '.join('s.' + c for c in EMP_COLUMNS)});")
+
+
+def upsert(cursor, valid, dialect="mssql"):
+    """Stage `valid` rows and apply them with one set-based upsert; the caller commits."""
+    for statement in _stage_ddl(dialect):
+        cursor.execute(statement)
+    stage = STAGE_TABLE if dialect == "sqlite" else f"#{STAGE_TABLE}"
+    rows = [tuple(values.get(c) for c in EMP_COLUMNS) for _, values in valid]
+    placeholders = "(" + ", ".join("?" for _ in EMP_COLUMNS) + ")"
+    for start in range(0, len(rows), STAGE_CHUNK):
+        chunk = rows[start:start + STAGE_CHUNK]
+        cursor.execute(f"INSERT INTO {stage} ({', '.join(EMP_COLUMNS)}) VALUES {', '.join(placeholders for _ in chunk)}",
+                       tuple(value for row in chunk for value in row))
+    cursor.execute(_upsert_sql(dialect))
+    cursor.execute(f"DROP TABLE {'temp.' + STAGE_TABLE if dialect == 'sqlite' else stage}")
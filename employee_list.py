@@ -0,0 +1,140 @@
+"""Pagination, projection, filters and prefix search for /api/getemployees.
+
+Employees are ordered by Emp_ID (the primary key). A page is either keyset-based
+(an opaque cursor holding the last Emp_ID, so every page is an index seek) or,
+for screens with page numbers, offset-based. The selected columns, the
+Company_ID / Role / Department_ID filters and the name/email prefix search are
+all compiled into the SQL, so the database returns just one page.
+
+Password is never selectable: it is left out of EMPLOYEE_FIELDS altogether.
+"""
+import base64
+import json
+
+
+EMPLOYEE_FIELDS = [
+    "Emp_ID", "Emp_Name", "Email_Id", "Company_ID", "Department_ID", "Role", "Other", "App_Role",
+]
+
+# (query parameter, column) for the exact-match filters
+FILTER_COLUMNS = [("company_id", "Company_ID"), ("role", "Role"), ("department_id", "Department_ID")]
+
+# Columns a `q=` prefix search matches
+SEARCH_COLUMNS = ["Emp_Name", "Email_Id"]
+
+# Column needed to build the next cursor, selected even when not requested
+KEY_FIELD = "Emp_ID"
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+
+def parse_fields(raw):
+    """Validate a comma-separated `fields=` value; None/empty means every field (Password excluded)."""
+    if not raw:
+        return list(EMPLOYEE_FIELDS)
+    lookup = {f.lower(): f for f in EMPLOYEE_FIELDS}
+    fields = []
+    for name in raw.split(","):
+        name = name.strip()
+        if not name:
+            continue
+        field = lookup.get(name.lower())
+        if field is None:
+            raise ValueError(f"Unknown field '{name}'. Allowed: {', '.join(EMPLOYEE_FIELDS)}")
+        if field not in fields:
+            fields.append(field)
+    return fields or list(EMPLOYEE_FIELDS)
+
+
+def parse_page_size(raw):
+    if raw is None or raw == "":
+        return DEFAULT_PAGE_SIZE
+    try:
+        size = int(raw)
+    except ValueError:
+        raise ValueError("limit must be an integer")
+    if size < 1:
+        raise ValueError("limit must be at least 1")
+    return min(size, MAX_PAGE_SIZE)
+
+
+def parse_offset(raw):
+    if raw is None or raw == "":
+        return None
+    try:
+        offset = int(raw)
+    except ValueError:
+        raise ValueError("offset must be an integer")
+    if offset < 0:
+        raise ValueError("offset must not be negative")
+    return offset
+
+
+def encode_cursor(emp_id):
+    raw = json.dumps([emp_id], separators=(",", ":"), default=str).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    """Return the Emp_ID from a cursor made by encode_cursor."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        (emp_id,) = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return emp_id
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+
+def _like_prefix(text, dialect):
+    """LIKE pattern matching values that start with `text` (wildcards in `text` escaped with '\\')."""
+    specials = "\\%_[" if dialect == "mssql" else "\\%_"
+    return "".join("\\" + ch if ch in specials else ch for ch in text) + "%"
+
+
+def build_employee_filters(filters=None, search=None, dialect="mssql"):
+    """Return (" WHERE ...", params); ("", []) when unfiltered.
+
+    `filters` maps column names from FILTER_COLUMNS to exact values; `search` is matched as
+    a prefix of any SEARCH_COLUMNS column (case-insensitively under SQL Server's default collation).
+    """
+    clauses = []
+    params = []
+    for column, value in (filters or {}).items():
+        clauses.append(f"{column} = ?")
+        params.append(value)
+    if search:
+        pattern = _like_prefix(search, dialect)
+        clauses.append("(" + " OR ".join(f"{c} LIKE ? ESCAPE '\\'" for c in SEARCH_COLUMNS) + ")")
+        params.extend(pattern for _ in SEARCH_COLUMNS)
+    if not clauses:
+        return "", []
+    return " WHERE " + " AND ".join(clauses), params
+
+
+def selected_columns(fields):
+    """Columns the employee query selects: the requested fields, then the key if missing."""
+    return list(fields) + ([KEY_FIELD] if KEY_FIELD not in fields else [])
+
+
+def compile_employee_query(where, params, fields, after=None, limit=None, offset=None, dialect="mssql"):
+    """SELECT for one page (or everything when `limit` is None) of the employee list."""
+    columns = selected_columns(fields)
+    params = list(params)
+    if after is not None:
+        where = (where + " AND " if where else " WHERE ") + f"{KEY_FIELD} > ?"
+        params.append(after)
+
+    sql = f"SELECT {', '.join(columns)} FROM Chatbot_Emp{where} ORDER BY {KEY_FIELD}"
+    if limit is None:
+        return sql, params
+    if dialect == "sqlite":
+        sql += " LIMIT ? OFFSET ?"
+        params += [limit, offset or 0]
+    elif offset:
+        sql += " OFFSET ? ROWS FETCH NEXT ? ROWS ONLY"
+        params += [offset, limit]
+    else:
+        sql = sql.replace("SELECT ", "SELECT TOP (?) ", 1)
+        params.insert(0, limit)
+    return sql, params
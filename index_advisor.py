@@ -0,0 +1,129 @@
+"""Print (or apply) the indexes the dashboard query shapes need.
+
+Usage:
+    python index_advisor.py                 # print SQL Server DDL
+    python index_advisor.py --columnstore   # also suggest a nonclustered columnstore index
+    python index_advisor.py --apply         # run the DDL against the .env database
+    python index_advisor.py --dialect sqlite --apply --sqlite-path local.db
+
+Every statement is idempotent (guarded by IF NOT EXISTS), so --apply can be re-run.
+"""
+import argparse
+import sqlite3
+
+
+# Columns read by the stats / charts / trends aggregates once the filters are applied.
+AGGREGATE_COLUMNS = [
+    "Ticket_Status", "Company_Work_Feedback", "Ticket_Priority", "Ticket_Category",
+    "Ticket_Day_Open", "Product_Name", "Company_Name", "Company_ID", "Company_Email",
+]
+
+# (index name, table, key columns, included columns, query shape it serves)
+RECOMMENDED_INDEXES = [
+    ("IX_Chatbot_Transaction_Created", "Chatbot_Transaction",
+     ["Ticket_Creation_Date"], AGGREGATE_COLUMNS,
+     "stats/charts/trends/dashboard over a date range (Ticket_Creation_Date >= ? AND < ?)"),
+    ("IX_Chatbot_Transaction_Company_Created", "Chatbot_Transaction",
+     ["Company_ID", "Ticket_Creation_Date"], [c for c in AGGREGATE_COLUMNS if c != "Company_ID"],
+     "dashboard views scoped by Company_ID = ?, optionally with a date range"),
+    ("IX_Chatbot_Transaction_Product_Created", "Chatbot_Transaction",
+     ["Product_Name", "Ticket_Creation_Date"], [c for c in AGGREGATE_COLUMNS if c != "Product_Name"],
+     "dashboard views filtered by Product_Name = ? / IN (...)"),
+    ("IX_Chatbot_Transaction_CompanyName_Created", "Chatbot_Transaction",
+     ["Company_Name", "Ticket_Creation_Date"], [c for c in AGGREGATE_COLUMNS if c != "Company_Name"],
+     "dashboard views filtered by Company_Name = ? / IN (...)"),
+    ("IX_Chatbot_Transaction_Tickets", "Chatbot_Transaction",
+     ["Company_ID", "Company_Email", "Ticket_Creation_Date DESC", "Uniqueid DESC"], [],
+     "/api/tickets list ordered by Ticket_Creation_Date DESC (keyset pages)"),
+    ("IX_Chatbot_Transaction_TicketNo", "Chatbot_Transaction",
+     ["Ticket_No"], [],
+     "comment lookups by Ticket_No"),
+    ("IX_Chatbot_Emp_Email", "Chatbot_Emp",
+     ["Email_Id"], [],
+     "login lookups by Email_Id"),
+    ("IX_Chatbot_Emp_Name", "Chatbot_Emp",
+     ["Emp_Name"], [],
+     "/api/getemployees prefix search (Emp_Name LIKE 'x%')"),
+    ("IX_Chatbot_Emp_Company", "Chatbot_Emp",
+     ["Company_ID", "Emp_ID"], [],
+     "/api/getemployees filtered by Company_ID = ?, paged by Emp_ID"),
+]
+
+COLUMNSTORE_INDEX = (
+    "NCCI_Chatbot_Transaction_Dashboard", "Chatbot_Transaction",
+    ["Ticket_Creation_Date"] + AGGREGATE_COLUMNS,
+)
+
+
+def index_ddl(name, table, keys, include=(), dialect="mssql"):
+    """CREATE INDEX statement for one recommendation, guarded so it can be re-run."""
+    key_sql = ", ".join(keys)
+    if dialect == "sqlite":
+        # SQLite has no INCLUDE; its covering indexes need the columns in the key.
+        extra = [c for c in include if c not in [k.split()[0] for k in keys]]
+        key_sql = ", ".join(list(keys) + extra)
+        return f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({key_sql})"
+    include_sql = f" INCLUDE ({', '.join(include)})" if include else ""
+    return (
+        f"IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = '{name}' "
+        f"AND object_id = OBJECT_ID('{table}'))\n"
+        f"    CREATE NONCLUSTERED INDEX {name} ON {table} ({key_sql}){include_sql}"
+    )
+
+
+def columnstore_ddl():
+    name, table, columns = COLUMNSTORE_INDEX
+    return (
+        f"IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = '{name}' "
+        f"AND object_id = OBJECT_ID('{table}'))\n"
+        f"    CREATE NONCLUSTERED COLUMNSTORE INDEX {name} ON {table} ({', '.join(columns)})"
+    )
+
+
+def recommended_ddl(dialect="mssql", columnstore=False):
+    """List of (comment, statement) pairs."""
+    statements = [
+        (shape, index_ddl(name, table, keys, include, dialect))
+        for name, table, keys, include, shape in RECOMMENDED_INDEXES
+    ]
+    if columnstore and dialect == "mssql":
+        statements.append(("batch-mode scans for unfiltered all-company aggregates", columnstore_ddl()))
+    return statements
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Recommended indexes for the dashboard queries")
+    parser.add_argument("--dialect", choices=["mssql", "sqlite"], default="mssql")
+    parser.add_argument("--columnstore", action="store_true",
+                        help="also recommend a nonclustered columnstore index (SQL Server)")
+    parser.add_argument("--apply", action="store_true", help="execute the DDL instead of only printing it")
+    parser.add_argument("--sqlite-path", help="database file for --dialect sqlite --apply")
+    args = parser.parse_args(argv)
+
+    statements = recommended_ddl(args.dialect, args.columnstore)
+    for shape, ddl in statements:
+        print(f"-- {shape}\n{ddl};\n")
+
+    if not args.apply:
+        return 0
+
+    if args.dialect == "sqlite":
+        if not args.sqlite_path:
+            parser.error("--sqlite-path is required with --dialect sqlite --apply")
+        conn = sqlite3.connect(args.sqlite_path)
+    else:
+        from app import _connect_pyodbc
+        conn = _connect_pyodbc()
+    try:
+        cursor = conn.cursor()
+        for shape, ddl in statements:
+            cursor.execute(ddl)
+        conn.commit()
+        print(f"✅ Applied {len(statements)} index statement(s).")
+    finally:
+        conn.close()
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
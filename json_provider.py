@@ -0,0 +1,66 @@
+"""Flask JSON providers: orjson when installed, the standard library otherwise.
+
+Both encode Decimal as int/float (the same rule as db_types) and leave every other
+type to Flask's DefaultJSONProvider.default: dates as HTTP dates, UUIDs, dataclasses
+and __html__ objects as before. Query results reach the encoder already converted
+by db_types, so this only matters for values built in Python. Both sort keys like
+Flask's default provider, and indent only in debug mode.
+Select with JSON_BACKEND=auto|orjson|std.
+"""
+import decimal
+
+from flask.json.provider import DefaultJSONProvider
+
+from db_types import decimal_value
+
+try:
+    import orjson
+except ImportError:  # optional speed-up
+    orjson = None
+
+
+def json_default(obj):
+    if isinstance(obj, decimal.Decimal):
+        return decimal_value(obj)
+    return DefaultJSONProvider.default(obj)
+
+
+class StdJSONProvider(DefaultJSONProvider):
+    """Flask's default provider with Decimal -> number."""
+    default = staticmethod(json_default)
+
+
+class OrjsonProvider(StdJSONProvider):
+    """orjson-backed provider; response() hands orjson's bytes straight to the response."""
+
+    def _options(self, kwargs):
+        # Dates go through json_default so they match the std provider (orjson would write ISO)
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        if kwargs.get("sort_keys", self.sort_keys):
+            option |= orjson.OPT_SORT_KEYS
+        compact = self.compact if self.compact is not None else not self._app.debug
+        if kwargs.get("indent") or not compact:
+            option |= orjson.OPT_INDENT_2
+        return option
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=json_default, option=self._options(kwargs)).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        body = orjson.dumps(obj, default=json_default,
+                            option=self._options({}) | orjson.OPT_APPEND_NEWLINE)
+        return self._app.response_class(body, mimetype=self.mimetype)
+
+
+def select_provider(backend="auto"):
+    """Provider class for JSON_BACKEND; "auto" prefers orjson when it is installed."""
+    backend = (backend or "auto").strip().lower()
+    if backend == "std" or (backend == "auto" and orjson is None):
+        return StdJSONProvider
+    if orjson is None:
+        raise RuntimeError("JSON_BACKEND=orjson but orjson is not installed")
+    return OrjsonProvider
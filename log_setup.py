@@ -0,0 +1,128 @@
+"""Structured, non-blocking logging for the dashboard API.
+
+Loggers live under the "dashboard" namespace (dashboard.api, dashboard.sql,
+dashboard.auth, ...). Handlers never run on the request thread: records go onto
+a queue through a QueueHandler and a QueueListener thread formats and writes them.
+
+Environment:
+    LOG_LEVEL               base level for all dashboard loggers (default INFO)
+    LOG_LEVELS              per-subsystem overrides, e.g. "sql=DEBUG,pool=WARNING"
+    LOG_FORMAT              "json" (default) or "text"
+    LOG_DEBUG_SAMPLE_RATE   fraction of DEBUG records kept, 0.0-1.0 (default 1.0)
+
+Call sites use lazy %-style arguments (log.debug("rows=%s", n)), so when a level
+is disabled the message is never formatted; the level check itself is cached by
+the logging module. Guard expensive argument construction with
+log.isEnabledFor(logging.DEBUG).
+"""
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+import time
+
+ROOT = "dashboard"
+
+# Attributes every LogRecord has; anything else came in through `extra=` and is structured data
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime"}
+
+_listener = None
+
+
+def get_logger(subsystem):
+    return logging.getLogger(f"{ROOT}.{subsystem}")
+
+
+class DebugSampler(logging.Filter):
+    """Keep only a fraction of DEBUG records; other levels always pass."""
+
+    def __init__(self, rate):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record):
+        if record.levelno > logging.DEBUG or self.rate >= 1.0:
+            return True
+        return random.random() < self.rate
+
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that leaves formatting to the listener thread instead of the caller."""
+
+    def prepare(self, record):
+        return record
+
+
+class JSONFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            "ts": time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(record.created)) + f".{int(record.msecs):03d}Z",
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+def parse_levels(spec):
+    """"sql=DEBUG,pool=WARNING" -> {"sql": 10, "pool": 30} (unknown levels are ignored)."""
+    levels = {}
+    for part in (spec or "").split(","):
+        if "=" not in part:
+            continue
+        name, level = (p.strip() for p in part.split("=", 1))
+        value = logging.getLevelName(level.upper())
+        if name and isinstance(value, int):
+            levels[name] = value
+    return levels
+
+
+def configure_logging(level=None, levels=None, fmt=None, sample_rate=None, stream=None):
+    """Install the queue-backed handler on the "dashboard" logger (safe to call again)."""
+    global _listener
+    level = level or os.getenv("LOG_LEVEL", "INFO")
+    levels = parse_levels(os.getenv("LOG_LEVELS", "")) if levels is None else levels
+    fmt = (fmt or os.getenv("LOG_FORMAT", "json")).lower()
+    rate = float(os.getenv("LOG_DEBUG_SAMPLE_RATE", "1.0")) if sample_rate is None else sample_rate
+
+    root = logging.getLogger(ROOT)
+    root.setLevel(logging.getLevelName(str(level).upper()) if isinstance(level, str) else level)
+    root.propagate = False
+    for name, value in levels.items():
+        logging.getLogger(f"{ROOT}.{name}").setLevel(value)
+
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+
+    output = logging.StreamHandler(stream or sys.stdout)
+    output.setFormatter(JSONFormatter() if fmt == "json" else
+                        logging.Formatter("%(asctime)s %(levelname)s %(name)s %(message)s"))
+
+    records = queue.SimpleQueue()
+    queue_handler = DeferredQueueHandler(records)
+    queue_handler.addFilter(DebugSampler(rate))
+    root.addHandler(queue_handler)
+
+    _listener = logging.handlers.QueueListener(records, output, respect_handler_level=True)
+    _listener.start()
+    return root
+
+
+@atexit.register
+def _flush():
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
@@ -0,0 +1,292 @@
+"""Prometheus-style request and phase metrics, exported as text on /metrics.
+
+Per route we record request latency, response size, in-flight requests and rows
+fetched, plus a latency histogram per phase of the request:
+
+    connect    checking a connection out of the pool
+    execute    cursor.execute()
+    fetch      fetchone/fetchmany/fetchall
+    aggregate  building the stats / charts / trends payload in Python
+    serialize  JSON encoding
+
+Phase time is summed per request and observed once when the request ends, so
+the phase histograms are comparable with the request histogram. Work done
+outside a request (background refreshes, streamed bodies) is recorded under
+route "-". Recording is a dict update plus one short lock per metric.
+"""
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+_request_state = contextvars.ContextVar("metrics_request_state", default=None)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+def _number(value):
+    if value == float("inf"):
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name, help_text, labelnames=()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, labels=(), amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            items = list(self._values.items())
+        for labels, value in sorted(items):
+            yield self.name, _labels(self.labelnames, labels), value
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, labels=(), amount=1):
+        self.inc(labels, -amount)
+
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name, help_text, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, labels=()):
+        # Index of the first bucket the value fits in; counts are cumulated on export
+        index = len(self.buckets)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                index = i
+                break
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def samples(self):
+        with self._lock:
+            items = [(labels, (list(s[0]), s[1], s[2])) for labels, s in self._series.items()]
+        for labels, (counts, total, count) in sorted(items):
+            running = 0
+            for bound, n in zip(self.buckets + (float("inf"),), counts):
+                running += n
+                yield (f"{self.name}_bucket",
+                       _labels(self.labelnames, labels, [("le", _number(float(bound)))]), running)
+            yield f"{self.name}_sum", _labels(self.labelnames, labels), total
+            yield f"{self.name}_count", _labels(self.labelnames, labels), count
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self):
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for name, labels, value in metric.samples():
+                lines.append(f"{name}{labels} {_number(value)}")
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+requests_total = registry.register(Counter(
+    "dashboard_requests_total", "HTTP requests handled.", ("route", "method", "status")))
+request_duration = registry.register(Histogram(
+    "dashboard_request_duration_seconds", "Request latency.", ("route", "method")))
+phase_duration = registry.register(Histogram(
+    "dashboard_phase_duration_seconds", "Time per request spent in each phase.", ("route", "phase")))
+rows_fetched = registry.register(Counter(
+    "dashboard_rows_fetched_total", "Rows fetched from the database.", ("route",)))
+response_bytes = registry.register(Histogram(
+    "dashboard_response_bytes", "Response body size.", ("route",), SIZE_BUCKETS))
+in_flight = registry.register(Gauge(
+    "dashboard_requests_in_flight", "Requests currently being handled.", ("route",)))
+
+
+class _RequestState:
+    __slots__ = ("route", "phases", "rows")
+
+    def __init__(self, route):
+        self.route = route
+        self.phases = {}
+        self.rows = 0
+
+
+def begin_request(route):
+    """Start collecting phase timings for the current request; returns a reset token."""
+    in_flight.inc((route,))
+    return _request_state.set(_RequestState(route))
+
+
+def end_request(token, method, status, duration, size):
+    state = _request_state.get()
+    _request_state.reset(token)
+    if state is None:
+        return
+    route = state.route
+    in_flight.dec((route,))
+    requests_total.inc((route, method, str(status)))
+    request_duration.observe(duration, (route, method))
+    if size is not None:
+        response_bytes.observe(size, (route,))
+    for phase, seconds in state.phases.items():
+        phase_duration.observe(seconds, (route, phase))
+    if state.rows:
+        rows_fetched.inc((route,), state.rows)
+
+
+def record_phase(phase, seconds):
+    state = _request_state.get()
+    if state is None:
+        phase_duration.observe(seconds, ("-", phase))
+    else:
+        state.phases[phase] = state.phases.get(phase, 0.0) + seconds
+
+
+def record_rows(count):
+    if not count:
+        return
+    state = _request_state.get()
+    if state is None:
+        rows_fetched.inc(("-",), count)
+    else:
+        state.rows += count
+
+
+@contextmanager
+def phase(name):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_phase(name, time.perf_counter() - start)
+
+
+def timed(name, func):
+    """Wrap `func` so each call is recorded as phase `name`."""
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            record_phase(name, time.perf_counter() - start)
+    wrapper.__wrapped__ = func
+    return wrapper
+
+
+class InstrumentedCursor:
+    """Cursor proxy timing execute/fetch calls and counting fetched rows."""
+
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def __iter__(self):
+        return iter(self.fetchall())
+
+    def execute(self, *args, **kwargs):
+        with phase("execute"):
+            self._cursor.execute(*args, **kwargs)
+        return self
+
+    def executemany(self, *args, **kwargs):
+        with phase("execute"):
+            self._cursor.executemany(*args, **kwargs)
+        return self
+
+    def fetchone(self):
+        with phase("fetch"):
+            row = self._cursor.fetchone()
+        if row is not None:
+            record_rows(1)
+        return row
+
+    def fetchmany(self, *args):
+        with phase("fetch"):
+            rows = self._cursor.fetchmany(*args)
+        record_rows(len(rows))
+        return rows
+
+    def fetchall(self):
+        with phase("fetch"):
+            rows = self._cursor.fetchall()
+        record_rows(len(rows))
+        return rows
+
+
+def init_app(app, endpoint="/metrics"):
+    """Hook request timing into `app` and expose the registry on `endpoint`."""
+    from flask import Response, request
+
+    @app.before_request
+    def _metrics_begin():
+        rule = request.url_rule.rule if request.url_rule is not None else "unmatched"
+        request.environ["metrics.token"] = begin_request(rule)
+        request.environ["metrics.start"] = time.perf_counter()
+
+    @app.after_request
+    def _metrics_end(response):
+        token = request.environ.pop("metrics.token", None)
+        if token is not None:
+            size = None if response.is_streamed else response.calculate_content_length()
+            end_request(token, request.method, response.status_code,
+                        time.perf_counter() - request.environ["metrics.start"], size)
+        return response
+
+    @app.teardown_request
+    def _metrics_teardown(exc):
+        # Only reached with a token left over when the view raised
+        token = request.environ.pop("metrics.token", None)
+        if token is not None:
+            end_request(token, request.method, 500,
+                        time.perf_counter() - request.environ["metrics.start"], None)
+
+    def metrics_view():
+        return Response(registry.render(), mimetype="text/plain; version=0.0.4")
+
+    app.add_url_rule(endpoint, "metrics", metrics_view)
+    return app
@@ -0,0 +1,88 @@
+"""Trigram index over a small set of names (products, companies).
+
+Substring filters used to reach SQL Server as ``TRIM(col) LIKE '%x%'``. That
+scans every ticket row. Instead, the distinct names are indexed here: each
+casefolded, trimmed name is split into overlapping 3-character grams. A needle
+is then matched by intersecting the posting lists of its own grams and
+confirming the few candidates with a plain ``in``. The exact names found are
+what the ticket query filters on with = / IN.
+
+Needles shorter than a gram check every name directly; the name sets are small
+enough that this stays cheap.
+"""
+N = 3
+
+
+def fold(value):
+    """Comparison form of a name: trimmed and casefolded (SQL Server's default collation)."""
+    return str(value).strip().casefold()
+
+
+def grams(text, n=N):
+    return {text[i:i + n] for i in range(len(text) - n + 1)}
+
+
+class NgramIndex:
+    def __init__(self, names, n=N):
+        self.n = n
+        self.names = list(names)
+        self.folded = [fold(name) for name in self.names]
+        self.postings = {}
+        self.by_folded = {}
+        for i, folded in enumerate(self.folded):
+            self.by_folded.setdefault(folded, []).append(i)
+            for gram in grams(folded, n):
+                self.postings.setdefault(gram, set()).add(i)
+
+    def __len__(self):
+        return len(self.names)
+
+    def _candidates(self, needle):
+        if len(needle) < self.n:
+            return range(len(self.names))
+        postings = []
+        for gram in grams(needle, self.n):
+            ids = self.postings.get(gram)
+            if not ids:
+                return ()
+            postings.append(ids)
+        postings.sort(key=len)
+        found = set(postings[0])
+        for ids in postings[1:]:
+            found &= ids
+            if not found:
+                break
+        return found
+
+    def exact(self, needle):
+        """Names equal to `needle` ignoring case and surrounding spaces."""
+        return [self.names[i] for i in self.by_folded.get(fold(needle), ())]
+
+    def contains(self, needle):
+        """Names containing `needle` ignoring case and surrounding spaces."""
+        needle = fold(needle)
+        return [self.names[i] for i in self._candidates(needle) if needle in self.folded[i]]
+
+    def suggest(self, needle, limit=10, allowed=None):
+        """Up to `limit` names containing `needle`: exact, then prefix, then word-prefix matches first.
+
+        `allowed` optionally restricts the result to a set of names.
+        """
+        needle = fold(needle)
+
+        def rank(i):
+            folded = self.folded[i]
+            if folded == needle:
+                tier = 0
+            elif folded.startswith(needle):
+                tier = 1
+            elif any(word.startswith(needle) for word in folded.split()):
+                tier = 2
+            else:
+                tier = 3
+            return tier, folded, str(self.names[i])
+
+        ids = [i for i in self._candidates(needle) if needle in self.folded[i]]
+        if allowed is not None:
+            ids = [i for i in ids if self.names[i] in allowed]
+        return [self.names[i] for i in sorted(ids, key=rank)[:limit]]
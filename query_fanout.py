@@ -0,0 +1,89 @@
+"""Run independent read-only queries of one request concurrently on pooled connections.
+
+A view that needs several result sets (dashboard charts + trends, the three
+dropdown dimensions) hands them to QueryFanout.run() and pays for the slowest
+query instead of the sum. The statements are split into at most `max_parallel`
+groups; each group runs on its own pooled connection, one after another inside
+the group. This caps how many connections a single request can hold, so one
+request cannot starve the pool. The calling thread runs the first group itself,
+so a request always makes progress even while the shared executor is busy.
+"""
+import contextvars
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+class QueryFanout:
+    def __init__(self, get_connection, max_workers=8, max_parallel=3):
+        self._get_connection = get_connection
+        self.max_parallel = max(1, max_parallel)
+        self._executor = ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="query-fanout")
+        self._lock = threading.Lock()
+        self._runs = 0
+        self._parallel_runs = 0
+        self._queries = 0
+
+    def _run_group(self, statements):
+        conn = self._get_connection()
+        try:
+            cursor = conn.cursor()
+            try:
+                results = []
+                for sql, params in statements:
+                    cursor.execute(sql, tuple(params))
+                    results.append(cursor.fetchall())
+                return results
+            finally:
+                cursor.close()
+        finally:
+            conn.close()
+
+    def run(self, statements, max_parallel=None):
+        """Execute [(sql, params), ...] and return their row lists in the same order."""
+        statements = list(statements)
+        limit = self.max_parallel if max_parallel is None else max(1, min(max_parallel, self.max_parallel))
+        groups = min(limit, len(statements))
+        with self._lock:
+            self._runs += 1
+            self._queries += len(statements)
+            if groups > 1:
+                self._parallel_runs += 1
+        if groups <= 1:
+            return self._run_group(statements) if statements else []
+
+        # Round-robin so each group gets a similar share; remember each statement's slot
+        slots = [list(range(i, len(statements), groups)) for i in range(groups)]
+        futures = [
+            # copy_context keeps per-request state (e.g. metrics phase timings) in the worker
+            self._executor.submit(contextvars.copy_context().run, self._run_group,
+                                  [statements[j] for j in slot])
+            for slot in slots[1:]
+        ]
+        results = [None] * len(statements)
+        error = None
+        try:
+            for j, rows in zip(slots[0], self._run_group([statements[j] for j in slots[0]])):
+                results[j] = rows
+        except Exception as e:
+            error = e
+        for slot, future in zip(slots[1:], futures):
+            try:
+                for j, rows in zip(slot, future.result()):
+                    results[j] = rows
+            except Exception as e:
+                error = error or e
+        if error is not None:
+            raise error
+        return results
+
+    def stats(self):
+        with self._lock:
+            return {
+                "max_parallel": self.max_parallel,
+                "runs": self._runs,
+                "parallel_runs": self._parallel_runs,
+                "queries": self._queries,
+            }
+
+    def close(self):
+        self._executor.shutdown(wait=False)
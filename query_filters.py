@@ -0,0 +1,109 @@
+"""Shared WHERE-clause builder for the Chatbot_Transaction dashboard queries.
+
+Inputs are cleaned in Python so that every predicate compares a bare column with
+a parameter and SQL Server can seek on an index:
+
+- date ranges become a half-open ``Ticket_Creation_Date >= start AND < end + 1 day``
+  instead of ``CAST(Ticket_Creation_Date AS DATE) BETWEEN ...``;
+- product / company names arrive already resolved to the exact stored values and
+  become ``=`` or ``IN (...)`` instead of ``TRIM(col) LIKE '%x%'``. A substring that
+  matches more than MAX_NAME_PARAMS names goes back to one ``col LIKE ?``, so a short
+  needle against a large dimension cannot exceed SQL Server's 2100-parameter limit;
+- Company_ID / Company_Email are stripped here rather than wrapped in TRIM() in SQL.
+"""
+import datetime
+
+# Most resolved names bound as IN (...) parameters before falling back to LIKE
+MAX_NAME_PARAMS = 100
+
+
+class SubstringMatch(list):
+    """Names resolved from a substring filter, together with the substring itself.
+
+    Python consumers (snapshot, rollup) use the names. build_ticket_filters() binds them as
+    IN (...) up to MAX_NAME_PARAMS names and matches the substring with LIKE beyond that.
+    """
+
+    def __init__(self, names, needle):
+        super().__init__(dict.fromkeys(names))
+        self.needle = needle
+
+
+def like_contains(text):
+    """LIKE pattern for values containing `text`, with wildcards escaped by '\\'."""
+    return "%" + "".join("\\" + ch if ch in "\\%_[" else ch for ch in text) + "%"
+
+
+def normalise_choice(value):
+    """Strip a dropdown value; empty strings and "all" mean "no filter" (None)."""
+    if value is None:
+        return None
+    value = str(value).strip()
+    if not value or value.lower() == "all":
+        return None
+    return value
+
+
+def parse_day(value):
+    """Parse 'YYYY-MM-DD' (optionally followed by a time) into a date."""
+    try:
+        return datetime.date.fromisoformat(str(value).strip()[:10])
+    except ValueError:
+        raise ValueError(f"Invalid date '{value}'. Expected YYYY-MM-DD.")
+
+
+def parse_date_filter(date_filter):
+    """Turn the "startdate AND enddate" filter into (start, end) dates, or (None, None)."""
+    if not date_filter:
+        return None, None
+    try:
+        startdate, enddate = date_filter.split(" AND ")
+    except ValueError:
+        raise ValueError("Invalid date_filter format. Expected 'startdate AND enddate'.")
+    return parse_day(startdate), parse_day(enddate)
+
+
+def build_ticket_filters(start_date=None, end_date=None, products=None, companies=None,
+                         company_id=None, company_email=None):
+    """Return (" WHERE ...", params) for the dashboard filters; ("", []) when unfiltered.
+
+    `start_date`/`end_date` are inclusive dates. `products`/`companies` are lists of exact
+    stored names (None = no filter, empty list = nothing matches), or a SubstringMatch.
+    """
+    clauses = []
+    params = []
+
+    if start_date is not None:
+        clauses.append("Ticket_Creation_Date >= ?")
+        params.append(start_date)
+    if end_date is not None:
+        clauses.append("Ticket_Creation_Date < ?")
+        params.append(end_date + datetime.timedelta(days=1))
+
+    for column, names in (("Product_Name", products), ("Company_Name", companies)):
+        if names is None:
+            continue
+        if not isinstance(names, SubstringMatch):
+            names = list(dict.fromkeys(names))
+        if not names:
+            clauses.append("1 = 0")
+        elif len(names) > MAX_NAME_PARAMS and isinstance(names, SubstringMatch):
+            clauses.append(f"{column} LIKE ? ESCAPE '\\'")
+            params.append(like_contains(names.needle))
+        elif len(names) == 1:
+            clauses.append(f"{column} = ?")
+            params.append(names[0])
+        else:
+            clauses.append(f"{column} IN ({', '.join('?' for _ in names)})")
+            params.extend(names)
+
+    if company_id is not None and str(company_id).strip():
+        clauses.append("Company_ID = ?")
+        params.append(str(company_id).strip())
+    if company_email is not None and str(company_email).strip():
+        clauses.append("Company_Email = ?")
+        params.append(str(company_email).strip())
+
+    if not clauses:
+        return "", []
+    return " WHERE " + " AND ".join(clauses), params
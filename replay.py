@@ -0,0 +1,244 @@
+"""Replay a traffic recording (see traffic_recorder.py) at configurable concurrency.
+
+Usage:
+    python replay.py traffic.jsonl --target http://127.0.0.1:5000 --concurrency 16
+    python replay.py traffic.jsonl --db bench-100000.db --concurrency 8 --repeat 3
+    python replay.py traffic.jsonl --target http://127.0.0.1:5000 --speed 1   # original pacing
+    python replay.py --compare before.json after.json
+
+With --target requests go over HTTP to a running server; with --db the app is
+loaded in-process against a bench_data SQLite file and driven through Flask's
+test client (one client per worker thread). --speed 0 (default) sends as fast
+as the workers allow; --speed N keeps the recorded gaps between requests,
+N times faster.
+
+The report gives, per route and overall, the request count, throughput,
+p50/p95/p99 latency, and error rates (5xx and transport failures as errors, 4xx
+counted separately). It is printed and optionally written with --output.
+Recorded passwords are redacted, so replayed logins are expected to get 401.
+"""
+import argparse
+import itertools
+import json
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from urllib.parse import urlencode
+
+from benchmark import latency_summary
+
+
+def load_recording(paths, routes=None):
+    entries = []
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                entry = json.loads(line)
+                if routes and entry.get("route") not in routes:
+                    continue
+                entries.append(entry)
+    entries.sort(key=lambda e: e.get("ts", 0))
+    return entries
+
+
+def request_url(entry):
+    query = urlencode([tuple(pair) for pair in entry.get("query") or ()])
+    return entry["path"] + (f"?{query}" if query else "")
+
+
+class HttpSender:
+    def __init__(self, base_url, timeout):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+
+    def __call__(self, entry):
+        body = entry.get("body")
+        data = json.dumps(body).encode() if body is not None else None
+        req = urllib.request.Request(self.base_url + request_url(entry), data=data, method=entry["method"])
+        if data is not None:
+            req.add_header("Content-Type", "application/json")
+        try:
+            with urllib.request.urlopen(req, timeout=self.timeout) as response:
+                response.read()
+                return response.status
+        except urllib.error.HTTPError as e:
+            e.read()
+            return e.code
+
+
+class TestClientSender:
+    """Drives the app in-process; each thread gets its own test client."""
+
+    def __init__(self, flask_app):
+        self.flask_app = flask_app
+        self._local = threading.local()
+
+    def __call__(self, entry):
+        client = getattr(self._local, "client", None)
+        if client is None:
+            client = self._local.client = self.flask_app.test_client()
+        response = client.open(request_url(entry), method=entry["method"], json=entry.get("body"))
+        response.get_data()
+        return response.status_code
+
+
+def replay(entries, send, concurrency=8, repeat=1, speed=0.0):
+    """Send `entries` (`repeat` times) from `concurrency` threads; returns (samples, wall seconds).
+
+    Each sample is (route, latency_ms, status), status 0 meaning the request failed to send.
+    """
+    schedule = [entry for _ in range(repeat) for entry in entries]
+    first_ts = entries[0].get("ts", 0) if entries else 0
+    span = (entries[-1].get("ts", 0) - first_ts) if entries else 0
+    counter = itertools.count()
+    samples = []
+    lock = threading.Lock()
+    started = time.perf_counter()
+
+    def worker():
+        local = []
+        while True:
+            i = next(counter)
+            if i >= len(schedule):
+                break
+            entry = schedule[i]
+            if speed > 0:
+                # Keep the recorded spacing; each repeat starts after the previous one ends
+                offset = (i // len(entries)) * span + (entry.get("ts", 0) - first_ts)
+                delay = started + offset / speed - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+            t0 = time.perf_counter()
+            try:
+                status = send(entry)
+            except Exception:
+                status = 0
+            local.append((entry.get("route") or entry["path"], (time.perf_counter() - t0) * 1000, status))
+        with lock:
+            samples.extend(local)
+
+    threads = [threading.Thread(target=worker, daemon=True) for _ in range(max(1, concurrency))]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return samples, time.perf_counter() - started
+
+
+def summarise(samples, wall):
+    def block(items):
+        latencies = [ms for _, ms, _ in items]
+        errors = sum(1 for _, _, status in items if status == 0 or status >= 500)
+        client_errors = sum(1 for _, _, status in items if 400 <= status < 500)
+        return {
+            "requests": len(items),
+            "throughput_rps": round(len(items) / wall, 2) if wall else None,
+            "errors": errors,
+            "error_rate": round(errors / len(items), 4) if items else 0.0,
+            "client_errors": client_errors,
+            "latency_ms": latency_summary(latencies),
+        }
+
+    by_route = {}
+    for sample in samples:
+        by_route.setdefault(sample[0], []).append(sample)
+    return {
+        "wall_seconds": round(wall, 3),
+        "overall": block(samples),
+        "routes": {route: block(items) for route, items in sorted(by_route.items())},
+    }
+
+
+def print_report(report):
+    print(f"{'route':<28}{'requests':>9}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'errors':>8}{'4xx':>6}")
+    rows = list(report["routes"].items()) + [("(overall)", report["overall"])]
+    for route, r in rows:
+        lat = r["latency_ms"] or {}
+        print(f"{route:<28}{r['requests']:>9}{r['throughput_rps'] or 0:>10.1f}"
+              f"{lat.get('p50', 0):>10.2f}{lat.get('p95', 0):>10.2f}{lat.get('p99', 0):>10.2f}"
+              f"{r['errors']:>8}{r['client_errors']:>6}")
+
+
+def compare_reports(before, after):
+    """Print per-route latency/throughput/error changes between two replay reports."""
+    print(f"{'route':<28}{'p50':>10}{'p95':>10}{'p99':>10}{'req/s':>10}{'err rate':>18}")
+    routes = sorted(set(before["routes"]) | set(after["routes"]))
+    rows = [(r, before["routes"].get(r), after["routes"].get(r)) for r in routes]
+    rows.append(("(overall)", before["overall"], after["overall"]))
+    for route, old, new in rows:
+        if not old or not new:
+            print(f"{route:<28}{'(only in ' + ('after' if new else 'before') + ')':>20}")
+            continue
+        cells = []
+        for key in ("p50", "p95", "p99"):
+            a, b = old["latency_ms"].get(key), new["latency_ms"].get(key)
+            cells.append(f"{(b - a) / a * 100:+.0f}%".rjust(10) if a else f"{'-':>10}")
+        a, b = old["throughput_rps"], new["throughput_rps"]
+        cells.append(f"{(b - a) / a * 100:+.0f}%".rjust(10) if a else f"{'-':>10}")
+        cells.append(f"{old['error_rate']:.2%} -> {new['error_rate']:.2%}".rjust(18))
+        print(f"{route:<28}" + "".join(cells))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("recordings", nargs="*", help="JSON-lines files written by the traffic recorder")
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument("--target", help="base URL of a running server, e.g. http://127.0.0.1:5000")
+    target.add_argument("--db", help="bench_data SQLite file; drive the app in-process")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--repeat", type=int, default=1, help="replay the recording this many times")
+    parser.add_argument("--speed", type=float, default=0.0, help="0 = as fast as possible; N = recorded pacing N times faster")
+    parser.add_argument("--routes", help="comma-separated routes to replay (default: all)")
+    parser.add_argument("--timeout", type=float, default=30.0, help="HTTP timeout in seconds")
+    parser.add_argument("--cache", action="store_true", help="with --db: keep the response cache enabled")
+    parser.add_argument("--output", help="write the report as JSON")
+    parser.add_argument("--compare", nargs=2, metavar=("BEFORE", "AFTER"), help="compare two reports and exit")
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        with open(args.compare[0]) as f:
+            before = json.load(f)
+        with open(args.compare[1]) as f:
+            after = json.load(f)
+        compare_reports(before, after)
+        return
+
+    if not args.recordings:
+        parser.error("at least one recording is required")
+    if not args.target and not args.db:
+        parser.error("one of --target or --db is required")
+
+    routes = {r.strip() for r in args.routes.split(",")} if args.routes else None
+    entries = load_recording(args.recordings, routes)
+    if not entries:
+        sys.exit("No requests to replay")
+
+    if args.target:
+        send = HttpSender(args.target, args.timeout)
+    else:
+        from benchmark import load_app
+        send = TestClientSender(load_app(args.db, args.cache).app)
+
+    samples, wall = replay(entries, send, args.concurrency, args.repeat, args.speed)
+    report = summarise(samples, wall)
+    report["meta"] = {
+        "recordings": args.recordings,
+        "target": args.target or args.db,
+        "concurrency": args.concurrency,
+        "repeat": args.repeat,
+        "speed": args.speed,
+    }
+    print_report(report)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Report written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""In-process cache of serialised JSON responses for the aggregate endpoints.
+
+Entries are keyed on (endpoint, normalised query parameters), bounded by an LRU
+size limit and expire after a per-endpoint TTL. The cached value is the final
+response body, so a hit costs no DB round trip and no JSON encoding. Every
+response carries a strong ETag; a client that sends it back in If-None-Match gets
+a 304 with no body. With a ResponseCompressor, each entry also keeps its body
+compressed per negotiated encoding, so a hot payload is compressed once.
+
+There is no write-driven invalidation because nothing could trigger it: the
+cached aggregates read only Chatbot_Transaction, and no endpoint of this app
+writes that table (tickets arrive from the chatbot; comments and employees live
+in other tables). Entries expire by TTL, so RESPONSE_CACHE_TTL bounds how stale
+they can be. A view that reads a table the app writes must not be cached without
+adding that.
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+from flask import Response, make_response, request
+
+
+def normalise_args(args):
+    """Stable, case-insensitive key for a request's query parameters."""
+    items = []
+    for key, value in args.items(multi=True):
+        items.append((key.strip().lower(), (value or "").strip()))
+    return tuple(sorted(items))
+
+
+def make_etag(body):
+    return hashlib.blake2b(body, digest_size=16).hexdigest()
+
+
+class CacheEntry:
+    __slots__ = ("body", "encoded", "etag", "mimetype", "expires")
+
+    def __init__(self, body, etag, mimetype, expires):
+        self.body = body
+        self.encoded = {}  # Content-Encoding -> compressed body, None when not smaller
+        self.etag = etag
+        self.mimetype = mimetype
+        self.expires = expires
+
+
+class ResponseCache:
+    """Thread-safe LRU of CacheEntry objects with per-entry expiry."""
+
+    def __init__(self, max_entries=512, enabled=True, compressor=None):
+        self.max_entries = max_entries
+        self.enabled = enabled
+        self.compressor = compressor
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+        self.evictions = 0
+
+    def get(self, key):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            if entry.expires <= now:
+                del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key, body, mimetype, ttl):
+        entry = CacheEntry(body, make_etag(body), mimetype, time.monotonic() + ttl)
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return entry
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "not_modified": self.not_modified,
+                "evictions": self.evictions,
+            }
+
+    def cached(self, name, ttl):
+        """Decorator caching a view's 200 JSON body for `ttl` seconds, with ETag support."""
+        def decorator(view):
+            @wraps(view)
+            def wrapper(*args, **kwargs):
+                if not self.enabled or request.method != "GET":
+                    return view(*args, **kwargs)
+
+                key = (name, normalise_args(request.args))
+                entry = self.get(key)
+                status = "HIT"
+                if entry is None:
+                    status = "MISS"
+                    response = view(*args, **kwargs)
+                    if not isinstance(response, Response):
+                        response = make_response(response)
+                    if response.status_code != 200 or response.is_streamed:
+                        return response
+                    entry = self.put(key, response.get_data(), response.mimetype, ttl)
+
+                encoding = body = None
+                if self.compressor is not None:
+                    encoding = self.compressor.choose(request, entry.mimetype, len(entry.body))
+                if encoding is not None:
+                    body = self.compressor.compress_entry(entry, encoding)
+                if body is not None:
+                    response = Response(body, mimetype=entry.mimetype)
+                    response.set_etag(entry.etag)
+                    self.compressor.mark_encoded(response, encoding)
+                else:
+                    response = Response(entry.body, mimetype=entry.mimetype)
+                    response.set_etag(entry.etag)
+                    if encoding is not None:
+                        self.compressor.mark_identity(response)
+                response.headers["Cache-Control"] = "no-cache"
+                response.headers["X-Cache"] = status
+                response = response.make_conditional(request)
+                if response.status_code == 304:
+                    with self._lock:
+                        self.not_modified += 1
+                return response
+            return wrapper
+        return decorator
@@ -0,0 +1,338 @@
+"""Daily rollup of Chatbot_Transaction for the dashboard aggregates.
+
+The rollup holds one row per
+(day, Product_Name, Company_ID, Company_Name, Company_Email, Ticket_Status)
+with the ticket count and the Ticket_Day_Open sum. That is every column the
+dashboard filters on, plus the status that stats and trends group by; the chart
+dimensions are left out, because with them the key is close to one row per ticket.
+The key columns keep their Chatbot_Transaction names, and the day column keeps the
+name Ticket_Creation_Date. The WHERE clauses from query_filters therefore apply to
+the rollup unchanged. /api/stats, /api/monthly-trends and /api/dashboard read it
+whenever it is built, fresh and small enough to beat the raw table (at most
+`max_row_ratio` rollup rows per ticket); otherwise they fall back to the raw table.
+Charts read it only for specs grouped by key columns alone.
+
+The rollup lives in two tables, Chatbot_Transaction_Daily_A and _B, and the state
+row names the live one. Refresh is incremental. Rows above the stored Uniqueid
+high-water mark (and, when `modified_column` is set, rows modified since the
+stored timestamp) identify the days that changed. Only those days are deleted and
+re-aggregated from the raw table in the live table, in one transaction together
+with the new marks. A periodic full rebuild catches deletes and changes the marks
+cannot see. It refills the other table and then points the state row at it, so
+readers keep using the old table until the rebuild commits. Changing the key
+columns also forces a rebuild.
+
+    python rollup.py                     # print the SQL Server DDL
+    python rollup.py --dialect sqlite    # SQLite DDL
+"""
+import argparse
+import datetime
+import logging
+import threading
+import time
+
+from chart_engine import CHART_SPECS, chart_dimensions, compile_chart_query
+from trends import bucket_sql, compile_trend_query, to_date
+
+log = logging.getLogger("dashboard.rollup")
+
+ROLLUP_TABLE = "Chatbot_Transaction_Daily"
+STATE_TABLE = "Chatbot_Transaction_Daily_State"
+
+# Key columns copied as-is from Chatbot_Transaction (the day is derived)
+KEY_COLUMNS = ["Product_Name", "Company_ID", "Company_Name", "Company_Email", "Ticket_Status"]
+
+# Raw-table aggregates the rollup can answer, and their rollup equivalents
+MEASURES = {
+    "COUNT(*)": "SUM(Ticket_Count)",
+    "SUM(COALESCE(Ticket_Day_Open, 0))": "SUM(Day_Open_Sum)",
+}
+
+
+def rollup_tables(table=ROLLUP_TABLE):
+    """The two tables the rollup alternates between."""
+    return [f"{table}_A", f"{table}_B"]
+
+
+def rollup_ddl(dialect="mssql", table=ROLLUP_TABLE, state_table=STATE_TABLE):
+    """Idempotent CREATE statements for the rollup tables and their state table."""
+    statements = []
+    if dialect == "sqlite":
+        columns = ", ".join(f"{c} TEXT" for c in KEY_COLUMNS)
+        for name in rollup_tables(table):
+            statements += [
+                f"CREATE TABLE IF NOT EXISTS {name} (Ticket_Creation_Date TEXT, {columns},"
+                " Ticket_Count INTEGER NOT NULL, Day_Open_Sum INTEGER NOT NULL)",
+                f"CREATE INDEX IF NOT EXISTS IX_{name}_Day ON {name} (Ticket_Creation_Date)",
+                f"CREATE INDEX IF NOT EXISTS IX_{name}_Company_Day ON {name} (Company_ID, Ticket_Creation_Date)",
+            ]
+        statements.append(
+            f"CREATE TABLE IF NOT EXISTS {state_table} (Id INTEGER PRIMARY KEY, Live_Table TEXT,"
+            " Max_Uniqueid INTEGER, Max_Modified TEXT, Definition TEXT, Refreshed_At TEXT)")
+        return statements
+    columns = ", ".join(f"{c} NVARCHAR(400) NULL" for c in KEY_COLUMNS)
+    for name in rollup_tables(table):
+        statements += [
+            f"IF OBJECT_ID(N'dbo.{name}', N'U') IS NULL CREATE TABLE dbo.{name} ("
+            f"Ticket_Creation_Date DATE NULL, {columns},"
+            " Ticket_Count INT NOT NULL, Day_Open_Sum BIGINT NOT NULL)",
+            f"IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = N'IX_{name}_Day')"
+            f" CREATE INDEX IX_{name}_Day ON dbo.{name} (Ticket_Creation_Date)",
+            f"IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = N'IX_{name}_Company_Day')"
+            f" CREATE INDEX IX_{name}_Company_Day ON dbo.{name} (Company_ID, Ticket_Creation_Date)",
+        ]
+    statements.append(
+        f"IF OBJECT_ID(N'dbo.{state_table}', N'U') IS NULL CREATE TABLE dbo.{state_table} ("
+        "Id INT PRIMARY KEY, Live_Table NVARCHAR(128) NULL, Max_Uniqueid BIGINT NULL,"
+        " Max_Modified DATETIME2 NULL, Definition NVARCHAR(2000) NULL, Refreshed_At DATETIME2 NULL)")
+    return statements
+
+
+def day_ranges(days):
+    """Collapse sorted dates into [(first, last), ...] runs of consecutive days."""
+    ranges = []
+    for day in sorted(days):
+        if ranges and day - ranges[-1][1] == datetime.timedelta(days=1):
+            ranges[-1] = (ranges[-1][0], day)
+        else:
+            ranges.append((day, day))
+    return ranges
+
+
+class DailyRollup:
+    def __init__(self, get_connection, dialect="mssql", refresh_interval=60.0, full_rebuild_every=60,
+                 max_lag=300.0, max_row_ratio=0.5, modified_column=None, source="Chatbot_Transaction",
+                 table=ROLLUP_TABLE, state_table=STATE_TABLE):
+        self._get_connection = get_connection
+        self.dialect = dialect
+        self.refresh_interval = refresh_interval
+        self.full_rebuild_every = full_rebuild_every
+        self.max_lag = max_lag
+        self.max_row_ratio = max_row_ratio
+        self.modified_column = modified_column
+        self.source = source
+        self.base_table = table
+        self.tables = rollup_tables(table)
+        self.table = self.tables[0]
+        self.state_table = state_table
+        self.definition = ",".join(KEY_COLUMNS)
+        self.day_sql = bucket_sql("Ticket_Creation_Date", "day", dialect)
+
+        self._lock = threading.Lock()
+        self._ready = False
+        self._last_refresh = 0.0
+        self._row_ratio = None
+        self._refreshes = 0
+        self._full_rebuilds = 0
+        self._days_rebuilt = 0
+        self._served = 0
+        self._thread = None
+        self._stop = threading.Event()
+
+    # -- maintenance ------------------------------------------------------------
+
+    def _select_sql(self, table, where=""):
+        group = ", ".join([self.day_sql] + KEY_COLUMNS)
+        columns = ", ".join(["Ticket_Creation_Date"] + KEY_COLUMNS + ["Ticket_Count", "Day_Open_Sum"])
+        return (
+            f"INSERT INTO {table} ({columns})"
+            f" SELECT {group}, COUNT(*), SUM(COALESCE(Ticket_Day_Open, 0))"
+            f" FROM {self.source}{where} GROUP BY {group}"
+        )
+
+    def _marks(self, cursor):
+        modified = f", MAX({self.modified_column})" if self.modified_column else ", NULL"
+        cursor.execute(f"SELECT MAX(Uniqueid){modified} FROM {self.source}")
+        row = cursor.fetchone()
+        return (row[0], row[1]) if row else (None, None)
+
+    def _state(self, cursor):
+        cursor.execute(f"SELECT Live_Table, Max_Uniqueid, Max_Modified, Definition FROM {self.state_table}"
+                       " WHERE Id = 1")
+        return cursor.fetchone()
+
+    def _save_state(self, cursor, table, high, high_modified):
+        cursor.execute(f"DELETE FROM {self.state_table} WHERE Id = 1")
+        cursor.execute(
+            f"INSERT INTO {self.state_table} (Id, Live_Table, Max_Uniqueid, Max_Modified, Definition, Refreshed_At)"
+            " VALUES (1, ?, ?, ?, ?, ?)",
+            (table, high, high_modified, self.definition, datetime.datetime.now().replace(microsecond=0)))
+
+    def _changed_days(self, cursor, low, low_modified, high, high_modified):
+        where = "(Uniqueid > ? AND Uniqueid <= ?)"
+        params = [low if low is not None else -1, high]
+        if self.modified_column and low_modified is not None and high_modified is not None:
+            where += f" OR ({self.modified_column} > ? AND {self.modified_column} <= ?)"
+            params += [low_modified, high_modified]
+        cursor.execute(f"SELECT DISTINCT {self.day_sql} FROM {self.source} WHERE {where}", tuple(params))
+        return {None if row[0] is None else to_date(row[0]) for row in cursor.fetchall()}
+
+    def _rebuild_days(self, cursor, table, days):
+        if None in days:
+            cursor.execute(f"DELETE FROM {table} WHERE Ticket_Creation_Date IS NULL")
+            cursor.execute(self._select_sql(table, " WHERE Ticket_Creation_Date IS NULL"))
+        for first, last in day_ranges(d for d in days if d is not None):
+            end = last + datetime.timedelta(days=1)
+            cursor.execute(f"DELETE FROM {table} WHERE Ticket_Creation_Date >= ? AND Ticket_Creation_Date < ?",
+                           (first, end))
+            cursor.execute(self._select_sql(table, " WHERE Ticket_Creation_Date >= ? AND Ticket_Creation_Date < ?"),
+                           (first, end))
+
+    def _ratio(self, cursor, table):
+        """Rollup rows per source ticket; the rollup only pays off well below 1."""
+        cursor.execute(f"SELECT COUNT(*), SUM(Ticket_Count) FROM {table}")
+        rows, tickets = cursor.fetchone()
+        return rows / tickets if tickets else 1.0
+
+    def ensure_schema(self):
+        conn = self._get_connection()
+        try:
+            cursor = conn.cursor()
+            for statement in rollup_ddl(self.dialect, self.base_table, self.state_table):
+                cursor.execute(statement)
+            cursor.close()
+            conn.commit()
+        finally:
+            conn.close()
+
+    def refresh(self, full=False):
+        """Bring the rollup up to date; returns the number of days rebuilt (-1 for a full rebuild).
+
+        Incremental refreshes update the live table in place. A full rebuild refills the other
+        table and makes it live in the same transaction, so readers never wait for it.
+        """
+        with self._lock:
+            conn = self._get_connection()
+            try:
+                cursor = conn.cursor()
+                state = self._state(cursor)
+                live = state[0] if state and state[0] in self.tables else None
+                if live is None or state[3] != self.definition:
+                    full = True
+                high, high_modified = self._marks(cursor)
+                if full:
+                    live = self.tables[1] if live == self.tables[0] else self.tables[0]
+                    cursor.execute(f"DELETE FROM {live}")
+                    cursor.execute(self._select_sql(live))
+                    rebuilt = -1
+                else:
+                    low, low_modified = state[1], state[2]
+                    if high is None or (low is not None and high <= low and
+                                        (not self.modified_column or high_modified == low_modified)):
+                        days = set()
+                    else:
+                        days = self._changed_days(cursor, low, low_modified, high, high_modified)
+                    self._rebuild_days(cursor, live, days)
+                    rebuilt = len(days)
+                self._save_state(cursor, live, high, high_modified)
+                ratio = self._ratio(cursor, live)
+                cursor.close()
+                conn.commit()
+            except Exception:
+                try:
+                    conn.rollback()
+                except Exception:
+                    pass
+                raise
+            finally:
+                conn.close()
+
+            self.table = live
+            self._row_ratio = ratio
+            self._ready = True
+            self._last_refresh = time.monotonic()
+            self._refreshes += 1
+            if rebuilt < 0:
+                self._full_rebuilds += 1
+            else:
+                self._days_rebuilt += rebuilt
+            log.debug("rollup refreshed", extra={"days": rebuilt, "watermark": high, "table": live,
+                                                 "row_ratio": round(ratio, 3)})
+            return rebuilt
+
+    def start(self):
+        """Create the tables if needed, bring the rollup up to date and keep refreshing it."""
+        self.ensure_schema()
+        self.refresh()
+        if self._row_ratio is not None and not self._small_enough():
+            log.info("Rollup has %.2f rows per ticket (limit %s); queries use the raw table",
+                     self._row_ratio, self.max_row_ratio)
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="daily-rollup", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        cycles = 0
+        while not self._stop.wait(self.refresh_interval):
+            cycles += 1
+            full = bool(self.full_rebuild_every) and cycles % self.full_rebuild_every == 0
+            try:
+                self.refresh(full=full)
+            except Exception as e:
+                log.warning("Rollup refresh failed: %s", e)
+
+    # -- serving ----------------------------------------------------------------
+
+    def _small_enough(self):
+        return self.max_row_ratio is None or self._row_ratio <= self.max_row_ratio
+
+    def usable(self):
+        """True when the rollup is built, was refreshed within `max_lag` seconds and has at most
+        `max_row_ratio` rows per ticket (above that, scanning it costs as much as the raw table)."""
+        if not self._ready or not self._small_enough():
+            return False
+        return not self.max_lag or time.monotonic() - self._last_refresh <= self.max_lag
+
+    def stats_query(self, where):
+        """(Ticket_Status, count, day_open_sum) grouped query, or None to use the raw table."""
+        if not self.usable():
+            return None
+        self._served += 1
+        return (f"SELECT Ticket_Status, SUM(Ticket_Count), SUM(Day_Open_Sum) FROM {self.table}{where}"
+                " GROUP BY Ticket_Status")
+
+    def chart_query(self, where, specs=CHART_SPECS, measures=()):
+        """compile_chart_query() against the rollup, or None when it cannot answer `specs`/`measures`."""
+        if not self.usable():
+            return None
+        dims = chart_dimensions(specs)
+        if any(dim not in KEY_COLUMNS for dim in dims) or any(m not in MEASURES for m in measures):
+            return None
+        self._served += 1
+        return compile_chart_query(where, specs, self.table, [MEASURES[m] for m in measures],
+                                   count_sql=MEASURES["COUNT(*)"])
+
+    def trend_query(self, where, granularity):
+        if not self.usable():
+            return None
+        self._served += 1
+        return compile_trend_query(where, granularity, self.dialect, self.table, count_sql="SUM(Ticket_Count)")
+
+    def stats(self):
+        return {
+            "ready": self._ready,
+            "usable": self.usable(),
+            "table": self.table if self._ready else None,
+            "row_ratio": round(self._row_ratio, 3) if self._row_ratio is not None else None,
+            "refreshes": self._refreshes,
+            "full_rebuilds": self._full_rebuilds,
+            "days_rebuilt": self._days_rebuilt,
+            "queries_served": self._served,
+            "seconds_since_refresh": round(time.monotonic() - self._last_refresh, 1) if self._ready else None,
+        }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Print the daily rollup DDL.")
+    parser.add_argument("--dialect", choices=["mssql", "sqlite"], default="mssql")
+    args = parser.parse_args(argv)
+    for statement in rollup_ddl(args.dialect):
+        print(statement + (";" if args.dialect == "sqlite" else "\nGO"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,29 @@
+import os
+import sys
+
+import pytest
+
+# The app's modules live flat in the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture(scope="session")
+def bench_db(tmp_path_factory):
+    """A small synthetic SQLite dataset (see bench_data.py)."""
+    import bench_data
+    path = str(tmp_path_factory.mktemp("data") / "bench.db")
+    bench_data.generate(path, rows=5000, employees=200)
+    return path
+
+
+@pytest.fixture(scope="session")
+def appmod(bench_db):
+    """The app module running against `bench_db` through the SQLite pyodbc stand-in."""
+    import benchmark
+    return benchmark.load_app(bench_db, cache=True)
+
+
+@pytest.fixture
+def client(appmod):
+    appmod.response_cache.clear()
+    return appmod.app.test_client()
@@ -0,0 +1,132 @@
+import asyncio
+import json
+import threading
+
+import pytest
+from flask import Flask, Response, request
+
+
+@pytest.fixture(scope="module")
+def asgi(appmod):
+    import asgi
+    return asgi
+
+
+def run(adapter, scope, messages):
+    """Drive `adapter` with `messages`; returns what it sent."""
+    sent = []
+
+    async def main():
+        queue = list(messages)
+
+        async def receive():
+            if queue:
+                return queue.pop(0)
+            await asyncio.sleep(3600)
+
+        async def send(message):
+            sent.append(message)
+
+        await adapter(scope, receive, send)
+
+    asyncio.run(main())
+    return sent
+
+
+def http_scope(method="GET", path="/", query=b"", headers=()):
+    return {"type": "http", "method": method, "path": path, "query_string": query, "root_path": "",
+            "headers": list(headers), "server": ("testserver", 80), "client": ("127.0.0.1", 5555)}
+
+
+def body_of(sent):
+    return b"".join(m.get("body", b"") for m in sent if m["type"] == "http.response.body")
+
+
+@pytest.fixture
+def wsgi_app():
+    app = Flask(__name__)
+    app.closed = threading.Event()
+
+    @app.route("/echo/<name>", methods=["POST"])
+    def echo(name):
+        return {"name": name, "query": request.args.get("q"), "body": request.get_data(as_text=True),
+                "content_type": request.content_type, "accept": request.headers.get("Accept"),
+                "remote": request.remote_addr}
+
+    @app.route("/stream")
+    def stream():
+        def generate():
+            try:
+                for i in range(3):
+                    yield f"row{i}\n"
+            finally:
+                app.closed.set()
+        return Response(generate(), mimetype="text/plain")
+
+    return app
+
+
+def test_environ_from_scope(asgi):
+    environ = asgi.build_environ(http_scope("POST", "/a b", b"x=1", [(b"content-type", b"text/plain"),
+                                                                 (b"x-tag", b"a"), (b"x-tag", b"b")]), b"hi")
+    assert environ["REQUEST_METHOD"] == "POST"
+    assert environ["PATH_INFO"] == "/a b"
+    assert environ["QUERY_STRING"] == "x=1"
+    assert environ["CONTENT_TYPE"] == "text/plain"
+    assert environ["CONTENT_LENGTH"] == "2"
+    assert environ["HTTP_X_TAG"] == "a,b"
+    assert environ["wsgi.input"].read() == b"hi"
+
+
+def test_request_and_response_translation(asgi, wsgi_app):
+    adapter = asgi.AsgiAdapter(wsgi_app, workers=2)
+    sent = run(adapter, http_scope("POST", "/echo/ada", b"q=1",
+                                   [(b"content-type", b"text/plain"), (b"accept", b"application/json")]),
+               [{"type": "http.request", "body": b"hel", "more_body": True},
+                {"type": "http.request", "body": b"lo"}])
+    start = sent[0]
+    assert start["type"] == "http.response.start" and start["status"] == 200
+    headers = dict(start["headers"])
+    assert headers[b"content-type"] == b"application/json"
+    assert json.loads(body_of(sent)) == {"name": "ada", "query": "1", "body": "hello",
+                                         "content_type": "text/plain", "accept": "application/json",
+                                         "remote": "127.0.0.1"}
+
+
+def test_not_found_status(asgi, wsgi_app):
+    sent = run(asgi.AsgiAdapter(wsgi_app), http_scope(path="/missing"), [{"type": "http.request"}])
+    assert sent[0]["status"] == 404
+
+
+def test_streamed_body_is_sent_chunk_by_chunk(asgi, wsgi_app):
+    sent = run(asgi.AsgiAdapter(wsgi_app), http_scope(path="/stream"), [{"type": "http.request"}])
+    chunks = [m for m in sent if m["type"] == "http.response.body"]
+    assert [m["body"] for m in chunks if m.get("more_body")] == [b"row0\n", b"row1\n", b"row2\n"]
+    assert chunks[-1] == {"type": "http.response.body", "body": b""}
+    assert wsgi_app.closed.is_set()
+
+
+def test_backlog_past_max_pending_gets_503(asgi, wsgi_app):
+    adapter = asgi.AsgiAdapter(wsgi_app, workers=1, max_pending=0)
+    adapter._active = 1
+    sent = run(adapter, http_scope(path="/stream"), [{"type": "http.request"}])
+    assert sent[0]["status"] == 503
+    assert (b"retry-after", b"1") in sent[0]["headers"]
+
+
+def test_lifespan_runs_startup_and_shutdown(asgi, wsgi_app):
+    calls = []
+    adapter = asgi.AsgiAdapter(wsgi_app, on_startup=lambda: calls.append("start"),
+                          on_shutdown=lambda: calls.append("stop"))
+    sent = run(adapter, {"type": "lifespan"},
+               [{"type": "lifespan.startup"}, {"type": "lifespan.shutdown"}])
+    assert [m["type"] for m in sent] == ["lifespan.startup.complete", "lifespan.shutdown.complete"]
+    assert calls == ["start", "stop"]
+
+
+def test_lifespan_reports_failed_startup(asgi, wsgi_app):
+    def fail():
+        raise RuntimeError("no database")
+
+    sent = run(asgi.AsgiAdapter(wsgi_app, on_startup=fail), {"type": "lifespan"}, [{"type": "lifespan.startup"}])
+    assert sent == [{"type": "lifespan.startup.failed", "message": "no database"}]
@@ -0,0 +1,31 @@
+from chart_engine import build_charts
+
+SPECS = [
+    {"title": "Status", "type": "doughnut", "column": "Ticket_Status", "labels": ["Open", "Closed"]},
+    {"title": "Feedback", "type": "bar", "column": "Company_Work_Feedback"},
+]
+
+
+def chart(rows, title, specs=SPECS):
+    return next(c for c in build_charts(rows, specs) if c["title"] == title)["data"]
+
+
+def test_free_labels_keep_their_position_when_counts_change():
+    before = chart([("Open", "Good", 1), ("Open", "Bad", 9), ("Closed", None, 2)], "Feedback")
+    after = chart([("Open", "Good", 50), ("Open", "Bad", 1), ("Closed", None, 2)], "Feedback")
+    assert before["labels"] == after["labels"] == ["Bad", "Good", None]
+    assert after["datasets"][0]["data"] == [1, 50, 2]
+
+
+def test_fixed_labels_drop_unknown_values():
+    data = chart([("Open", "Good", 3), ("Reopened", "Good", 4)], "Status")
+    assert data["labels"] == ["Open", "Closed"]
+    assert data["datasets"][0]["data"] == [3, 0]
+
+
+def test_top_n_keeps_the_largest_in_label_order():
+    specs = [{"title": "Feedback", "type": "bar", "column": "Company_Work_Feedback", "top_n": 2}]
+    rows = [("d", 5), ("a", 1), ("c", 7), ("b", 2)]
+    data = chart(rows, "Feedback", specs)
+    assert data["labels"] == ["c", "d", "Other"]
+    assert data["datasets"][0]["data"] == [7, 5, 3]
@@ -0,0 +1,84 @@
+import shutil
+
+import pytest
+
+import bench_data
+from chart_engine import CHART_SPECS, compile_chart_query
+from query_filters import build_ticket_filters
+from trends import compile_trend_query, to_date
+
+from test_rollup import FILTERS, query
+
+pytest.importorskip("numpy")
+
+from columnar_snapshot import DAY_OPEN_SUM, ColumnarSnapshot  # noqa: E402
+
+
+@pytest.fixture(scope="module")
+def db_path(bench_db, tmp_path_factory):
+    path = str(tmp_path_factory.mktemp("snapshot") / "snapshot.db")
+    shutil.copy(bench_db, path)
+    return path
+
+
+@pytest.fixture(scope="module")
+def snapshot(db_path):
+    snapshot = ColumnarSnapshot(lambda: bench_data.connect(db_path), dialect="sqlite", max_lag=0,
+                                batch_size=1000)
+    snapshot.refresh(full=True)
+    return snapshot
+
+
+def sort(rows):
+    return sorted((tuple(row) for row in rows), key=repr)
+
+
+@pytest.mark.parametrize("filters", FILTERS)
+def test_stats_rows_match_sql(db_path, snapshot, filters):
+    where, params = build_ticket_filters(**filters)
+    raw = query(db_path, "SELECT Ticket_Status, COUNT(*), SUM(COALESCE(Ticket_Day_Open, 0))"
+                         f" FROM Chatbot_Transaction{where} GROUP BY Ticket_Status", params)
+    assert sort(snapshot.stats_rows(**filters)) == raw
+    assert bool(raw) == (filters.get("products") != [])
+
+
+@pytest.mark.parametrize("measures", [(), (DAY_OPEN_SUM,)])
+@pytest.mark.parametrize("filters", FILTERS)
+def test_chart_rows_match_sql(db_path, snapshot, filters, measures):
+    where, params = build_ticket_filters(**filters)
+    raw = query(db_path, compile_chart_query(where, CHART_SPECS, measures=measures), params)
+    assert sort(snapshot.chart_rows(CHART_SPECS, measures, **filters)) == raw
+
+
+@pytest.mark.parametrize("granularity", ["day", "week", "month", "quarter"])
+@pytest.mark.parametrize("filters", FILTERS)
+def test_trend_rows_match_sql(db_path, snapshot, filters, granularity):
+    where, params = build_ticket_filters(**filters)
+    raw = query(db_path, compile_trend_query(where, granularity, "sqlite"), params)
+    # Tickets without a creation date have no bucket to plot
+    raw = sort((to_date(bucket), status, count) for bucket, status, count in raw if bucket is not None)
+    assert sort(snapshot.trend_rows(granularity, **filters)) == raw
+
+
+def test_incremental_refresh_matches_sql(bench_db, tmp_path):
+    path = str(tmp_path / "incremental.db")
+    shutil.copy(bench_db, path)
+    snapshot = ColumnarSnapshot(lambda: bench_data.connect(path), dialect="sqlite", max_lag=0)
+    snapshot.refresh(full=True)
+
+    conn = bench_data.connect(path)
+    (high,) = conn.execute("SELECT MAX(Uniqueid) FROM Chatbot_Transaction").fetchone()
+    conn.executemany(
+        "INSERT INTO Chatbot_Transaction (Uniqueid, Ticket_Creation_Date, Ticket_Status, Ticket_Day_Open,"
+        " Product_Name, Company_Name, Company_ID) VALUES (?, ?, ?, ?, ?, ?, ?)",
+        [(high + 1, "2024-06-15 10:00:00", "Reopened", 4, "Product 001", "Company 0003", "C0003"),
+         (high + 2, None, "Open", None, "Product 999", "Company 0003", "C0003")])
+    conn.commit()
+    conn.close()
+    snapshot.refresh()
+
+    for filters in FILTERS + [{"products": ["Product 999"]}]:
+        where, params = build_ticket_filters(**filters)
+        raw = query(path, "SELECT Ticket_Status, COUNT(*), SUM(COALESCE(Ticket_Day_Open, 0))"
+                          f" FROM Chatbot_Transaction{where} GROUP BY Ticket_Status", params)
+        assert sort(snapshot.stats_rows(**filters)) == raw
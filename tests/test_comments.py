@@ -0,0 +1,186 @@
+import sqlite3
+
+import pytest
+
+import bench_data
+from comments import CommentStore, join_csv
+
+COMPANY = ("LEGACY", "legacy@example.com")
+
+
+@pytest.fixture
+def store(tmp_path):
+    path = str(tmp_path / "comments.db")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE Chatbot_Transaction (Uniqueid INTEGER PRIMARY KEY, Ticket_No TEXT,"
+                 " Company_ID TEXT, Company_Email TEXT, Comment TEXT)")
+    conn.executemany("INSERT INTO Chatbot_Transaction VALUES (?, ?, ?, ?, ?)", [
+        (1, "T1", "C1", "c1@example.com", "first,second"),
+        (2, "T2", "C1", "c1@example.com", None),
+        (3, "T3", "C2", "c2@example.com", " , "),
+        (4, "T4", "C2", "c2@example.com", "only"),
+    ])
+    conn.commit()
+    conn.close()
+    store = CommentStore(lambda: bench_data.connect(path), dialect="sqlite", migrate_batch=2)
+    store.ensure_ready()
+    return store
+
+
+def texts(store, uniqueid):
+    conn = store._get_connection()
+    try:
+        return store.all_texts(conn.cursor(), uniqueid)
+    finally:
+        conn.close()
+
+
+def test_migrate_copies_each_ticket_once(store):
+    assert store.migrate_legacy() == (3, 3)
+    assert texts(store, 1) == ["first", "second"]
+    assert texts(store, 3) == []
+    assert texts(store, 4) == ["only"]
+    assert store.migrate_legacy() == (0, 0)
+    assert texts(store, 1) == ["first", "second"]
+
+
+def test_append_before_migration_keeps_legacy_comments_first(store):
+    conn = store._get_connection()
+    cursor = conn.cursor()
+    ticket = store.find_ticket(cursor, 1)
+    assert store.migrate_tickets(cursor, [1]) == 1
+    store.append(cursor, ticket, ["third"])
+    conn.commit()
+    assert store.migrate_tickets(cursor, [1]) == 0
+    conn.close()
+
+    assert texts(store, 1) == ["first", "second", "third"]
+    # The full migration skips the ticket instead of copying its CSV after the new comment
+    assert store.migrate_legacy() == (2, 1)
+    assert texts(store, 1) == ["first", "second", "third"]
+
+
+def test_copy_lost_to_a_concurrent_copy_is_skipped(store):
+    conn = store._get_connection()
+    cursor = conn.cursor()
+    row = (4, "T4", "C2", "c2@example.com", "only")
+    assert store._copy(cursor, row) == 1
+    assert store._copy(cursor, row) is None
+    conn.commit()
+    conn.close()
+    assert texts(store, 4) == ["only"]
+
+
+@pytest.fixture(scope="module")
+def legacy_ticket(bench_db):
+    conn = sqlite3.connect(bench_db)
+    conn.execute(
+        "INSERT INTO Chatbot_Transaction (Uniqueid, Ticket_No, Company_ID, Company_Email, Comment)"
+        " VALUES (?, ?, ?, ?, ?)", (910000, "LG1") + COMPANY + ("old one,old two",))
+    conn.execute(
+        "INSERT INTO Chatbot_Transaction (Uniqueid, Ticket_No, Company_ID, Company_Email, Comment)"
+        " VALUES (?, ?, ?, ?, ?)", (910001, "LG2") + COMPANY + ("legacy",))
+    conn.commit()
+    conn.close()
+    return 910000
+
+
+def test_get_comments_serves_legacy_comments_before_migration(client, legacy_ticket):
+    response = client.get("/api/get-comments?ticket_no=LG1")
+    assert response.status_code == 200
+    assert response.get_json()["Comments"] == "old one,old two"
+
+
+def test_append_first_keeps_legacy_comments(client, legacy_ticket):
+    company = {"company_id": COMPANY[0], "company_email": COMPANY[1]}
+    response = client.post("/api/tickets/910001/comments", json=dict(company, comment="new, with comma"))
+    assert response.status_code == 201
+
+    response = client.get("/api/get-comments?ticket_no=LG2")
+    assert response.get_json()["Comments"] == join_csv(["legacy", "new, with comma"])
+
+    page = client.get("/api/tickets/910001/comments", query_string=dict(company, limit=1)).get_json()
+    assert [c["comment"] for c in page["comments"]] == ["new, with comma"]
+    page = client.get("/api/tickets/910001/comments",
+                      query_string=dict(company, limit=1, before=page["next_before"])).get_json()
+    assert [c["comment"] for c in page["comments"]] == ["legacy"]
+    assert page["next_before"] is None
+
+
+def test_put_appends_after_legacy_comments(client, legacy_ticket):
+    response = client.put("/api/comments", json={
+        "company_id": COMPANY[0], "company_email": COMPANY[1], "uniqueid": legacy_ticket,
+        "ticket_no": "LG1", "comments": ["three", "four"]})
+    assert response.status_code == 200
+    body = response.get_json()
+    # The ticket already had (legacy) comments, so every new one is added
+    assert body["added"] == ["three", "four"]
+    assert body["Comments"] == "old one,old two,three,four"
+
+
+@pytest.fixture(scope="module")
+def bulk_tickets(bench_db):
+    conn = sqlite3.connect(bench_db)
+    conn.executemany(
+        "INSERT INTO Chatbot_Transaction (Uniqueid, Ticket_No, Company_ID, Company_Email, Comment)"
+        " VALUES (?, ?, ?, ?, ?)",
+        [(920000 + i, f"BK{i}", "BULK", "bulk@example.com", "legacy" if i == 0 else None) for i in range(3)])
+    conn.commit()
+    conn.close()
+    return [920000, 920001, 920002]
+
+
+def bulk_item(uniqueid, **values):
+    return dict({"company_id": "BULK", "company_email": "bulk@example.com",
+                 "ticket_no": f"BK{uniqueid - 920000}", "uniqueid": uniqueid}, **values)
+
+
+def ticket_comments(client, uniqueid):
+    return client.get(f"/api/get-comments?uniqueid=BK{uniqueid - 920000}").get_json()["Comments"]
+
+
+def test_bulk_reports_a_result_per_item(client, bulk_tickets):
+    first, second, _ = bulk_tickets
+    response = client.post("/api/comments/bulk", json={"items": [
+        bulk_item(first, comments=["a", "b"]),
+        bulk_item(999999, comment="x"),
+        bulk_item(second, comment="   "),
+        bulk_item(second, ticket_no="WRONG", comment="x"),
+        bulk_item(second, company_email="other@example.com", comment="x"),
+        dict(bulk_item(second, comment="x"), uniqueid="abc"),
+        {"uniqueid": second, "comment": "x"},
+        "not an object",
+        bulk_item(second, comment="c"),
+    ]})
+    assert response.status_code == 200
+    body = response.get_json()
+    assert [(r["index"], r["status"]) for r in body["results"]] == [
+        (0, "added"), (1, "not_found"), (2, "invalid"), (3, "not_found"), (4, "not_found"),
+        (5, "invalid"), (6, "invalid"), (7, "invalid"), (8, "added")]
+    assert body["results"][2]["error"] == "No comment(s) provided"
+    assert body["comments_added"] == 3 and body["items_failed"] == 7
+    # The legacy comment of the first ticket is copied ahead of the new ones
+    assert ticket_comments(client, first) == "legacy,a,b"
+    assert ticket_comments(client, second) == "c"
+
+
+def test_bulk_inserts_past_the_chunk_size(client, bulk_tickets, monkeypatch):
+    import comments
+    monkeypatch.setattr(comments, "APPEND_CHUNK", 3)
+    third = bulk_tickets[2]
+    texts = [f"n{i}" for i in range(10)]
+    response = client.post("/api/comments/bulk", json={"items": [
+        bulk_item(third, comments=texts[:4]), bulk_item(third, comments=texts[4:])]})
+    assert response.get_json()["comments_added"] == 10
+    assert ticket_comments(client, third) == ",".join(texts)
+
+
+@pytest.mark.parametrize("body", [{}, {"items": []}, {"items": "x"}])
+def test_bulk_rejects_malformed_bodies(client, body):
+    assert client.post("/api/comments/bulk", json=body).status_code == 400
+
+
+def test_bulk_item_limit(client, appmod, monkeypatch):
+    monkeypatch.setattr(appmod, "COMMENTS_BULK_MAX_ITEMS", 2)
+    response = client.post("/api/comments/bulk", json={"items": [{}, {}, {}]})
+    assert response.status_code == 400
@@ -0,0 +1,54 @@
+import gzip
+import os
+
+from flask import Flask, Response
+
+from compression import ResponseCompressor
+from response_cache import CacheEntry, ResponseCache
+
+
+def make_app(body):
+    compressor = ResponseCompressor(min_size=64, encodings=["gzip"])
+    cache = ResponseCache(compressor=compressor)
+    app = Flask(__name__)
+    compressor.init_app(app)
+
+    @app.route("/data")
+    @cache.cached("data", ttl=60)
+    def data():
+        return Response(body, mimetype="application/json")
+
+    return app, compressor
+
+
+def test_compress_entry_keeps_identity_when_not_smaller():
+    compressor = ResponseCompressor(min_size=64, encodings=["gzip"])
+    entry = CacheEntry(os.urandom(4096), "etag", "application/json", 0)
+    assert compressor.compress_entry(entry, "gzip") is None
+    assert compressor.compress_entry(entry, "gzip") is None
+    assert compressor.stats()["responses"]["gzip"] == 1
+
+
+def test_incompressible_cached_body_is_sent_uncompressed_once_checked():
+    body = os.urandom(4096)
+    app, compressor = make_app(body)
+    client = app.test_client()
+    for _ in range(3):
+        response = client.get("/data", headers={"Accept-Encoding": "gzip"})
+        assert "Content-Encoding" not in response.headers
+        assert response.data == body
+        assert "Accept-Encoding" in response.headers["Vary"]
+        assert not response.get_etag()[1]
+    assert compressor.stats()["responses"]["gzip"] == 1
+
+
+def test_compressible_cached_body_is_compressed():
+    body = b'{"rows": [' + b'{"status": "Open", "count": 1}, ' * 200 + b'{}]}'
+    app, compressor = make_app(body)
+    client = app.test_client()
+    for _ in range(2):
+        response = client.get("/data", headers={"Accept-Encoding": "gzip"})
+        assert response.headers["Content-Encoding"] == "gzip"
+        assert gzip.decompress(response.data) == body
+        assert response.get_etag()[1]
+    assert compressor.stats()["responses"]["gzip"] == 1
@@ -0,0 +1,21 @@
+import pytest
+
+
+@pytest.mark.parametrize("product, company", [
+    ("", ""),
+    ("o", ""),            # substring of many products
+    ("", "Company 00"),   # substring of many companies
+    ("zzz-none", ""),
+])
+def test_dashboard_stats_match_stats_endpoint(client, product, company):
+    stats = client.get(f"/api/stats?date=&Product_Name={product}&Company_Name={company}")
+    dashboard = client.get(f"/api/dashboard?Product_Name={product}&Company_Name={company}")
+    assert stats.status_code == dashboard.status_code == 200
+    assert dashboard.get_json()["stats"] == stats.get_json()
+
+
+def test_dashboard_stats_match_for_an_exact_name(client, appmod):
+    appmod.dimension_index.ensure_loaded()
+    product = appmod.dimension_index.values("products", None)[0]
+    stats = client.get(f"/api/stats?date=&Product_Name={product}&Company_Name=").get_json()
+    assert client.get(f"/api/dashboard?Product_Name={product}").get_json()["stats"] == stats
@@ -0,0 +1,128 @@
+import sqlite3
+import threading
+
+import pytest
+
+import db_pool
+from db_pool import ConnectionPool, PoolTimeout
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(db_pool.time, "monotonic", clock)
+    return clock
+
+
+def make_pool(**kwargs):
+    opened = []
+
+    def connect():
+        conn = sqlite3.connect(":memory:", check_same_thread=False)
+        opened.append(conn)
+        return conn
+
+    return ConnectionPool(connect, **kwargs), opened
+
+
+def test_close_returns_connection_for_reuse():
+    pool, opened = make_pool(min_size=1, max_size=2)
+    first = pool.getconn()
+    raw = first.raw
+    first.close()
+    first.close()  # idempotent
+    second = pool.getconn()
+    assert second.raw is raw
+    assert len(opened) == 1
+    assert pool.stats()["in_use"] == 1
+
+
+def test_checkout_times_out_when_pool_is_exhausted():
+    pool, _ = make_pool(min_size=0, max_size=1)
+    held = pool.getconn()
+    with pytest.raises(PoolTimeout):
+        pool.getconn(timeout=0.05)
+    stats = pool.stats()
+    assert stats["timeouts"] == 1
+    assert stats["size"] == 1 and stats["in_use"] == 1
+    held.close()
+    pool.getconn(timeout=0.05).close()
+
+
+def test_waiting_checkout_gets_the_released_connection():
+    pool, opened = make_pool(min_size=0, max_size=1)
+    held = pool.getconn()
+    got = []
+    waiter = threading.Thread(target=lambda: got.append(pool.getconn(timeout=5)))
+    waiter.start()
+    held.close()
+    waiter.join(5)
+    assert got and got[0].raw is held.raw
+    assert len(opened) == 1
+    assert pool.stats()["waits"] == 1
+
+
+def test_connection_older_than_max_age_is_recycled_on_release(clock):
+    pool, opened = make_pool(min_size=0, max_size=2, max_age=60)
+    conn = pool.getconn()
+    clock.now += 61
+    conn.close()
+    stats = pool.stats()
+    assert stats["recycled"] == 1 and stats["size"] == 0
+    replacement = pool.getconn()
+    assert replacement.raw is not opened[0]
+    assert len(opened) == 2
+
+
+def test_idle_connection_older_than_max_age_is_recycled_on_checkout(clock):
+    pool, opened = make_pool(min_size=1, max_size=2, max_age=60)
+    clock.now += 61
+    conn = pool.getconn()
+    assert conn.raw is opened[1]
+    assert pool.stats()["recycled"] == 1
+    with pytest.raises(sqlite3.ProgrammingError):
+        opened[0].execute("SELECT 1")  # closed
+
+
+def test_invalidate_discards_the_connection():
+    pool, opened = make_pool(min_size=0, max_size=1)
+    conn = pool.getconn()
+    conn.invalidate()
+    stats = pool.stats()
+    assert stats["size"] == 0 and stats["in_use"] == 0 and stats["idle"] == 0
+    assert pool.getconn().raw is opened[1]
+
+
+def test_unhealthy_idle_connection_is_replaced(clock):
+    pool, opened = make_pool(min_size=1, max_size=1, ping_interval=0)
+    opened[0].close()  # the server went away
+    conn = pool.getconn()
+    assert conn.raw is opened[1]
+    assert pool.stats()["invalidated"] == 1
+
+
+def test_release_rolls_back_open_transaction():
+    pool, _ = make_pool(min_size=1, max_size=1)
+    conn = pool.getconn()
+    conn.execute("CREATE TABLE t (x INTEGER)")
+    conn.commit()
+    conn.execute("INSERT INTO t VALUES (1)")
+    conn.close()
+    assert pool.getconn().execute("SELECT COUNT(*) FROM t").fetchone()[0] == 0
+
+
+def test_closed_pool_refuses_checkout():
+    pool, opened = make_pool(min_size=1, max_size=1)
+    pool.close()
+    with pytest.raises(PoolTimeout):
+        pool.getconn()
+    with pytest.raises(sqlite3.ProgrammingError):
+        opened[0].execute("SELECT 1")
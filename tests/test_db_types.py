@@ -0,0 +1,75 @@
+import datetime
+import decimal
+import sys
+import types
+
+import pytest
+
+import db_types
+from db_types import _decimal_from_text, decimal_value, register_output_converters, row_converter, rows_to_dicts
+
+
+class ConverterConnection:
+    """Records add_output_converter() calls like a pyodbc connection."""
+
+    def __init__(self):
+        self.converters = {}
+
+    def add_output_converter(self, sql_type, func):
+        self.converters[sql_type] = func
+
+
+@pytest.fixture
+def fake_pyodbc(monkeypatch):
+    module = types.SimpleNamespace(SQL_DECIMAL=3, SQL_NUMERIC=2)
+    monkeypatch.setitem(sys.modules, "pyodbc", module)
+    return module
+
+
+def test_decimal_value():
+    assert decimal_value(decimal.Decimal("5")) == 5
+    assert type(decimal_value(decimal.Decimal("5"))) is int
+    assert decimal_value(decimal.Decimal("2.5")) == 2.5
+
+
+@pytest.mark.parametrize("value", [5, 2.5, 0])
+def test_decimal_value_passes_numbers_through(value):
+    assert decimal_value(value) == value
+    assert type(decimal_value(value)) is type(value)
+
+
+def test_pyodbc_path_converts_decimal_once(fake_pyodbc):
+    conn = register_output_converters(ConverterConnection())
+    convert_decimal = conn.converters[fake_pyodbc.SQL_DECIMAL]
+    assert conn.converters[fake_pyodbc.SQL_NUMERIC] is convert_decimal
+
+    # The driver converter runs first, but description still reports Decimal for the column
+    description = [("Ticket_Day_Open", decimal.Decimal, None, 10, 10, 0, True),
+                   ("Score", decimal.Decimal, None, 10, 10, 2, True)]
+    row = row_converter(description)([convert_decimal(b"5"), convert_decimal(b"2.50")])
+    assert row == [5, 2.5]
+    assert type(row[0]) is int
+
+
+def test_pyodbc_path_keeps_nulls(fake_pyodbc):
+    conn = register_output_converters(ConverterConnection())
+    assert conn.converters[fake_pyodbc.SQL_DECIMAL](None) is None
+    assert row_converter([("Ticket_Day_Open", decimal.Decimal)])([None]) == [None]
+
+
+def test_register_output_converters_ignores_other_drivers():
+    conn = object()
+    assert register_output_converters(conn) is conn
+
+
+def test_rows_to_dicts_unknown_types_fall_back_per_value():
+    class Cursor:
+        description = [("Created", None), ("Days", None), ("Name", str)]
+
+    rows = [(datetime.date(2025, 1, 2), decimal.Decimal("3"), "a")]
+    assert rows_to_dicts(Cursor(), rows) == [{"Created": "2025-01-02", "Days": 3, "Name": "a"}]
+
+
+def test_decimal_from_text():
+    assert _decimal_from_text(b"7.000") == 7
+    assert db_types._decimal_from_text("1.25") == 1.25
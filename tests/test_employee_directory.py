@@ -0,0 +1,121 @@
+import sqlite3
+
+import pytest
+
+import bench_data
+from employee_directory import EmployeeDirectory
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = str(tmp_path / "employees.db")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE Chatbot_Emp (Emp_ID TEXT PRIMARY KEY, Emp_Name TEXT, Email_Id TEXT,"
+                 " Role TEXT, Password TEXT)")
+    conn.executemany("INSERT INTO Chatbot_Emp VALUES (?, ?, ?, ?, ?)", [
+        ("E1", "One", "one@example.com", "Agent", "old"),
+        ("E2", "Two", "two@example.com", "Agent", "pw"),
+    ])
+    conn.commit()
+    conn.close()
+    return path
+
+
+def execute(path, sql, params=()):
+    conn = sqlite3.connect(path)
+    conn.execute(sql, params)
+    conn.commit()
+    conn.close()
+
+
+class RacingDirectory(EmployeeDirectory):
+    """Runs `during_reload` after the full-table read, before the reload swaps its maps."""
+    during_reload = None
+
+    def _query(self, sql, params=()):
+        rows = super()._query(sql, params)
+        if "WHERE" not in sql and self.during_reload is not None:
+            during, self.during_reload = self.during_reload, None
+            during()
+        return rows
+
+
+def test_write_through_during_reload_is_kept(db_path):
+    directory = RacingDirectory(lambda: bench_data.connect(db_path), dialect="sqlite")
+    directory.reload()
+
+    def write():
+        execute(db_path, "UPDATE Chatbot_Emp SET Password = 'new', Role = 'Admin' WHERE Emp_ID = 'E1'")
+        directory.refresh_ids(["E1"])
+
+    directory.during_reload = write
+    directory.reload()
+    assert directory.by_emp_id("E1")["Role"] == "Admin"
+    assert directory.by_email("one@example.com")["Password"] == "new"
+
+
+def test_delete_during_reload_is_kept(db_path):
+    directory = RacingDirectory(lambda: bench_data.connect(db_path), dialect="sqlite")
+    directory.reload()
+
+    def delete():
+        execute(db_path, "DELETE FROM Chatbot_Emp WHERE Emp_ID = 'E2'")
+        directory.remove("E2")
+
+    directory.during_reload = delete
+    directory.reload()
+    assert [e["Emp_ID"] for e in directory.all()] == ["E1"]
+    assert directory.by_email("two@example.com") is None
+
+
+def test_miss_falls_back_to_the_table(db_path):
+    directory = EmployeeDirectory(lambda: bench_data.connect(db_path), dialect="sqlite")
+    directory.reload()
+    execute(db_path, "INSERT INTO Chatbot_Emp VALUES ('E3', 'Three', 'three@example.com', 'Agent', 'pw')")
+    assert directory.by_email("three@example.com")["Emp_ID"] == "E3"
+    assert directory.stats()["db_lookups"] == 1
+    assert directory.by_emp_id("E3")["Emp_Name"] == "Three"
+    assert directory.stats()["db_lookups"] == 1
+
+
+def test_mssql_email_lookup_ignores_case_and_trailing_spaces(db_path):
+    directory = EmployeeDirectory(lambda: bench_data.connect(db_path), dialect="mssql")
+    directory.reload()
+    assert directory.by_email("ONE@example.com ")["Emp_ID"] == "E1"
+
+
+def login(client, email, password):
+    return client.post("/api/auth/login", json={"email": email, "password": password})
+
+
+def import_employee(client, **values):
+    response = client.post("/api/employees/bulk", json=[values])
+    assert response.status_code == 200, response.get_json()
+
+
+def test_login_and_token_role_follow_writes(client):
+    import_employee(client, Emp_ID="DIR-1", Emp_Name="Dir One", Email_Id="dir1@example.com",
+                    Company_ID="C0001", Role="Agent", Password="first")
+    response = login(client, "dir1@example.com", "first")
+    assert response.status_code == 200
+    token = response.get_json()["token"]
+    protected = client.get("/api/protected", headers={"x-access-token": token})
+    assert "role Agent" in protected.get_json()["message"]
+
+    import_employee(client, Emp_ID="DIR-1", Password="second", Role="Admin")
+    assert login(client, "dir1@example.com", "first").status_code == 401
+    assert login(client, "dir1@example.com", "second").status_code == 200
+    # The token still says Agent; the directory's current role wins
+    protected = client.get("/api/protected", headers={"x-access-token": token})
+    assert "role Admin" in protected.get_json()["message"]
+
+
+def test_employee_added_outside_the_app_can_sign_in(client, bench_db):
+    execute(bench_db, "INSERT INTO Chatbot_Emp (Emp_ID, Emp_Name, Email_Id, Company_ID, Role, Password)"
+                      " VALUES ('DIR-EXT', 'External', 'ext@example.com', 'C0001', 'Agent', 'pw')")
+    assert login(client, "ext@example.com", "pw").status_code == 200
+
+
+def test_unknown_user_and_bad_token(client):
+    assert login(client, "nobody@example.com", "pw").status_code == 401
+    assert client.get("/api/protected", headers={"x-access-token": "garbage"}).status_code == 401
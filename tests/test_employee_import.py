@@ -0,0 +1,131 @@
+import io
+import sqlite3
+
+import pytest
+
+
+def stored(bench_db, emp_id):
+    conn = sqlite3.connect(bench_db)
+    conn.row_factory = sqlite3.Row
+    try:
+        row = conn.execute("SELECT * FROM Chatbot_Emp WHERE Emp_ID = ?", (emp_id,)).fetchone()
+        return dict(row) if row else None
+    finally:
+        conn.close()
+
+
+def new_employee(emp_id, **values):
+    return dict({"Emp_ID": emp_id, "Emp_Name": f"Name {emp_id}", "Email_Id": f"{emp_id.lower()}@example.com",
+                 "Company_ID": "C0001", "Role": "Agent"}, **values)
+
+
+def test_invalid_rows_are_reported_by_row_and_skipped(client, bench_db):
+    response = client.post("/api/employees/bulk", json=[
+        new_employee("IMP-V1"),
+        {"Emp_Name": "No id"},
+        new_employee("IMP-V2", Email_Id="not-an-email"),
+        {"Emp_ID": "IMP-V3", "Emp_Name": "Missing the rest"},
+        new_employee("IMP-V4", Unknown="x"),
+        "not an object",
+    ])
+    assert response.status_code == 200
+    body = response.get_json()
+    by_row = {r["row"]: r for r in body["results"]}
+    assert by_row[1]["status"] == "insert"
+    assert by_row[2]["errors"] == ["Emp_ID is required"]
+    assert by_row[3]["errors"] == ["Email_Id is not an email address"]
+    assert by_row[4]["errors"] == ["New employee is missing Email_Id, Company_ID, Role"]
+    assert by_row[5]["errors"] == ["Unknown field 'Unknown'"]
+    assert by_row[6]["errors"] == ["Row must be an object"]
+    assert (body["inserted"], body["updated"], body["invalid"]) == (1, 0, 5)
+    assert stored(bench_db, "IMP-V1") is not None
+    assert stored(bench_db, "IMP-V3") is None
+
+
+def test_all_rows_invalid_is_400(client):
+    response = client.post("/api/employees/bulk", json=[{"Emp_Name": "No id"}])
+    assert response.status_code == 400
+    assert response.get_json()["invalid"] == 1
+
+
+def test_duplicate_emp_id_in_one_upload(client, bench_db):
+    response = client.post("/api/employees/bulk", json=[
+        new_employee("IMP-D1"), new_employee("IMP-D1", Emp_Name="Second")])
+    results = response.get_json()["results"]
+    assert results[0]["status"] == "insert"
+    assert results[1]["status"] == "invalid"
+    assert results[1]["errors"] == ["Duplicate Emp_ID (first seen in row 1)"]
+    assert stored(bench_db, "IMP-D1")["Emp_Name"] == "Name IMP-D1"
+
+
+CSV = ("Emp_ID,Emp_Name,Email_Id,Company_ID,Role,Department_ID\n"
+       "{id}1,One,{lower}1@example.com,C0001,Agent,D01\n"
+       "{id}2,Two,bad-email,C0001,Agent,D01\n")
+
+
+def test_text_csv_body_reports_line_numbers(client, bench_db):
+    body = CSV.format(id="IMP-T", lower="imp-t")
+    response = client.post("/api/employees/bulk", data=body, content_type="text/csv")
+    assert response.status_code == 200
+    results = response.get_json()["results"]
+    assert [(r["row"], r["status"]) for r in results] == [(2, "insert"), (3, "invalid")]
+    assert stored(bench_db, "IMP-T1")["Department_ID"] == "D01"
+
+
+def test_csv_file_upload_with_bom(client, bench_db):
+    body = ("\ufeff" + CSV.format(id="IMP-F", lower="imp-f")).encode("utf-8")
+    response = client.post("/api/employees/bulk", content_type="multipart/form-data",
+                           data={"file": (io.BytesIO(body), "employees.csv")})
+    assert response.status_code == 200
+    assert response.get_json()["inserted"] == 1
+    assert stored(bench_db, "IMP-F1")["Emp_Name"] == "One"
+
+
+def test_csv_unknown_column_is_rejected(client):
+    response = client.post("/api/employees/bulk", data="Emp_ID,Nickname\nX,y\n", content_type="text/csv")
+    assert response.status_code == 400
+    assert "Nickname" in response.get_json()["error"]
+
+
+def test_dry_run_validates_without_writing(client, bench_db):
+    response = client.post("/api/employees/bulk?dry_run=1", json=[new_employee("IMP-DRY")])
+    body = response.get_json()
+    assert response.status_code == 200
+    assert body["dry_run"] is True and body["inserted"] == 1
+    assert stored(bench_db, "IMP-DRY") is None
+
+
+def test_update_keeps_stored_values_for_empty_cells(client, bench_db):
+    client.post("/api/employees/bulk", json=[new_employee("IMP-U1", Department_ID="D01", Password="secret")])
+    response = client.post(
+        "/api/employees/bulk",
+        data="Emp_ID,Emp_Name,Department_ID,Password\nIMP-U1,,D02,\n", content_type="text/csv")
+    body = response.get_json()
+    assert (body["inserted"], body["updated"]) == (0, 1)
+    row = stored(bench_db, "IMP-U1")
+    assert row["Department_ID"] == "D02"
+    assert row["Emp_Name"] == "Name IMP-U1"
+    assert row["Password"] == "secret"
+    assert row["Email_Id"] == "imp-u1@example.com"
+
+
+def test_counts_mix_inserts_and_updates(client, bench_db):
+    client.post("/api/employees/bulk", json=[new_employee("IMP-M0")])
+    response = client.post("/api/employees/bulk", json={"employees": [
+        {"Emp_ID": "IMP-M0", "Role": "Admin"},
+        new_employee("IMP-M1"),
+        new_employee("IMP-M2"),
+    ]})
+    body = response.get_json()
+    assert (body["inserted"], body["updated"], body["invalid"]) == (2, 1, 0)
+    assert [r["status"] for r in body["results"]] == ["update", "insert", "insert"]
+    assert stored(bench_db, "IMP-M0")["Role"] == "Admin"
+
+
+@pytest.mark.parametrize("kwargs", [
+    {"data": b"x", "content_type": "application/octet-stream"},
+    {"json": []},
+    {"json": {"rows": []}},
+])
+def test_rejected_bodies(client, kwargs):
+    assert client.post("/api/employees/bulk", **kwargs).status_code == 400
@@ -0,0 +1,104 @@
+import sqlite3
+
+import pytest
+
+from employee_list import EMPLOYEE_FIELDS, build_employee_filters, decode_cursor, encode_cursor
+
+COMPANY = "LIST"
+NAMES = ["Ann", "Anna", "Bob", "Cy 50%", "Cy 50x", "Dee_1", "Deex1", "Eve", "Fay", "Gus"]
+
+
+@pytest.fixture(scope="module")
+def employees(bench_db):
+    conn = sqlite3.connect(bench_db)
+    conn.executemany(
+        "INSERT INTO Chatbot_Emp (Emp_ID, Emp_Name, Email_Id, Company_ID, Department_ID, Role, Password)"
+        " VALUES (?, ?, ?, ?, ?, ?, ?)",
+        [(f"L{i:02d}", name, f"list{i}@example.com", COMPANY, "D01" if i % 2 else "D02",
+          "Admin" if i < 3 else "Agent", "secret") for i, name in enumerate(NAMES)])
+    conn.commit()
+    conn.close()
+    return [f"L{i:02d}" for i in range(len(NAMES))]
+
+
+def ids(items):
+    return [e["Emp_ID"] for e in items]
+
+
+@pytest.mark.parametrize("limit", [1, 3, 4, 10])
+def test_keyset_pages_cover_every_employee_once(client, employees, limit):
+    seen = []
+    cursor = None
+    while True:
+        args = {"company_id": COMPANY, "limit": limit}
+        if cursor:
+            args["cursor"] = cursor
+        page = client.get("/api/getemployees", query_string=args).get_json()
+        assert len(page["items"]) <= limit
+        seen += ids(page["items"])
+        cursor = page["next"]
+        if cursor is None:
+            break
+    assert seen == employees
+
+
+def test_offset_pages(client, employees):
+    page = client.get("/api/getemployees", query_string={"company_id": COMPANY, "limit": 4, "offset": 4}).get_json()
+    assert ids(page["items"]) == employees[4:8]
+    last = client.get("/api/getemployees", query_string={"company_id": COMPANY, "limit": 4, "offset": 8}).get_json()
+    assert ids(last["items"]) == employees[8:]
+    assert last["next"] is None
+
+
+@pytest.mark.parametrize("args", [
+    {"cursor": encode_cursor("L01"), "offset": 2},
+    {"cursor": "not-a-cursor"},
+    {"limit": 0},
+    {"offset": -1},
+    {"fields": "Emp_ID,Password"},
+])
+def test_invalid_paging_and_fields_are_rejected(client, args):
+    assert client.get("/api/getemployees", query_string=args).status_code == 400
+
+
+@pytest.mark.parametrize("q, expected", [
+    ("Ann", ["Ann", "Anna"]),
+    ("Cy 50%", ["Cy 50%"]),
+    ("Dee_", ["Dee_1"]),
+    ("list1", ["Anna"]),
+    ("%", []),
+])
+def test_prefix_search_escapes_wildcards(client, employees, q, expected):
+    result = client.get("/api/getemployees", query_string={"company_id": COMPANY, "q": q}).get_json()
+    assert [e["Emp_Name"] for e in result] == expected
+
+
+def test_fields_projection(client, employees):
+    result = client.get("/api/getemployees",
+                        query_string={"company_id": COMPANY, "role": "Admin", "fields": "emp_name, Role"}).get_json()
+    assert result == [{"Emp_Name": n, "Role": "Admin"} for n in NAMES[:3]]
+    page = client.get("/api/getemployees",
+                      query_string={"company_id": COMPANY, "fields": "Emp_Name", "limit": 2}).get_json()
+    assert page["items"] == [{"Emp_Name": "Ann"}, {"Emp_Name": "Anna"}]
+    assert decode_cursor(page["next"]) == "L01"
+
+
+def test_filters(client, employees):
+    result = client.get("/api/getemployees", query_string={"company_id": COMPANY, "department_id": "D01"}).get_json()
+    assert ids(result) == employees[1::2]
+
+
+@pytest.mark.parametrize("args", [{}, {"company_id": COMPANY}, {"limit": 5}, {"q": "Ann"},
+                                  {"fields": ",".join(EMPLOYEE_FIELDS)}])
+def test_password_never_listed(client, employees, args):
+    response = client.get("/api/getemployees", query_string=args)
+    assert response.status_code == 200
+    assert b"Password" not in response.data
+    assert b"secret" not in response.data
+
+
+def test_mssql_prefix_escapes_brackets():
+    where, params = build_employee_filters({}, "a[b%", "mssql")
+    assert params == ["a\\[b\\%%", "a\\[b\\%%"]
+    where, params = build_employee_filters({}, "a[b", "sqlite")
+    assert params[0] == "a[b%"
@@ -0,0 +1,67 @@
+import dataclasses
+import datetime
+import decimal
+import uuid
+
+import pytest
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+import json_provider
+
+
+class Html:
+    def __html__(self):
+        return "<b>x</b>"
+
+
+@dataclasses.dataclass
+class Point:
+    x: int
+    y: int
+
+
+VALUES = {
+    "decimal_int": decimal.Decimal("12"),
+    "decimal_frac": decimal.Decimal("1.50"),
+    "date": datetime.date(2025, 1, 2),
+    "datetime": datetime.datetime(2025, 1, 2, 3, 4, 5),
+    "uuid": uuid.UUID("12345678-1234-5678-1234-567812345678"),
+    "dataclass": Point(1, 2),
+    "html": Html(),
+}
+
+PROVIDERS = [json_provider.StdJSONProvider]
+if json_provider.orjson is not None:
+    PROVIDERS.append(json_provider.OrjsonProvider)
+
+
+@pytest.fixture(params=PROVIDERS, ids=lambda p: p.__name__)
+def app(request):
+    app = Flask(__name__)
+    app.json = request.param(app)
+    return app
+
+
+def test_encodes_like_flask_except_decimal(app):
+    flask_app = Flask(__name__)
+    flask_app.json = DefaultJSONProvider(flask_app)
+    expected = flask_app.json.loads(flask_app.json.dumps({k: v for k, v in VALUES.items()
+                                                          if not k.startswith("decimal")}))
+    decoded = app.json.loads(app.json.dumps(VALUES))
+    assert decoded.pop("decimal_int") == 12
+    assert decoded.pop("decimal_frac") == 1.5
+    assert decoded == expected
+    assert decoded["date"] == "Thu, 02 Jan 2025 00:00:00 GMT"
+
+
+def test_response_body(app):
+    with app.app_context():
+        response = app.json.response({"when": VALUES["date"], "total": VALUES["decimal_int"]})
+    assert response.mimetype == "application/json"
+    assert app.json.loads(response.get_data()) == {"when": "Thu, 02 Jan 2025 00:00:00 GMT", "total": 12}
+
+
+def test_unknown_type_raises(app):
+    with pytest.raises(TypeError):
+        app.json.dumps({"x": object()})
@@ -0,0 +1,36 @@
+import datetime
+
+import pytest
+
+import query_filters
+from query_filters import SubstringMatch, build_ticket_filters, like_contains
+
+
+def test_exact_names_bind_in_list():
+    where, params = build_ticket_filters(products=["A", "B", "A"])
+    assert where == " WHERE Product_Name IN (?, ?)"
+    assert params == ["A", "B"]
+
+
+def test_empty_match_selects_nothing():
+    assert build_ticket_filters(companies=SubstringMatch([], "zz")) == (" WHERE 1 = 0", [])
+
+
+def test_many_substring_matches_fall_back_to_like():
+    names = SubstringMatch([f"Product {i}" for i in range(query_filters.MAX_NAME_PARAMS + 1)], "duct")
+    where, params = build_ticket_filters(start_date=datetime.date(2025, 1, 1), products=names)
+    assert where == " WHERE Ticket_Creation_Date >= ? AND Product_Name LIKE ? ESCAPE '\\'"
+    assert params == [datetime.date(2025, 1, 1), "%duct%"]
+
+
+def test_like_pattern_escapes_wildcards():
+    assert like_contains("50%_[x]\\") == "%50\\%\\_\\[x]\\\\%"
+
+
+@pytest.mark.parametrize("needle", ["a", "o", "Comp"])
+def test_stats_match_with_and_without_fallback(client, appmod, monkeypatch, needle):
+    url = f"/api/stats?date=&Product_Name={needle}&Company_Name={needle}"
+    bound = client.get(url).get_json()
+    monkeypatch.setattr(query_filters, "MAX_NAME_PARAMS", 1)
+    appmod.response_cache.clear()
+    assert client.get(url).get_json() == bound
@@ -0,0 +1,42 @@
+from response_cache import ResponseCache
+
+
+def test_expired_entries_miss():
+    cache = ResponseCache()
+    cache.put("k", b"{}", "application/json", 0)
+    assert cache.get("k") is None
+
+
+def test_lru_evicts_oldest():
+    cache = ResponseCache(max_entries=2)
+    cache.put("a", b"1", "application/json", 60)
+    cache.put("b", b"2", "application/json", 60)
+    cache.get("a")
+    cache.put("c", b"3", "application/json", 60)
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
+    assert cache.stats()["evictions"] == 1
+
+
+def test_aggregate_is_served_from_cache(client):
+    first = client.get("/api/stats?date=&Product_Name=&Company_Name=")
+    second = client.get("/api/stats?company_name=&product_name=&DATE=")
+    assert first.status_code == second.status_code == 200
+    assert first.headers["X-Cache"] == "MISS"
+    assert second.headers["X-Cache"] == "HIT"
+    assert second.data == first.data
+    assert second.headers["ETag"] == first.headers["ETag"]
+
+
+def test_matching_etag_gets_304(client):
+    first = client.get("/api/charts")
+    response = client.get("/api/charts", headers={"If-None-Match": first.headers["ETag"]})
+    assert response.status_code == 304
+    assert response.data == b""
+
+
+def test_different_filters_are_cached_separately(client):
+    everything = client.get("/api/stats?date=&Product_Name=&Company_Name=")
+    one_product = client.get("/api/stats?date=&Product_Name=Product 001&Company_Name=")
+    assert one_product.headers["X-Cache"] == "MISS"
+    assert one_product.data != everything.data
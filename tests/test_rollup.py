@@ -0,0 +1,160 @@
+import datetime
+import shutil
+
+import pytest
+
+import bench_data
+from chart_engine import CHART_SPECS, compile_chart_query
+from query_filters import build_ticket_filters
+from rollup import DailyRollup
+from trends import compile_trend_query
+
+FILTERS = [
+    {},
+    {"start_date": datetime.date(2024, 3, 1), "end_date": datetime.date(2024, 9, 30)},
+    {"products": ["Product 001", "Product 002"]},
+    {"companies": ["Company 0003"], "start_date": datetime.date(2025, 1, 1)},
+    {"products": []},
+]
+
+STATUS_SPECS = [spec for spec in CHART_SPECS if spec["column"] == "Ticket_Status"]
+
+
+@pytest.fixture
+def db_path(bench_db, tmp_path):
+    path = str(tmp_path / "rollup.db")
+    shutil.copy(bench_db, path)
+    return path
+
+
+@pytest.fixture
+def rollup(db_path):
+    # The small test dataset barely compresses, so serve from the rollup whatever its size
+    rollup = DailyRollup(lambda: bench_data.connect(db_path), dialect="sqlite", max_lag=0, max_row_ratio=None)
+    rollup.ensure_schema()
+    rollup.refresh()
+    return rollup
+
+
+def query(db_path, sql, params=()):
+    conn = bench_data.connect(db_path)
+    try:
+        return sorted((tuple(row) for row in conn.execute(sql, tuple(params))), key=repr)
+    finally:
+        conn.close()
+
+
+def assert_matches_raw(db_path, rollup, filters):
+    where, params = build_ticket_filters(**filters)
+    raw_stats = ("SELECT Ticket_Status, COUNT(*), SUM(COALESCE(Ticket_Day_Open, 0))"
+                 f" FROM Chatbot_Transaction{where} GROUP BY Ticket_Status")
+    assert query(db_path, rollup.stats_query(where), params) == query(db_path, raw_stats, params)
+
+    measures = ["SUM(COALESCE(Ticket_Day_Open, 0))"]
+    assert (query(db_path, rollup.chart_query(where, STATUS_SPECS, measures), params)
+            == query(db_path, compile_chart_query(where, STATUS_SPECS, measures=measures), params))
+
+    for granularity in ("day", "week", "month"):
+        assert (query(db_path, rollup.trend_query(where, granularity), params)
+                == query(db_path, compile_trend_query(where, granularity, "sqlite"), params))
+
+
+@pytest.mark.parametrize("filters", FILTERS)
+def test_rebuilt_rollup_matches_raw_queries(db_path, rollup, filters):
+    assert_matches_raw(db_path, rollup, filters)
+    where, params = build_ticket_filters(**filters)
+    assert bool(query(db_path, rollup.stats_query(where), params)) == (filters.get("products") != [])
+
+
+def test_incremental_refresh_matches_raw_queries(db_path, rollup):
+    conn = bench_data.connect(db_path)
+    # New tickets arrive above the Uniqueid high-water mark
+    (high,) = conn.execute("SELECT MAX(Uniqueid) FROM Chatbot_Transaction").fetchone()
+    conn.executemany(
+        "INSERT INTO Chatbot_Transaction (Uniqueid, Ticket_Creation_Date, Ticket_Status, Ticket_Day_Open,"
+        " Product_Name, Company_Name, Company_ID) VALUES (?, ?, ?, ?, ?, ?, ?)",
+        [(high + 1, "2024-06-15 10:00:00", "Open", 4, "Product 001", "Company 0003", "C0003"),
+         (high + 2, "2025-02-01 23:59:59", "Closed", None, "Product 002", "Company 0003", "C0003"),
+         (high + 3, None, "Open", 2, "Product 001", "Company 0003", "C0003")])
+    conn.commit()
+    conn.close()
+
+    assert rollup.refresh() == 3
+    for filters in FILTERS:
+        assert_matches_raw(db_path, rollup, filters)
+
+
+def test_full_rebuild_picks_up_deletes(db_path, rollup):
+    conn = bench_data.connect(db_path)
+    conn.execute("DELETE FROM Chatbot_Transaction WHERE Uniqueid % 7 = 0")
+    conn.commit()
+    conn.close()
+
+    assert rollup.refresh() == 0
+    assert rollup.refresh(full=True) == -1
+    for filters in FILTERS:
+        assert_matches_raw(db_path, rollup, filters)
+
+
+def test_full_rebuild_fills_the_other_table_and_swaps(db_path, rollup):
+    first = rollup.table
+    stale = query(db_path, f"SELECT COUNT(*) FROM {first}")
+    conn = bench_data.connect(db_path)
+    conn.execute("DELETE FROM Chatbot_Transaction WHERE Uniqueid % 5 = 0")
+    conn.commit()
+    conn.close()
+
+    assert rollup.refresh(full=True) == -1
+    assert rollup.table != first and {first, rollup.table} == set(rollup.tables)
+    # The previous table was left alone for readers still using it
+    assert query(db_path, f"SELECT COUNT(*) FROM {first}") == stale
+    assert query(db_path, f"SELECT Live_Table FROM {rollup.state_table}") == [(rollup.table,)]
+    assert_matches_raw(db_path, rollup, {})
+
+    assert rollup.refresh(full=True) == -1
+    assert rollup.table == first
+    assert_matches_raw(db_path, rollup, {})
+
+
+def test_failed_rebuild_keeps_the_live_table(db_path, rollup, monkeypatch):
+    live = rollup.table
+    # Fails after the other table has been emptied
+    monkeypatch.setattr(rollup, "_select_sql", lambda table, where="": "INSERT INTO Missing_Table VALUES (1)")
+    with pytest.raises(Exception):
+        rollup.refresh(full=True)
+    monkeypatch.undo()
+    assert rollup.table == live
+    assert query(db_path, f"SELECT Live_Table FROM {rollup.state_table}") == [(live,)]
+    assert_matches_raw(db_path, rollup, {})
+
+
+def test_another_process_follows_the_live_table(db_path, rollup):
+    other = DailyRollup(lambda: bench_data.connect(db_path), dialect="sqlite", max_lag=0, max_row_ratio=None)
+    other.refresh()
+    assert other.table == rollup.table
+    rollup.refresh(full=True)
+    assert other.refresh() == 0
+    assert other.table == rollup.table
+
+
+def test_chart_dimensions_outside_the_key_use_the_raw_table(rollup):
+    assert rollup.chart_query("", CHART_SPECS) is None
+    assert rollup.chart_query("", STATUS_SPECS) is not None
+
+
+def test_rollup_is_not_used_when_it_does_not_compress(db_path, rollup):
+    (ratio,) = query(db_path, f"SELECT CAST(COUNT(*) AS REAL) / SUM(Ticket_Count) FROM {rollup.table}")[0]
+    assert rollup.stats()["row_ratio"] == round(ratio, 3)
+
+    rollup.max_row_ratio = ratio - 0.01
+    assert not rollup.usable()
+    assert rollup.stats_query("") is None and rollup.trend_query("", "day") is None
+    rollup.max_row_ratio = ratio
+    assert rollup.usable()
+
+
+def test_stale_rollup_is_not_used(db_path):
+    rollup = DailyRollup(lambda: bench_data.connect(db_path), dialect="sqlite")
+    assert rollup.stats_query("") is None
+    assert rollup.chart_query("") is None
+    assert rollup.trend_query("", "day") is None
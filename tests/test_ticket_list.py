@@ -0,0 +1,75 @@
+import datetime
+import sqlite3
+
+import pytest
+
+from ticket_list import compile_ticket_query, decode_cursor, encode_cursor, keyset_predicate
+
+COMPANY = ("KEYSET", "keyset@example.com")
+
+
+def test_cursor_keeps_datetime_to_the_millisecond():
+    created = datetime.datetime(2025, 3, 1, 10, 15, 30, 3333)
+    assert decode_cursor(encode_cursor(created, 42)) == ("2025-03-01T10:15:30.003", 42)
+
+
+def test_cursor_keeps_stored_text():
+    assert decode_cursor(encode_cursor("2025-03-01 10:15:30", 7)) == ("2025-03-01 10:15:30", 7)
+    assert decode_cursor(encode_cursor(None, 7)) == (None, 7)
+
+
+@pytest.mark.parametrize("raw", ["zz", encode_cursor("not a date", 1), encode_cursor("2025-01-01", "x")])
+def test_invalid_cursor(raw):
+    with pytest.raises(ValueError):
+        decode_cursor(raw)
+
+
+def test_mssql_predicate_casts_to_column_type():
+    sql, params = keyset_predicate(("2025-03-01T10:15:30.003333", 42), "mssql")
+    assert sql.count("CAST(? AS DATETIME)") == 2
+    assert params == ["2025-03-01T10:15:30.003", "2025-03-01T10:15:30.003", 42]
+
+
+def test_sqlite_predicate_binds_text():
+    sql, params = keyset_predicate(("2025-03-01 10:15:30", 42), "sqlite")
+    assert "CAST" not in sql
+    assert params == ["2025-03-01 10:15:30", "2025-03-01 10:15:30", 42]
+
+
+def test_compile_mssql_page():
+    sql, params = compile_ticket_query(" WHERE Company_ID = ?", ["C1"], ["Ticket_No"],
+                                       ("2025-03-01T10:15:30", 9), 11, "mssql")
+    assert sql.startswith("SELECT TOP (?) Ticket_No, Ticket_Creation_Date, Uniqueid FROM Chatbot_Transaction")
+    assert params == [11, "C1", "2025-03-01T10:15:30.000", "2025-03-01T10:15:30.000", 9]
+
+
+@pytest.fixture(scope="module")
+def tied_tickets(bench_db):
+    """Tickets sharing creation timestamps (and some without one) for COMPANY."""
+    conn = sqlite3.connect(bench_db)
+    dates = ["2025-05-01 09:00:00"] * 8 + ["2025-05-01 08:00:00"] * 5 + [None] * 4 + ["2025-04-30 23:59:59"] * 6
+    conn.executemany(
+        "INSERT INTO Chatbot_Transaction (Uniqueid, Ticket_No, Ticket_Creation_Date, Company_ID, Company_Email)"
+        " VALUES (?, ?, ?, ?, ?)",
+        [(900000 + i, f"KS{i:03d}", date) + COMPANY for i, date in enumerate(dates)])
+    conn.commit()
+    conn.close()
+    return len(dates)
+
+
+@pytest.mark.parametrize("limit", [1, 3, 5, 8])
+def test_pages_cover_every_ticket_once(client, tied_tickets, limit):
+    url = f"/api/tickets?company_id={COMPANY[0]}&company_email={COMPANY[1]}&fields=Uniqueid"
+    everything = [t["Uniqueid"] for t in client.get(url).get_json()]
+    assert len(everything) == tied_tickets
+
+    seen = []
+    cursor = None
+    while True:
+        page = client.get(url + f"&limit={limit}" + (f"&cursor={cursor}" if cursor else "")).get_json()
+        assert len(page["items"]) <= limit
+        seen += [t["Uniqueid"] for t in page["items"]]
+        cursor = page["next"]
+        if cursor is None:
+            break
+    assert seen == everything
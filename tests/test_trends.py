@@ -0,0 +1,66 @@
+import datetime
+
+import pytest
+
+import bench_data
+from trends import build_trends
+
+
+def ticket_days(bench_db):
+    conn = bench_data.connect(bench_db)
+    try:
+        cursor = conn.cursor()
+        cursor.execute("SELECT COUNT(*), MIN(date(Ticket_Creation_Date)), MAX(date(Ticket_Creation_Date))"
+                       " FROM Chatbot_Transaction WHERE Ticket_Creation_Date IS NOT NULL")
+        count, first, last = cursor.fetchone()
+    finally:
+        conn.close()
+    return count, datetime.date.fromisoformat(first), datetime.date.fromisoformat(last)
+
+
+def total(payload):
+    return sum(sum(dataset["data"]) for dataset in payload["datasets"])
+
+
+@pytest.mark.parametrize("path", ["/api/monthly-trends", "/api/dashboard"])
+def test_no_dates_cover_all_history(client, bench_db, path):
+    count, first, last = ticket_days(bench_db)
+    response = client.get(path + "?granularity=month")
+    assert response.status_code == 200
+    trends = response.get_json()
+    trends = trends.get("trends", trends)
+    assert total(trends) == count
+    assert trends["labels"][0] == first.strftime("%b %Y")
+    assert trends["labels"][-1] == last.strftime("%b %Y")
+
+
+def test_no_dates_at_day_granularity_is_not_capped(client, bench_db):
+    count, first, last = ticket_days(bench_db)
+    trends = client.get("/api/monthly-trends").get_json()
+    assert len(trends["labels"]) == (last - first).days + 1
+    assert total(trends) == count
+
+
+def test_days_limits_the_window(client, bench_db):
+    _, _, last = ticket_days(bench_db)
+    trends = client.get(f"/api/monthly-trends?days=30&end_date={last.isoformat()}").get_json()
+    assert len(trends["labels"]) == 30
+    assert trends["labels"][-1] == last.strftime("%a, %d %b %Y")
+
+
+@pytest.mark.parametrize("query", ["days=0", "days=abc", "start_date=2024-05-01&end_date=2024-04-01"])
+def test_bad_ranges_are_rejected(client, query):
+    assert client.get("/api/monthly-trends?" + query).status_code == 400
+
+
+def test_explicit_range_is_zero_filled(client):
+    trends = client.get("/api/monthly-trends?start_date=2024-01-01&end_date=2024-03-31&granularity=month")
+    assert trends.get_json()["labels"] == ["Jan 2024", "Feb 2024", "Mar 2024"]
+
+
+def test_build_trends_open_range_follows_the_rows():
+    rows = [("2024-01-03", "Open", 2), ("2024-01-05", "Closed", 1), (None, "Open", 4)]
+    trends = build_trends(rows, None, None, "day")
+    assert len(trends["labels"]) == 3
+    assert [d["data"] for d in trends["datasets"]] == [[2, 0, 0], [0, 0, 1]]
+    assert build_trends([], None, None, "day") == {"labels": [], "datasets": []}
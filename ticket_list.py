@@ -0,0 +1,142 @@
+"""Keyset pagination and field projection for the /api/tickets list.
+
+Tickets are ordered by (Ticket_Creation_Date DESC, Uniqueid DESC). A page ends
+with an opaque cursor holding the last row's key; the next page asks for rows
+strictly after that key, so every page is an index seek no matter how deep the
+client has paged (no OFFSET scans).
+
+The cursor carries the key as the column holds it. Ticket_Creation_Date is a
+SQL Server DATETIME, stored in 1/300 s ticks. A Python datetime would bind as
+DATETIME2, and equality with the stored value could then fail, so the page
+boundary row would be skipped or repeated. Instead the cursor keeps the value as
+ISO text to the millisecond, and the predicate casts it back with
+CAST(? AS DATETIME), which rounds to the same tick. On SQLite the stored text is
+compared as it is.
+"""
+import base64
+import datetime
+import json
+
+
+TICKET_FIELDS = [
+    "Uniqueid", "Ticket_No", "Ticket_Category", "Ticket_Details",
+    "Ticket_Creation_Date", "Ticket_Closing_Date", "Ticket_Priority",
+    "Ticket_Status", "Ticket_Day_Open",
+]
+
+# Columns needed to build the next cursor, selected even when not requested
+KEY_FIELDS = ["Ticket_Creation_Date", "Uniqueid"]
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+
+def parse_fields(raw):
+    """Validate a comma-separated `fields=` value; None/empty means every field."""
+    if not raw:
+        return list(TICKET_FIELDS)
+    lookup = {f.lower(): f for f in TICKET_FIELDS}
+    fields = []
+    for name in raw.split(","):
+        name = name.strip()
+        if not name:
+            continue
+        field = lookup.get(name.lower())
+        if field is None:
+            raise ValueError(f"Unknown field '{name}'. Allowed: {', '.join(TICKET_FIELDS)}")
+        if field not in fields:
+            fields.append(field)
+    return fields or list(TICKET_FIELDS)
+
+
+def parse_page_size(raw):
+    if raw is None or raw == "":
+        return DEFAULT_PAGE_SIZE
+    try:
+        size = int(raw)
+    except ValueError:
+        raise ValueError("limit must be an integer")
+    if size < 1:
+        raise ValueError("limit must be at least 1")
+    return min(size, MAX_PAGE_SIZE)
+
+
+# Type of Chatbot_Transaction.Ticket_Creation_Date on SQL Server
+CREATION_DATE_SQL_TYPE = "DATETIME"
+
+
+def encode_cursor(created, uniqueid):
+    if isinstance(created, datetime.datetime):
+        created = created.isoformat(timespec="milliseconds")
+    elif isinstance(created, datetime.date):
+        created = created.isoformat()
+    elif created is not None:
+        created = str(created)
+    raw = json.dumps([created, uniqueid], separators=(",", ":"), default=str).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    """Return (created text as stored in the cursor, uniqueid) from a cursor made by encode_cursor."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created, uniqueid = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if created is not None:
+            datetime.datetime.fromisoformat(created)  # validate only; the text is bound as it is
+        if not isinstance(uniqueid, int):
+            raise ValueError
+        return created, uniqueid
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+
+def keyset_predicate(after, dialect="mssql"):
+    """SQL + params selecting rows after the (created, uniqueid) key in DESC order.
+
+    NULL creation dates sort last in DESC order, so they follow every dated row.
+    """
+    created, uniqueid = after
+    if created is None:
+        return "(Ticket_Creation_Date IS NULL AND Uniqueid < ?)", [uniqueid]
+    if dialect == "sqlite":
+        marker = "?"
+    else:
+        marker = f"CAST(? AS {CREATION_DATE_SQL_TYPE})"
+        # DATETIME accepts at most three fractional digits (older cursors carried six)
+        created = datetime.datetime.fromisoformat(created).isoformat(timespec="milliseconds")
+    return (
+        f"(Ticket_Creation_Date < {marker} OR (Ticket_Creation_Date = {marker} AND Uniqueid < ?)"
+        " OR Ticket_Creation_Date IS NULL)",
+        [created, created, uniqueid],
+    )
+
+
+def selected_columns(fields):
+    """Columns the ticket query selects: the requested fields, then any missing key fields."""
+    return list(fields) + [f for f in KEY_FIELDS if f not in fields]
+
+
+def compile_ticket_query(where, params, fields, after=None, limit=None, dialect="mssql"):
+    """SELECT for one page (or everything when `limit` is None) of the ticket list."""
+    columns = selected_columns(fields)
+    params = list(params)
+    if after is not None:
+        predicate, extra = keyset_predicate(after, dialect)
+        where = (where + " AND " if where else " WHERE ") + predicate
+        params += extra
+
+    top = ""
+    tail = ""
+    if limit is not None:
+        if dialect == "sqlite":
+            tail = " LIMIT ?"
+        else:
+            top = "TOP (?) "
+            params.insert(0, limit)
+    sql = (
+        f"SELECT {top}{', '.join(columns)} FROM Chatbot_Transaction{where}"
+        " ORDER BY Ticket_Creation_Date DESC, Uniqueid DESC" + tail
+    )
+    if tail:
+        params.append(limit)
+    return sql, params
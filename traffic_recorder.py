@@ -0,0 +1,170 @@
+"""Opt-in WSGI middleware recording the live request mix as JSON lines.
+
+Enable with TRAFFIC_RECORD_FILE=traffic.jsonl (optionally TRAFFIC_RECORD_SAMPLE=0.1
+to keep a fraction of requests). One line per request:
+
+    {"ts": 1760000000.123, "method": "GET", "path": "/api/stats", "route": "/api/stats",
+     "query": [["Company_Name", "Acme"], ["Product_Name", ""], ["date", ""]],
+     "body": null, "status": 200, "duration_ms": 4.21, "bytes": 402}
+
+Query parameters are sorted with values trimmed, so identical requests record
+identically. JSON bodies are kept (up to MAX_BODY_BYTES) so writes can be replayed;
+any key containing "password" is replaced by "***" and headers are never
+recorded. Lines are written by a background thread, not the request thread.
+replay.py drives the app with a recording.
+"""
+import atexit
+import io
+import json
+import queue
+import random
+import threading
+import time
+from urllib.parse import parse_qsl
+
+from werkzeug.exceptions import HTTPException
+
+MAX_BODY_BYTES = 64 * 1024
+REDACTED = "***"
+
+
+def normalise_query(query_string):
+    """[[key, value], ...] sorted by key, values trimmed, blanks kept (the app reads them)."""
+    pairs = parse_qsl(query_string, keep_blank_values=True)
+    return sorted([key, value.strip()] for key, value in pairs)
+
+
+def redact(value):
+    if isinstance(value, dict):
+        return {k: REDACTED if "password" in str(k).lower() else redact(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [redact(v) for v in value]
+    return value
+
+
+class _LineWriter:
+    """Appends JSON lines to a file from a daemon thread."""
+
+    def __init__(self, path):
+        self.path = path
+        self._queue = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._run, name="traffic-recorder", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def write(self, entry):
+        self._queue.put(entry)
+
+    def _run(self):
+        with open(self.path, "a", encoding="utf-8") as f:
+            while True:
+                entry = self._queue.get()
+                # Drain whatever else is queued before flushing
+                while entry is not None:
+                    f.write(json.dumps(entry, separators=(",", ":"), default=str) + "\n")
+                    try:
+                        entry = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                f.flush()
+                if entry is None:
+                    return
+
+    def close(self):
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join(timeout=5)
+
+
+class _RecordedBody:
+    """Response iterable that records the request once the body has been sent.
+
+    Recording happens when the body is exhausted or on close(), whichever comes
+    first (test clients may never close a fully read response).
+    """
+
+    def __init__(self, result, on_done):
+        self._result = result
+        self._on_done = on_done
+        self._bytes = 0
+
+    def _done(self):
+        on_done, self._on_done = self._on_done, None
+        if on_done is not None:
+            on_done(self._bytes)
+
+    def __iter__(self):
+        for chunk in self._result:
+            self._bytes += len(chunk)
+            yield chunk
+        self._done()
+
+    def close(self):
+        try:
+            close = getattr(self._result, "close", None)
+            if close is not None:
+                close()
+        finally:
+            self._done()
+
+
+class TrafficRecorder:
+    """Wrap a WSGI app (e.g. `app.wsgi_app`) and record every (sampled) request."""
+
+    def __init__(self, wsgi_app, path, sample_rate=1.0, url_map=None):
+        self.wsgi_app = wsgi_app
+        self.sample_rate = sample_rate
+        self.url_map = url_map
+        self._writer = _LineWriter(path)
+
+    def _route(self, environ):
+        if self.url_map is None:
+            return environ.get("PATH_INFO", "")
+        try:
+            rule, _ = self.url_map.bind_to_environ(environ).match(return_rule=True)
+            return rule.rule
+        except HTTPException:
+            return "unmatched"
+
+    def _body(self, environ):
+        if "json" not in environ.get("CONTENT_TYPE", ""):
+            return None
+        try:
+            length = int(environ.get("CONTENT_LENGTH") or 0)
+        except ValueError:
+            return None
+        if not length or length > MAX_BODY_BYTES:
+            return None
+        raw = environ["wsgi.input"].read(length)
+        # Put the bytes back for the app
+        environ["wsgi.input"] = io.BytesIO(raw)
+        try:
+            return redact(json.loads(raw))
+        except ValueError:
+            return None
+
+    def __call__(self, environ, start_response):
+        if self.sample_rate < 1.0 and random.random() >= self.sample_rate:
+            return self.wsgi_app(environ, start_response)
+
+        entry = {
+            "ts": round(time.time(), 3),
+            "method": environ.get("REQUEST_METHOD", "GET"),
+            "path": environ.get("PATH_INFO", ""),
+            "route": self._route(environ),
+            "query": normalise_query(environ.get("QUERY_STRING", "")),
+            "body": self._body(environ),
+        }
+        started = time.perf_counter()
+
+        def recording_start_response(status, headers, exc_info=None):
+            entry["status"] = int(status.split(" ", 1)[0])
+            return start_response(status, headers, exc_info)
+
+        def finish(size):
+            entry["duration_ms"] = round((time.perf_counter() - started) * 1000, 3)
+            entry["bytes"] = size
+            self._writer.write(entry)
+
+        result = self.wsgi_app(environ, recording_start_response)
+        return _RecordedBody(result, finish)
@@ -0,0 +1,141 @@
+"""Time-bucketed ticket trends for /api/monthly-trends.
+
+The database groups tickets by (bucket start date, Ticket_Status); this module
+provides the bucket SQL per dialect and turns the small grouped result into a
+zero-filled Chart.js line-chart payload.
+"""
+import datetime
+
+
+GRANULARITIES = ("day", "week", "month", "quarter")
+
+# Day labels keep the format the dashboard has always shown.
+LABEL_FORMATS = {
+    "day": lambda d: d.strftime('%a, %d %b %Y'),
+    "week": lambda d: "Week of " + d.strftime('%d %b %Y'),
+    "month": lambda d: d.strftime('%b %Y'),
+    "quarter": lambda d: f"Q{(d.month - 1) // 3 + 1} {d.year}",
+}
+
+STATUS_COLORS = {"Open": "red", "Resolved": "green", "Pending": "orange", "Closed": "blue"}
+
+MAX_BUCKETS = 1000
+
+
+def bucket_sql(column, granularity, dialect="mssql"):
+    """SQL expression mapping `column` to the first day of its bucket (weeks start Monday)."""
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"Invalid granularity '{granularity}'. Expected one of: {', '.join(GRANULARITIES)}")
+    if dialect == "sqlite":
+        return {
+            "day": f"date({column})",
+            "week": f"date({column}, '-' || ((CAST(strftime('%w', {column}) AS INTEGER) + 6) % 7) || ' days')",
+            "month": f"strftime('%Y-%m-01', {column})",
+            "quarter": (f"printf('%s-%02d-01', strftime('%Y', {column}), "
+                        f"((CAST(strftime('%m', {column}) AS INTEGER) - 1) / 3) * 3 + 1)"),
+        }[granularity]
+    # SQL Server; day 0 (1900-01-01) is a Monday, so whole weeks since then start on Monday.
+    return {
+        "day": f"CAST({column} AS DATE)",
+        "week": f"CAST(DATEADD(day, (DATEDIFF(day, 0, {column}) / 7) * 7, 0) AS DATE)",
+        "month": f"DATEFROMPARTS(YEAR({column}), MONTH({column}), 1)",
+        "quarter": f"DATEFROMPARTS(YEAR({column}), (DATEPART(quarter, {column}) - 1) * 3 + 1, 1)",
+    }[granularity]
+
+
+def bucket_start(day, granularity):
+    """Python twin of bucket_sql: first day of the bucket containing `day`."""
+    if granularity == "day":
+        return day
+    if granularity == "week":
+        return day - datetime.timedelta(days=day.weekday())
+    if granularity == "month":
+        return day.replace(day=1)
+    if granularity == "quarter":
+        return day.replace(month=(day.month - 1) // 3 * 3 + 1, day=1)
+    raise ValueError(f"Invalid granularity '{granularity}'")
+
+
+def next_bucket(start, granularity):
+    if granularity == "day":
+        return start + datetime.timedelta(days=1)
+    if granularity == "week":
+        return start + datetime.timedelta(days=7)
+    months = 1 if granularity == "month" else 3
+    month = start.month - 1 + months
+    return datetime.date(start.year + month // 12, month % 12 + 1, 1)
+
+
+def bucket_range(start_date, end_date, granularity, limit=MAX_BUCKETS):
+    """All bucket start dates covering [start_date, end_date]; `limit=None` lifts the cap."""
+    buckets = []
+    current = bucket_start(start_date, granularity)
+    while current <= end_date:
+        buckets.append(current)
+        if limit is not None and len(buckets) > limit:
+            raise ValueError(f"Date range too large for '{granularity}' granularity (more than {MAX_BUCKETS} points)")
+        current = next_bucket(current, granularity)
+    return buckets
+
+
+def to_date(value):
+    """Normalise a bucket value from the driver (date, datetime or ISO string) to a date."""
+    if isinstance(value, datetime.datetime):
+        return value.date()
+    if isinstance(value, datetime.date):
+        return value
+    return datetime.date.fromisoformat(str(value)[:10])
+
+
+def compile_trend_query(where="", granularity="day", dialect="mssql", table="Chatbot_Transaction",
+                        count_sql="COUNT(*)"):
+    """One grouped query returning (bucket, Ticket_Status, count) rows."""
+    bucket = bucket_sql("Ticket_Creation_Date", granularity, dialect)
+    return (
+        f"SELECT {bucket}, Ticket_Status, {count_sql} FROM {table}{where}"
+        f" GROUP BY {bucket}, Ticket_Status"
+    )
+
+
+def build_trends(grouped_rows, start_date, end_date, granularity="day"):
+    """Zero-filled {labels, datasets} payload from (bucket, status, count) rows.
+
+    A missing start or end date is taken from the first or last bucket in the rows (all history);
+    that range is bounded by the data, so it is not held to MAX_BUCKETS.
+    """
+    if start_date is None or end_date is None:
+        days = [to_date(row[0]) for row in grouped_rows if row[0] is not None]
+        if not days:
+            return {"labels": [], "datasets": []}
+        start_date = start_date or min(days)
+        end_date = end_date or max(days)
+        buckets = bucket_range(start_date, end_date, granularity, limit=None)
+    else:
+        buckets = bucket_range(start_date, end_date, granularity)
+    position = {bucket: i for i, bucket in enumerate(buckets)}
+
+    series = {}
+    for bucket, status, count in grouped_rows:
+        if bucket is None:
+            continue
+        i = position.get(to_date(bucket))
+        if i is None:
+            continue
+        data = series.setdefault(status, [0] * len(buckets))
+        data[i] += count
+
+    statuses = [s for s in STATUS_COLORS if s in series]
+    statuses += sorted((s for s in series if s not in STATUS_COLORS), key=str)
+
+    fmt = LABEL_FORMATS[granularity]
+    datasets = []
+    for status in statuses:
+        color = STATUS_COLORS.get(status, "gray")
+        datasets.append({
+            "label": status,
+            "data": series[status],
+            "borderColor": color,
+            "backgroundColor": color,
+            "fill": False
+        })
+    return {"labels": [fmt(b) for b in buckets], "datasets": datasets}